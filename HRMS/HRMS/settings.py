@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'candidates.metrics.MetricsMiddleware',  # 请求耗时 / SQL / 响应大小指标，见 /metrics
+    'candidates.querybudget.QueryBudgetMiddleware',  # 每个视图的 SQL 条数上限（N+1 防护）
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -172,4 +174,82 @@ if not CORS_ALLOW_ALL_ORIGINS:
         origin.strip() for origin in os.environ.get('CORS_ALLOWED_ORIGINS', '').split(',') if origin.strip()
     ]
 
-X_FRAME_OPTIONS = 'ALLOWALL'
\ No newline at end of file
+X_FRAME_OPTIONS = 'ALLOWALL'
+
+# 简历异步导入（数据库任务队列）
+INGESTION_WORKER_PROCESSES = int(os.environ.get('INGESTION_WORKER_PROCESSES', 2))
+INGESTION_WORKER_THREADS = int(os.environ.get('INGESTION_WORKER_THREADS', 4))
+INGESTION_POLL_INTERVAL = float(os.environ.get('INGESTION_POLL_INTERVAL', 2))
+INGESTION_TASK_TIMEOUT = int(os.environ.get('INGESTION_TASK_TIMEOUT', 600))  # 秒，超时视为 worker 已崩溃
+INGESTION_MAX_ATTEMPTS = int(os.environ.get('INGESTION_MAX_ATTEMPTS', 3))
+INGESTION_MAX_FILES = int(os.environ.get('INGESTION_MAX_FILES', 50))  # 单个异步任务最多文件数
+
+
+# AI 简历解析（通义千问 OpenAI 兼容接口）
+AI_API_URL = os.environ.get('AI_API_URL', 'https://dashscope.aliyuncs.com/compatible-mode/v1/chat/completions')
+AI_API_KEY = os.environ.get('AI_API_KEY', '')
+AI_MODEL = os.environ.get('AI_MODEL', 'qwen-plus')
+AI_TIMEOUT = float(os.environ.get('AI_TIMEOUT', 60))  # 单次请求超时（秒）
+AI_MAX_RETRIES = int(os.environ.get('AI_MAX_RETRIES', 3))  # 429 / 5xx / 网络错误重试次数
+AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', 10))  # 每个进程的并发请求数
+AI_REQUESTS_PER_MINUTE = int(os.environ.get('AI_REQUESTS_PER_MINUTE', 60))  # 0 表示不限
+AI_TOKENS_PER_MINUTE = int(os.environ.get('AI_TOKENS_PER_MINUTE', 100000))  # 0 表示不限
+
+# AI 解析结果缓存（按简历文本哈希复用解析结果）
+AI_PARSE_CACHE_ENABLED = os.environ.get('AI_PARSE_CACHE_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+AI_PARSE_CACHE_MAX_ENTRIES = int(os.environ.get('AI_PARSE_CACHE_MAX_ENTRIES', 50000))
+AI_PARSE_CACHE_MAX_AGE_DAYS = int(os.environ.get('AI_PARSE_CACHE_MAX_AGE_DAYS', 180))
+AI_PARSE_CACHE_PRUNE_INTERVAL = int(os.environ.get('AI_PARSE_CACHE_PRUNE_INTERVAL', 3600))  # worker 淘汰周期（秒）
+
+# PDF 文本提取（进程池 + 页数/字数上限 + 单文件时间预算）
+PDF_EXTRACT_PROCESSES = int(os.environ.get('PDF_EXTRACT_PROCESSES', os.cpu_count() or 2))  # 0 表示在当前线程解析
+PDF_EXTRACT_MAX_PAGES = int(os.environ.get('PDF_EXTRACT_MAX_PAGES', 5))
+PDF_EXTRACT_MAX_CHARS = int(os.environ.get('PDF_EXTRACT_MAX_CHARS', 8000))  # 提示词只使用前 4000 字
+PDF_EXTRACT_TIMEOUT = float(os.environ.get('PDF_EXTRACT_TIMEOUT', 20))  # 秒
+
+# 缓存（默认进程内存；多进程部署时建议改为共享缓存，使失效在各进程间生效，
+# 例如 CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache CACHE_LOCATION=hrms_cache
+# 并执行 python manage.py createcachetable）
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'hrms'),
+    }
+}
+STATS_CACHE_TIMEOUT = int(os.environ.get('STATS_CACHE_TIMEOUT', 300))  # 统计结果缓存时长（秒），兜底其它进程的写入
+
+# 后台导出任务
+EXPORT_JOB_TIMEOUT = int(os.environ.get('EXPORT_JOB_TIMEOUT', 1800))  # 秒，超时视为 worker 崩溃并重新排队
+EXPORT_MAX_AGE_HOURS = int(os.environ.get('EXPORT_MAX_AGE_HOURS', 72))  # 导出文件保留时长，0 表示不清理
+
+# 结构化批量导入（CSV / XLSX）
+IMPORT_JOB_TIMEOUT = int(os.environ.get('IMPORT_JOB_TIMEOUT', 1800))  # 秒，超时视为 worker 崩溃并重新排队
+IMPORT_MAX_FILE_SIZE = int(os.environ.get('IMPORT_MAX_FILE_SIZE', 100 * 1024 * 1024))  # 字节
+
+# 候选人增量同步（GET /api/candidates/changes/?since=）
+CANDIDATE_SYNC_OVERLAP_SECONDS = int(os.environ.get('CANDIDATE_SYNC_OVERLAP_SECONDS', 5))  # 重叠窗口，覆盖未提交事务与时钟偏差
+CANDIDATE_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('CANDIDATE_TOMBSTONE_RETENTION_DAYS', 30))  # 删除记录保留天数
+
+# 变更推送（GET /api/candidates/events/，SSE，由 ASGI 服务提供）
+# 单进程部署用 LocalBackend；gunicorn / worker 与推送服务分属不同进程时用 DatabaseBackend
+EVENT_BACKEND = os.environ.get('EVENT_BACKEND', 'candidates.events.LocalBackend')
+EVENT_POLL_INTERVAL = float(os.environ.get('EVENT_POLL_INTERVAL', 1))  # DatabaseBackend 轮询间隔（秒）
+EVENT_RETENTION_HOURS = int(os.environ.get('EVENT_RETENTION_HOURS', 24))  # DatabaseBackend 事件保留时长
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_HEARTBEAT_SECONDS', 15))  # 空闲保活间隔
+EVENT_STREAM_MAX_SECONDS = int(os.environ.get('EVENT_STREAM_MAX_SECONDS', 3600))  # 单个连接最长时间，之后由浏览器重连
+EVENT_RETRY_MS = int(os.environ.get('EVENT_RETRY_MS', 3000))  # 浏览器断线重连间隔
+EVENT_STATS_INTERVAL = float(os.environ.get('EVENT_STATS_INTERVAL', 5))  # 推送服务重新计算统计的最短间隔（秒）
+
+# 性能指标（GET /metrics，Prometheus 文本格式）
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', 1000))  # 超过该耗时记录慢日志（含最慢的 SQL）
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # 设置后抓取需带 Authorization: Bearer <token>
+METRICS_ALLOWED_NETWORKS = os.environ.get(  # 未设置 METRICS_TOKEN 时允许访问的地址段
+    'METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16'
+)
+
+# 查询预算（N+1 防护，见 candidates/querybudget.py）
+# raise：超出预算时抛出异常（DEBUG / 运行测试时的默认值）；warn：只记日志；off：不统计（生产默认）
+TESTING = sys.argv[1:2] == ['test']
+QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'raise' if DEBUG or TESTING else 'off').lower()
+QUERY_BUDGETS = {}  # 按 URL name 覆盖视图声明的预算，例如 {'candidate-list': 10}
@@ -18,10 +18,14 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from candidates.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.urls')),
     path("api/candidates/", include("candidates.urls")),
+    # 内部指标接口，nginx 只转发 /api/ 与 /media/，不对外暴露
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
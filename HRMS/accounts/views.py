@@ -1,16 +1,22 @@
 # accounts/views.py
+import logging
+
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth.models import User
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from candidates.querybudget import query_budget
 from .serializers import RegisterSerializer
 
+logger = logging.getLogger(__name__)
+
 
 # ---------------------------------------------------------
 # 注册视图 RegisterView
 # ---------------------------------------------------------
+@query_budget(4)
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = [AllowAny]
@@ -21,7 +27,7 @@ class RegisterView(generics.CreateAPIView):
 
         # ✅ 验证失败时返回详细错误信息
         if not serializer.is_valid():
-            print("❌ 注册验证失败：", serializer.errors)  # 调试输出
+            logger.info("❌ 注册验证失败：%s", serializer.errors)
             return Response(
                 {"errors": serializer.errors},
                 status=status.HTTP_400_BAD_REQUEST
@@ -48,6 +54,7 @@ class RegisterView(generics.CreateAPIView):
 # ---------------------------------------------------------
 # 修改密码视图 ChangePasswordView
 # ---------------------------------------------------------
+@query_budget(3)
 class ChangePasswordView(APIView):
     permission_classes = [AllowAny]
 
@@ -96,6 +103,7 @@ class ChangePasswordView(APIView):
 # ---------------------------------------------------------
 # 检查用户权限视图 CheckUserPermissionView
 # ---------------------------------------------------------
+@query_budget(2)
 class CheckUserPermissionView(APIView):
     """
     检查当前用户是否是超级管理员
@@ -0,0 +1,207 @@
+# candidates/ai_client.py
+"""
+通义千问（DashScope OpenAI 兼容接口）客户端
+
+- 复用连接池的 requests.Session
+- 令牌桶限速：每分钟请求数（RPM）与每分钟 token 数（TPM）
+- 对 429 / 5xx / 网络错误做指数退避 + 随机抖动重试
+- map() 使用线程池并发调用，批量解析耗时约等于最慢的一次调用
+"""
+import json
+import math
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AIClientError(Exception):
+    """重试耗尽或返回格式不正确"""
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶。capacity 为桶容量，refill_per_minute 为每分钟补充量；
+    refill_per_minute 为 0 表示不限速。
+    """
+
+    def __init__(self, refill_per_minute, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = refill_per_minute / 60.0
+        self.capacity = capacity or refill_per_minute
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        """阻塞直到取得 amount 个令牌；超过桶容量的请求按容量计"""
+        if not self.rate:
+            return
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            self._sleep(wait)
+
+    def adjust(self, delta):
+        """按实际用量修正预扣的令牌（delta > 0 表示多扣，退回）"""
+        if not self.rate:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+
+def estimate_tokens(text, max_output_tokens=0):
+    """粗略估算 token 数：中文约 1.5 字/token，宁多勿少"""
+    return math.ceil(len(text) / 1.5) + max_output_tokens
+
+
+class AIClient:
+    def __init__(
+        self,
+        api_url,
+        api_key,
+        model="qwen-plus",
+        timeout=60,
+        max_retries=3,
+        backoff_base=1.0,
+        backoff_max=30.0,
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_concurrency=4,
+        max_output_tokens=1500,
+    ):
+        self.api_url = api_url
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max_concurrency
+        self.max_output_tokens = max_output_tokens
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_concurrency, 1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        })
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # full jitter：在 [0, base * 2^attempt] 内随机，避免并发请求同时重试
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def chat(self, prompt):
+        """发送单轮对话，返回模型输出的文本内容"""
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        reserved = estimate_tokens(prompt, self.max_output_tokens)
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                retry_after = getattr(last_error, "retry_after", None)
+                time.sleep(self._backoff(attempt - 1, retry_after))
+
+            self.request_bucket.acquire()
+            self.token_bucket.acquire(reserved)
+            try:
+                resp = self.session.post(self.api_url, data=json.dumps(payload), timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = e
+                logger.warning("⚠️ AI 请求失败（第 %s 次）：%s", attempt + 1, e)
+                continue
+
+            if resp.status_code in RETRY_STATUS_CODES:
+                last_error = AIClientError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+                last_error.retry_after = resp.headers.get("Retry-After")
+                logger.warning("⚠️ AI 返回 %s（第 %s 次）", resp.status_code, attempt + 1)
+                continue
+
+            try:
+                data = resp.json()
+                content = data["choices"][0]["message"]["content"]
+            except (ValueError, KeyError, IndexError, TypeError):
+                raise AIClientError(f"AI 响应格式异常：{resp.text[:800]}")
+
+            used = (data.get("usage") or {}).get("total_tokens")
+            if used:
+                self.token_bucket.adjust(reserved - used)
+            return content
+
+        raise AIClientError(f"AI 请求重试 {self.max_retries} 次后仍失败：{last_error}")
+
+    @property
+    def executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(self.max_concurrency, 1), thread_name_prefix="ai-client"
+                )
+            return self._executor
+
+    def map(self, fn, items):
+        """并发执行 fn(item)，结果顺序与 items 一致；单个失败以异常对象返回"""
+        futures = [self.executor.submit(fn, item) for item in items]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """按 settings 构建进程内共享的客户端（连接池与限速器在线程间共享）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AIClient(
+                api_url=settings.AI_API_URL,
+                api_key=settings.AI_API_KEY,
+                model=settings.AI_MODEL,
+                timeout=settings.AI_TIMEOUT,
+                max_retries=settings.AI_MAX_RETRIES,
+                requests_per_minute=settings.AI_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.AI_TOKENS_PER_MINUTE,
+                max_concurrency=settings.AI_MAX_CONCURRENCY,
+            )
+        return _client
@@ -0,0 +1,11 @@
+# candidates/benchmark/__init__.py
+"""
+性能基准测试工具
+
+- data：合成候选人 / 工作经历 / 合作记录 / 收藏（manage.py benchmark_seed）
+- corpus：合成 PDF 简历（manage.py benchmark_corpus）
+- stub_ai：本地模拟 DashScope chat/completions，可配置延迟与错误率（manage.py benchmark_ai_stub）
+- load：对运行中的服务执行压测场景，输出 p50 / p95 / p99 与吞吐量，结果保存为 JSON（manage.py benchmark_run）
+
+建议在独立的数据库上运行（如 SQLITE_DB_PATH 指向单独的文件，或单独的 MySQL 库）。
+"""
@@ -0,0 +1,101 @@
+# candidates/benchmark/corpus.py
+"""
+合成 PDF 简历
+
+直接写出最小的 PDF 结构，中文使用 PDF 阅读器内置的 STSong-Light（UniGB-UCS2-H 编码），
+不依赖字体文件或额外的库，pdfminer 可以正常提取文本。
+简历按「姓名：」「电话：」等标签逐行排版，stub_ai 按同样的标签解析；
+电话以 18 开头、邮箱为 @corpus.example.com，不会与 data 生成的候选人重复。
+"""
+import os
+import random
+from datetime import date
+
+from .data import EDUCATION, MAJOR, BASE, UNIVERSITIES, synthetic_experience, synthetic_name
+
+EMAIL_DOMAIN = "corpus.example.com"
+PHONE_PREFIX = "18"
+LINES_PER_PAGE = 48
+FILLER = "熟悉课堂管理与分层教学，能够根据学生水平调整课程节奏，擅长用实验和案例讲解抽象概念。"
+
+FONT_OBJECTS = (
+    "<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H"
+    " /DescendantFonts [{descendant} 0 R] >>",
+    "<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light"
+    " /CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> /FontDescriptor {descriptor} 0 R >>",
+    "<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880]"
+    " /ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>",
+)
+
+
+def _text(line):
+    return "<" + line.encode("utf-16-be").hex().upper() + ">"
+
+
+def make_pdf(lines, lines_per_page=LINES_PER_PAGE):
+    """每行一段文本，超过 lines_per_page 自动分页，返回 PDF 字节"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    font = 3 + 2 * len(pages)  # 1 目录、2 页面树、每页 2 个对象（页面 + 内容流），之后是字体
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(len(pages)))}] /Count {len(pages)} >>",
+    ]
+    for i, page in enumerate(pages):
+        content = "BT /F1 11 Tf 50 790 Td 16 TL " + " ".join(f"{_text(line)} '" for line in page) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {4 + 2 * i} 0 R"
+            f" /Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append(FONT_OBJECTS[0].format(descendant=font + 1))
+    objects.append(FONT_OBJECTS[1].format(descriptor=font + 2))
+    objects.append(FONT_OBJECTS[2])
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("ascii")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(out)
+
+
+def resume_lines(rng, number, pages=1, today=None):
+    """一份简历的文本行；pages > 1 时追加自我评价凑满页数（模拟长简历的解析耗时）"""
+    today = today or date.today()
+    age = rng.randint(21, 45)
+    lines = [
+        f"姓名：{synthetic_name(rng)}",
+        f"性别：{rng.choice(('男', '女'))}    年龄：{age}",
+        f"电话：{PHONE_PREFIX}{number:09d}",
+        f"邮箱：resume{number}@{EMAIL_DOMAIN}",
+        f"学历：{EDUCATION(rng)}",
+        f"专业：{MAJOR(rng)}",
+        f"毕业院校：{rng.choice(UNIVERSITIES)}",
+        f"毕业时间：{today.year - max(age - 22, 0)}-07-01",
+        f"所在地：{BASE(rng)}",
+        "工作经历：",
+    ]
+    for item in synthetic_experience(rng, today):
+        lines.append(f"{item['start_date']} - {item['end_date']}  {item['company']}  {item['position']}")
+        lines.append(f"    {item['description']}")
+    lines.append("自我评价：")
+    while len(lines) < LINES_PER_PAGE * (pages - 1) + 20:
+        lines.append(FILLER)
+    return lines
+
+
+def write_corpus(directory, count, pages=1, seed=0, start=0):
+    """在 directory 下生成 resume_<编号>.pdf，返回文件路径列表"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for number in range(start, start + count):
+        path = os.path.join(directory, f"resume_{number:06d}.pdf")
+        with open(path, "wb") as fp:
+            fp.write(make_pdf(resume_lines(rng, number, pages)))
+        paths.append(path)
+    return paths
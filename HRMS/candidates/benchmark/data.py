@@ -0,0 +1,236 @@
+# candidates/benchmark/data.py
+"""
+合成数据：候选人、工作经历、合作记录、收藏
+
+字段分布与真实数据相近（学历、城市、匹配度、约三成候选人有合作记录），同一 seed 生成的数据相同。
+写入走批量导入同样的 executemany 路径（bulk.insert_rows），每批一个事务；
+合作汇总字段在生成时直接算好，检索文档与经历行按批写入，不推送变更事件。
+合成候选人的电话以 19 开头、邮箱为 @bench.example.com，重复执行时编号接着上次继续。
+"""
+import json
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .. import stats
+from ..bulk import insert_rows
+from ..cooperation import rollup_fields
+from ..experience import sync_experiences_many
+from ..importer import CANDIDATE_ATTNAMES, INSERT_FIELDS, NEW_CANDIDATE
+from ..models import Candidate, CooperationRecord, Favorite
+from ..search import index_candidates
+
+EMAIL_DOMAIN = "bench.example.com"
+PHONE_PREFIX = "19"
+USERNAME_PREFIX = "bench_user"
+SEED_CHUNK_SIZE = 2000  # 取回主键时按电话查询，参数个数与批大小相同
+HISTORY_DAYS = 3 * 365  # 创建时间分布在最近三年内，id 越大越新
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何林罗高郑梁谢宋唐韩冯邓曹彭曾萧田董潘袁蔡蒋余于杜叶程魏苏吕丁任沈姚卢"
+GIVEN_NAMES = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉萍红娥玲芬燕彬鹏辉宇浩然博文思雨晨欣怡子轩"
+EDUCATIONS = (("本科", 60), ("硕士", 32), ("博士", 8))
+MAJORS = (
+    ("数学", 14), ("物理", 10), ("化学", 8), ("生物", 8), ("计算机", 16), ("商业", 8), ("机械工程", 6),
+    ("英语", 8), ("汉语言文学", 6), ("理学", 6), ("工学", 5), ("经管", 5),
+)
+UNIVERSITIES = (
+    "复旦大学", "上海交通大学", "浙江大学", "南京大学", "中山大学", "华东师范大学", "同济大学",
+    "武汉大学", "宁波大学", "北京师范大学", "华南理工大学", "东南大学", "上海大学", "杭州师范大学",
+)
+BASES = (("上海", 30), ("杭州", 20), ("广州", 15), ("南京", 12), ("宁波", 8), ("远程", 15))
+MATCH_LEVELS = (("A", 15), ("B", 20), ("C", 25), ("D", 30), ("E", 10))
+EDUCATION_JOBS = (
+    ("新东方", "数学老师"), ("学而思", "物理老师"), ("市第一中学", "化学老师"), ("实验小学", "英语老师"),
+    ("大学物理系", "助教"), ("好未来", "课程设计"), ("青少年编程培训中心", "培训讲师"), ("区教研室", "教研员"),
+)
+OTHER_JOBS = (
+    ("阿里巴巴", "软件工程师"), ("腾讯", "产品经理"), ("字节跳动", "数据分析师"), ("华为", "硬件工程师"),
+    ("网易", "市场专员"), ("美团", "运营专员"), ("咨询公司", "研究助理"), ("制造企业", "实习生"),
+)
+PROJECTS = ("暑期数学营", "物理竞赛辅导", "AP 化学课程", "编程夏令营", "生物奥赛集训", "英语写作课", "科学探究周")
+COOPERATION_RESULTS = (("优秀", 25), ("良好", 45), ("一般", 20), ("不再合作", 10))
+
+COOPERATION_FIELDS = (
+    "candidate", "project_name", "start_date", "end_date", "role", "salary", "evaluation",
+    "cooperation_result", "created_at",
+)
+
+
+class Weighted:
+    """按权重抽样；预先计算累积权重，逐行调用时比每次传 weights 快"""
+
+    def __init__(self, pairs):
+        self.values = [value for value, _ in pairs]
+        self.cum_weights = []
+        total = 0
+        for _, weight in pairs:
+            total += weight
+            self.cum_weights.append(total)
+
+    def __call__(self, rng):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+EDUCATION = Weighted(EDUCATIONS)
+MAJOR = Weighted(MAJORS)
+BASE = Weighted(BASES)
+MATCH_LEVEL = Weighted(MATCH_LEVELS)
+COOPERATION_RESULT = Weighted(COOPERATION_RESULTS)
+
+
+def _month(value):
+    return f"{value.year}-{value.month:02d}"
+
+
+def synthetic_name(rng):
+    return rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_NAMES) for _ in range(rng.choice((1, 2, 2))))
+
+
+def synthetic_experience(rng, today, education_share=0.45):
+    """0~4 段经历，按时间倒序；约 education_share 的经历与教育相关"""
+    items = []
+    end = None
+    cursor = today - timedelta(days=rng.randint(0, 120))
+    for _ in range(rng.choice((0, 1, 1, 2, 2, 3, 4))):
+        months = rng.randint(3, 36)
+        start = cursor - timedelta(days=months * 30)
+        company, position = rng.choice(EDUCATION_JOBS if rng.random() < education_share else OTHER_JOBS)
+        items.append({
+            "company": company,
+            "position": position,
+            "start_date": _month(start),
+            "end_date": "至今" if end is None and rng.random() < 0.3 else _month(cursor),
+            "description": f"负责{position}相关工作，参与{rng.choice(PROJECTS)}",
+        })
+        end = cursor
+        cursor = start - timedelta(days=rng.randint(0, 180))
+    return items
+
+
+def synthetic_cooperations(rng, today, max_cooperations):
+    """[(project_name, start_date, end_date, cooperation_result)]"""
+    records = []
+    for _ in range(rng.randint(1, max_cooperations)):
+        start = today - timedelta(days=rng.randint(0, HISTORY_DAYS))
+        end = start + timedelta(days=rng.randint(7, 90))
+        records.append((rng.choice(PROJECTS), start, end, COOPERATION_RESULT(rng)))
+    return records
+
+
+def synthetic_candidate(rng, number, created_at, today):
+    age = rng.randint(21, 45)
+    row = {
+        **NEW_CANDIDATE,
+        "name": synthetic_name(rng),
+        "gender": rng.choice(("男", "女")),
+        "age": age,
+        "phone": f"{PHONE_PREFIX}{number:09d}",
+        "email": f"bench{number}@{EMAIL_DOMAIN}",
+        "education": EDUCATION(rng),
+        "university": rng.choice(UNIVERSITIES),
+        "major": MAJOR(rng),
+        "graduation_date": date(today.year - max(age - 22, 0), rng.choice((6, 7)), 1),
+        "base": BASE(rng),
+        "experience": json.dumps(synthetic_experience(rng, today), ensure_ascii=False),
+        "match_level": MATCH_LEVEL(rng),
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+    # 与批量导入相同，按位置传参走 Model.__init__ 的快速路径
+    return Candidate(*[row[name] for name in CANDIDATE_ATTNAMES])
+
+
+def next_number():
+    """接着已有合成数据的编号（电话定长，按字符串排序即按数值排序）"""
+    last = (
+        Candidate.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+        .order_by("-phone").values_list("phone", flat=True).first()
+    )
+    return int(last[len(PHONE_PREFIX):]) + 1 if last else 0
+
+
+def _write_chunk(candidates, cooperations, index):
+    """cooperations 与 candidates 一一对应；返回 (合作记录数, 新候选人 id 列表)"""
+    with transaction.atomic():
+        insert_rows(Candidate, INSERT_FIELDS, ([getattr(c, f) for f in INSERT_FIELDS] for c in candidates))
+        # executemany 不返回自增主键，按电话（唯一索引）取回
+        ids = dict(Candidate.objects.filter(phone__in=[c.phone for c in candidates]).values_list("phone", "id"))
+        for candidate in candidates:
+            candidate.id = ids[candidate.phone]
+        rows = [
+            (candidate.id, project, start, end, "讲师", "", "", result, candidate.created_at)
+            for candidate, records in zip(candidates, cooperations)
+            for project, start, end, result in records
+        ]
+        insert_rows(CooperationRecord, COOPERATION_FIELDS, rows)
+        sync_experiences_many([c for c in candidates if c.experience], replace=False)
+        if index:
+            index_candidates(candidates, replace=False)
+    return len(rows), [c.id for c in candidates]
+
+
+def generate(
+    candidates,
+    cooperation_ratio=0.3,
+    max_cooperations=5,
+    favorite_users=3,
+    favorites_per_user=200,
+    seed=0,
+    chunk_size=SEED_CHUNK_SIZE,
+    index=True,
+    progress=None,
+):
+    """
+    生成 candidates 位候选人及其经历、合作记录，再为 favorite_users 个用户
+    （bench_user0、bench_user1……，密码不可用）各收藏 favorites_per_user 位。
+    index=False 跳过检索文档（不测检索时更快，之后可执行 rebuild_search_index）。
+    progress(已写入数) 在每批写入后回调。返回各类数据的写入数量。
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = now.date()
+    start = next_number()
+    step = timedelta(days=HISTORY_DAYS) / max(candidates, 1)
+    first_created = now - timedelta(days=HISTORY_DAYS)
+
+    result = {"candidates": 0, "cooperations": 0, "favorites": 0}
+    created_ids = []
+    for offset in range(0, candidates, chunk_size):
+        batch, cooperations = [], []
+        for number in range(offset, min(offset + chunk_size, candidates)):
+            created_at = first_created + step * number + timedelta(seconds=rng.random())
+            candidate = synthetic_candidate(rng, start + number, created_at, today)
+            records = synthetic_cooperations(rng, today, max_cooperations) if rng.random() < cooperation_ratio else []
+            # 汇总字段与 cooperation.refresh_rollups 的结果一致，序号代替记录 id 决定同日记录的先后
+            fields = rollup_fields(
+                (project, start_date, outcome, seq) for seq, (project, start_date, _, outcome) in enumerate(records)
+            )
+            for field, value in fields.items():
+                setattr(candidate, field, value)
+            if records:
+                candidate.cooperation_status = "合作较差" if fields["worst_cooperation_result"] == "不再合作" else "合作"
+            batch.append(candidate)
+            cooperations.append(records)
+        written, ids = _write_chunk(batch, cooperations, index)
+        result["candidates"] += len(ids)
+        result["cooperations"] += written
+        created_ids.extend(ids)
+        if progress:
+            progress(result["candidates"])
+
+    favorites = []
+    for number in range(favorite_users):
+        user, created = User.objects.get_or_create(username=f"{USERNAME_PREFIX}{number}")
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=["password"])
+        for candidate_id in rng.sample(created_ids, min(favorites_per_user, len(created_ids))):
+            favorites.append(Favorite(user=user, candidate_id=candidate_id))
+    Favorite.objects.bulk_create(favorites, batch_size=chunk_size, ignore_conflicts=True)
+    result["favorites"] = len(favorites)
+
+    stats.invalidate()
+    return result
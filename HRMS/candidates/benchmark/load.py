@@ -0,0 +1,461 @@
+# candidates/benchmark/load.py
+"""
+压测场景
+
+对运行中的服务（gunicorn / uvicorn / runserver）并发发送请求，每个场景先顺序预热，
+再用 concurrency 个线程（各自一个连接池）发送 requests 个请求，统计：
+延迟 min / mean / p50 / p95 / p99 / max（毫秒，含读取完整响应体）、吞吐量、错误数与状态码分布、
+响应大小，以及服务端的 SQL 条数（响应头 X-Query-Count，服务端 QUERY_BUDGET_MODE 为 warn / raise 时才有）。
+结果保存为 JSON，compare() 与之前保存的结果逐项对比。
+"""
+import os
+import json
+import math
+import time
+import random
+import socket
+import platform
+import threading
+import subprocess
+from collections import Counter, namedtuple
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.utils import timezone
+
+Sample = namedtuple("Sample", "latency_ms status size queries error")
+
+SEARCH_TERMS = ("数学", "老师", "上海", "复旦大学", "计算机", "新东方", "助教", "物理")
+LIST_FILTERS = (
+    {}, {}, {},
+    {"match_level": "A"}, {"base": "上海"}, {"education": "硕士"}, {"cooperation_status": "合作"},
+    {"min_cooperations": 2}, {"best_result": "优秀"}, {"ordering": "recent_cooperation"},
+    {"ordering": "cooperation_count"}, {"search": "数学"}, {"worked_at": "新东方"},
+    {"has_education_experience": 1},
+)
+COOPERATION_FILTERS = ({}, {}, {"result": "优秀"}, {"project": "数学"}, {"date_from": "2025-01-01"}, {"search": "王"})
+EXPORT_FILTERS = ({"match_level": "A"}, {"base": "宁波"}, {"education": "博士"})
+DEEP_PAGES = 50  # list_deep 每个线程连续翻页数，之后从第一页重新开始
+SAMPLE_IDS = 200
+
+
+class BenchmarkError(Exception):
+    """场景无法运行（缺少数据或参数）"""
+
+
+def percentile(values, p):
+    """values 已排序；线性插值，与 numpy.percentile 默认方式一致"""
+    if not values:
+        return None
+    k = (len(values) - 1) * p / 100
+    low, high = math.floor(k), math.ceil(k)
+    return values[low] + (values[high] - values[low]) * (k - low)
+
+
+def _round(value, digits=1):
+    return None if value is None else round(value, digits)
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(s.latency_ms for s in samples)
+    queries = [s.queries for s in samples if s.queries is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(s.error for s in samples),
+        "status": {str(code): count for code, count in sorted(Counter(s.status for s in samples).items())},
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "min": _round(latencies[0] if latencies else None),
+            "mean": _round(sum(latencies) / len(latencies) if latencies else None),
+            "p50": _round(percentile(latencies, 50)),
+            "p95": _round(percentile(latencies, 95)),
+            "p99": _round(percentile(latencies, 99)),
+            "max": _round(latencies[-1] if latencies else None),
+        },
+        "avg_bytes": round(sum(s.size for s in samples) / len(samples)) if samples else 0,
+        "avg_queries": _round(sum(queries) / len(queries) if queries else None),
+        "max_queries": max(queries) if queries else None,
+    }
+
+
+# ==============
+# 🎬 场景
+# ==============
+class Scenario:
+    """
+    一次操作对应一个 HTTP 请求：request(rng, state) 返回 Session.request 的参数，
+    state 为每个线程独立的字典（游标翻页等需要保存状态的场景使用）
+    """
+    name = ""
+    description = ""
+    concurrency = None  # None 表示使用命令行参数
+    requests = None
+    stream = False
+    expected = (200,)
+
+    def __init__(self, runner):
+        self.runner = runner
+
+    def setup(self):
+        pass
+
+    def request(self, rng, state):
+        raise NotImplementedError
+
+    def on_response(self, response, state):
+        pass
+
+    def teardown(self, session):
+        pass
+
+
+class ListPage(Scenario):
+    name = "list_page"
+    description = "人才库列表第一页（游标分页，随机筛选 / 排序，带收藏状态）"
+
+    def request(self, rng, state):
+        params = {"page_size": 20, "username": self.runner.username, **rng.choice(LIST_FILTERS)}
+        return {"method": "GET", "url": self.runner.api("")}, params
+
+
+class ListDeep(Scenario):
+    name = "list_deep"
+    description = f"人才库列表连续翻页（每个线程翻 {DEEP_PAGES} 页后重新开始）"
+
+    def request(self, rng, state):
+        if state.get("next") and state.get("pages", 0) < DEEP_PAGES:
+            return {"method": "GET", "url": state["next"]}, None
+        state["pages"] = 0
+        return {"method": "GET", "url": self.runner.api("")}, {"page_size": 50}
+
+    def on_response(self, response, state):
+        state["next"] = response.json().get("next")
+        state["pages"] = state.get("pages", 0) + 1
+
+
+class ListFull(Scenario):
+    name = "list_full"
+    description = "旧前端的不分页完整列表（只适合小数据量）"
+    concurrency = 1
+    requests = 5
+
+    def request(self, rng, state):
+        return {"method": "GET", "url": self.runner.api("")}, None
+
+
+class Search(Scenario):
+    name = "search"
+    description = "全文检索"
+
+    def request(self, rng, state):
+        return {"method": "GET", "url": self.runner.api("search/")}, {"q": rng.choice(SEARCH_TERMS)}
+
+
+class Detail(Scenario):
+    name = "detail"
+    description = "候选人详情（含经历与合作记录）"
+
+    def setup(self):
+        if not self.runner.sample_ids:
+            raise BenchmarkError("没有候选人数据，先执行 benchmark_seed")
+
+    def request(self, rng, state):
+        return {"method": "GET", "url": self.runner.api(f"{rng.choice(self.runner.sample_ids)}/")}, None
+
+
+class Stats(Scenario):
+    name = "stats"
+    description = "统计数据（完整响应）"
+
+    def request(self, rng, state):
+        return {"method": "GET", "url": self.runner.api("stats/")}, None
+
+
+class StatsConditional(Scenario):
+    name = "stats_conditional"
+    description = "统计数据（带 If-None-Match，数据未变化时 304）"
+    expected = (200, 304)
+
+    def request(self, rng, state):
+        headers = {"If-None-Match": state["etag"]} if state.get("etag") else {}
+        return {"method": "GET", "url": self.runner.api("stats/"), "headers": headers}, None
+
+    def on_response(self, response, state):
+        state["etag"] = response.headers.get("ETag") or state.get("etag")
+
+
+class Export(Scenario):
+    name = "export"
+    description = "流式导出 xlsx（随机筛选条件，读取完整文件）"
+    concurrency = 2
+    requests = 10
+    stream = True
+
+    def request(self, rng, state):
+        return {"method": "GET", "url": self.runner.api("export/")}, rng.choice(EXPORT_FILTERS)
+
+
+class Cooperations(Scenario):
+    name = "cooperations"
+    description = "合作记录分页列表（随机筛选）"
+
+    def request(self, rng, state):
+        params = {"page_size": 20, **rng.choice(COOPERATION_FILTERS)}
+        return {"method": "GET", "url": self.runner.api("cooperations/")}, params
+
+
+class CooperationCreate(Scenario):
+    name = "cooperation_create"
+    description = "新增合作记录（写入 + 汇总刷新），结束后删除"
+    expected = (201,)
+
+    def setup(self):
+        if not self.runner.sample_ids:
+            raise BenchmarkError("没有候选人数据，先执行 benchmark_seed")
+        self.created = []
+        self.lock = threading.Lock()
+
+    def request(self, rng, state):
+        data = {
+            "candidate_id": rng.choice(self.runner.sample_ids),
+            "project_name": "压测项目",
+            "start_date": timezone.now().date().isoformat(),
+            "cooperation_result": rng.choice(("优秀", "良好", "一般")),
+        }
+        return {"method": "POST", "url": self.runner.api("cooperations/"), "data": data}, None
+
+    def on_response(self, response, state):
+        with self.lock:
+            self.created.append(response.json()["id"])
+
+    def teardown(self, session):
+        for record_id in self.created:
+            session.delete(self.runner.api(f"cooperations/{record_id}/"), timeout=self.runner.timeout)
+
+
+class Upload(Scenario):
+    name = "upload"
+    description = "同步上传简历（PDF 解析 + AI + 入库；服务端 AI_API_URL 应指向 benchmark_ai_stub）"
+    concurrency = 2
+    requests = 10
+    expected = (200,)
+
+    def setup(self):
+        corpus = self.runner.corpus
+        if not corpus or not os.path.isdir(corpus):
+            raise BenchmarkError("upload 场景需要 --corpus（先执行 benchmark_corpus）")
+        self.paths = sorted(os.path.join(corpus, name) for name in os.listdir(corpus) if name.endswith(".pdf"))
+        if not self.paths:
+            raise BenchmarkError(f"{corpus} 下没有 PDF 文件")
+
+    def request(self, rng, state):
+        chosen = rng.sample(self.paths, min(self.runner.files_per_request, len(self.paths)))
+        files = []
+        for path in chosen:
+            with open(path, "rb") as fp:
+                files.append(("files", (os.path.basename(path), fp.read(), "application/pdf")))
+        # 已导入过的简历按 update 处理，每次都走完整流程
+        data = {"on_duplicate": "update"}
+        return {"method": "POST", "url": self.runner.api("upload/"), "files": files, "data": data}, None
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        ListPage, ListDeep, ListFull, Search, Detail, Stats, StatsConditional,
+        Export, Cooperations, CooperationCreate, Upload,
+    )
+}
+DEFAULT_SCENARIOS = ("list_page", "list_deep", "search", "detail", "stats", "stats_conditional", "cooperations", "export")
+
+
+# ==============
+# 🏃 执行
+# ==============
+class LoadRunner:
+    def __init__(
+        self,
+        base_url,
+        concurrency=8,
+        requests=200,
+        warmup=5,
+        timeout=120,
+        username="bench_user0",
+        corpus=None,
+        files_per_request=5,
+        seed=0,
+    ):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.concurrency = concurrency
+        self.requests = requests
+        self.warmup = warmup
+        self.timeout = timeout
+        self.username = username
+        self.corpus = corpus
+        self.files_per_request = files_per_request
+        self.seed = seed
+        self.sample_ids = []
+        self.dataset = {}
+
+    def api(self, path):
+        return urljoin(self.base_url, "api/candidates/" + path)
+
+    def session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def prepare(self):
+        """读取数据规模并抽取候选人 id（详情、写入场景使用）"""
+        with self.session() as session:
+            response = session.get(self.api("stats/"), timeout=self.timeout)
+            response.raise_for_status()
+            self.dataset = {"candidates": response.json()["total"]}
+            ids = set()
+            for ordering in ("", "cooperation_count"):
+                response = session.get(
+                    self.api(""), params={"page_size": SAMPLE_IDS, "fields": "id", "ordering": ordering},
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                ids.update(item["id"] for item in response.json()["results"])
+            self.sample_ids = sorted(ids)
+
+    def _send(self, session, scenario, rng, state):
+        kwargs, params = scenario.request(rng, state)
+        started = time.perf_counter()
+        try:
+            response = session.request(params=params, timeout=self.timeout, stream=scenario.stream, **kwargs)
+            if scenario.stream:
+                size = sum(len(chunk) for chunk in response.iter_content(65536))
+            else:
+                size = len(response.content)
+        except requests.RequestException:
+            return Sample((time.perf_counter() - started) * 1000, 0, 0, None, True)
+        latency = (time.perf_counter() - started) * 1000
+        error = response.status_code not in scenario.expected
+        if not error:
+            try:
+                scenario.on_response(response, state)
+            except (ValueError, KeyError):
+                error = True
+        queries = response.headers.get("X-Query-Count")
+        return Sample(latency, response.status_code, size, int(queries) if queries else None, error)
+
+    def run_scenario(self, name):
+        scenario = SCENARIOS[name](self)
+        scenario.setup()
+        concurrency = scenario.concurrency or self.concurrency
+        total = scenario.requests or self.requests
+
+        with self.session() as session:
+            state, rng = {}, random.Random(self.seed)
+            for _ in range(self.warmup):
+                self._send(session, scenario, rng, state)
+
+        samples = []
+        lock = threading.Lock()
+        remaining = [total]
+
+        def worker(index):
+            state, rng = {}, random.Random(f"{self.seed}-{name}-{index}")
+            with self.session() as session:
+                while True:
+                    with lock:
+                        if not remaining[0]:
+                            return
+                        remaining[0] -= 1
+                    sample = self._send(session, scenario, rng, state)
+                    with lock:
+                        samples.append(sample)
+
+        threads = [threading.Thread(target=worker, args=(i,), name=f"bench-{name}-{i}") for i in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with self.session() as session:
+            scenario.teardown(session)
+        return {"description": scenario.description, "concurrency": concurrency, **summarize(samples, elapsed)}
+
+    def run(self, names=DEFAULT_SCENARIOS, progress=None):
+        """依次运行各场景；progress(场景名, 结果) 在每个场景结束后回调"""
+        self.prepare()
+        started_at = timezone.now()
+        results = {}
+        for name in names:
+            results[name] = self.run_scenario(name)
+            if progress:
+                progress(name, results[name])
+        return {
+            "started_at": started_at.isoformat(),
+            "finished_at": timezone.now().isoformat(),
+            "base_url": self.base_url,
+            "dataset": self.dataset,
+            "environment": environment(),
+            "options": {
+                "concurrency": self.concurrency, "requests": self.requests, "warmup": self.warmup,
+                "files_per_request": self.files_per_request, "seed": self.seed,
+            },
+            "scenarios": results,
+        }
+
+
+# ==============
+# 💾 结果
+# ==============
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "host": socket.gethostname(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(results, fp, ensure_ascii=False, indent=2)
+    return path
+
+
+def default_results_path():
+    return os.path.join(settings.BASE_DIR, "benchmark_results", timezone.now().strftime("%Y%m%d-%H%M%S") + ".json")
+
+
+def _change(before, after):
+    if before is None or after is None:
+        return "-"
+    if not before:
+        return f"{before} → {after}"
+    return f"{before} → {after}（{(after - before) / before:+.0%}）"
+
+
+def compare(previous, current):
+    """两次结果中共同场景的 p50 / p95 / p99 与吞吐量对比，返回文本行"""
+    lines = []
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        lines.append(f"{name}:")
+        for key in ("p50", "p95", "p99"):
+            lines.append(f"  {key} {_change(before['latency_ms'][key], result['latency_ms'][key])} ms")
+        lines.append(f"  吞吐量 {_change(before['throughput_rps'], result['throughput_rps'])} req/s")
+    return lines
@@ -0,0 +1,155 @@
+# candidates/benchmark/stub_ai.py
+"""
+本地模拟 DashScope（OpenAI 兼容）chat/completions 接口
+
+把 AI_API_URL 指向 http://<host>:<port>/compatible-mode/v1/chat/completions（路径不限）即可，
+同时建议 AI_PARSE_CACHE_ENABLED=False，否则重复上传同一份简历不会再调用接口。
+
+- 延迟：每次请求 latency_ms ± jitter_ms（正态分布，不小于 0）
+- 错误：rate_limit_rate 比例的请求返回 429（带 Retry-After），error_rate 比例返回 500
+- 响应：按 corpus 生成的「标签：值」格式从简历文本中提取字段，其它 PDF 只识别电话和邮箱
+- GET /stats：各状态码的请求数
+"""
+import json
+import re
+import time
+import random
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..experience import is_education_related
+from ..ingestion import EMAIL_RE, PHONE_RE
+
+RESUME_MARKER = "以下是简历文本："
+LABEL_FIELDS = {
+    "姓名": "name", "性别": "gender", "年龄": "age", "电话": "phone", "邮箱": "email", "学历": "degree",
+    "专业": "major", "毕业院校": "university", "毕业时间": "graduation_date", "所在地": "base",
+}
+LABEL_RE = re.compile(rf"({'|'.join(LABEL_FIELDS)})：\s*(\S+)")
+EXPERIENCE_RE = re.compile(r"^(\d{4}-\d{2}) - (\S+)\s+(\S+)\s+(\S+)\s*$", re.MULTILINE)
+
+
+def parse_resume(text):
+    """简历文本 → 与 ingestion.PROMPT_TEMPLATE 约定一致的结果"""
+    data = {field: "" for field in LABEL_FIELDS.values()}
+    for label, value in LABEL_RE.findall(text):
+        data[LABEL_FIELDS[label]] = value
+    if not data["phone"]:
+        match = PHONE_RE.search(text)
+        data["phone"] = match.group(1) if match else ""
+    if not data["email"]:
+        match = EMAIL_RE.search(text)
+        data["email"] = match.group(0) if match else ""
+    data["name"] = data["name"] or "未知"
+
+    data["experience"] = []
+    for start, end, company, position in EXPERIENCE_RE.findall(text):
+        data["experience"].append({
+            "company": company,
+            "position": position,
+            "start_date": start,
+            "end_date": end,
+            "description": f"负责{position}相关工作",
+        })
+
+    education = sum(is_education_related(item["company"], item["position"]) for item in data["experience"])
+    if education:
+        score = "A" if education >= 2 else "C"
+    elif data["experience"]:
+        score = "B" if len(data["experience"]) >= 2 else "D"
+    else:
+        score = "E"
+    return {"data": data, "score": score}
+
+
+class StubAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=800, jitter_ms=200, error_rate=0.0, rate_limit_rate=0.0, seed=None):
+        super().__init__(address, StubAIHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.counts = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/compatible-mode/v1/chat/completions"
+
+    def draw(self):
+        """(延迟秒数, 状态码)"""
+        with self._lock:
+            delay = max(self._rng.gauss(self.latency_ms, self.jitter_ms), 0) / 1000
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return delay, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, 200
+
+    def count(self, status):
+        with self._lock:
+            self.counts[status] += 1
+
+
+class StubAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 保持连接，与 AIClient 的连接池配合
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            prompt = payload["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            self._send_json(400, {"error": {"message": "invalid request"}})
+            return
+
+        delay, status = self.server.draw()
+        time.sleep(delay)
+        if status == 429:
+            self._send_json(429, {"error": {"message": "rate limited"}}, {"Retry-After": "1"})
+            return
+        if status != 200:
+            self._send_json(status, {"error": {"message": "stub error"}})
+            return
+
+        content = json.dumps(parse_resume(prompt.split(RESUME_MARKER)[-1]), ensure_ascii=False)
+        self._send_json(200, {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"total_tokens": len(prompt) // 2 + len(content) // 2},
+        })
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/stats":
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        with self.server._lock:
+            counts = {str(status): count for status, count in sorted(self.server.counts.items())}
+        self._send_json(200, {"requests": sum(self.server.counts.values()), "status": counts})
+
+    def _send_json(self, status, payload, headers=None):
+        if self.command == "POST":
+            self.server.count(status)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(host="127.0.0.1", port=0, **options):
+    """在后台线程中启动（port=0 时随机端口），返回 StubAIServer；用完调用 shutdown()"""
+    server = StubAIServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="stub-ai", daemon=True).start()
+    return server
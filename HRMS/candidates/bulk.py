@@ -0,0 +1,162 @@
+# candidates/bulk.py
+"""
+批量写入
+
+- bulk_update_candidates：按 id 列表或筛选条件批量修改评分、合作状态。变更只校验一次，
+  在同一事务中用 QuerySet.update() 写入（只改动值确实变化的行，并同步 updated_at），
+  统计缓存在事务提交后清除一次。update() 不触发 save 信号，因此只开放不影响检索文档和工作经历的字段。
+- insert_rows / update_rows：批量导入等大批量写入使用的 executemany。Django 5.0 的
+  bulk_create / bulk_update 对每个值都调用 pre_save、get_db_prep_save 并经过线程局部的
+  connection 代理（bulk_update 还会生成 CASE WHEN），每秒只能写入一两千行；
+  这里按字段类型预先选好转换函数，同样不触发信号，也不处理 auto_now。
+"""
+from functools import lru_cache
+
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+from . import events, stats
+from .filters import filter_candidates, normalize_filters
+from .models import Candidate
+
+BULK_FIELDS = ('match_level', 'cooperation_status')
+BULK_MAX_IDS = 5000
+ID_CHUNK_SIZE = 500  # SQLite 单条语句的参数个数有限制
+
+
+class BulkUpdateError(Exception):
+    """请求不合法"""
+
+
+def _chunks(items, size=ID_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _parse_ids(ids):
+    try:
+        ids = list(dict.fromkeys(int(value) for value in ids))
+    except (TypeError, ValueError):
+        raise BulkUpdateError("ids 必须是整数数组")
+    if not ids:
+        raise BulkUpdateError("ids 不能为空")
+    if len(ids) > BULK_MAX_IDS:
+        raise BulkUpdateError(f"一次最多修改 {BULK_MAX_IDS} 位候选人")
+    return ids
+
+
+def bulk_update_candidates(changes, ids=None, filters=None):
+    """
+    changes 为已校验的字段变更；ids 与 filters 二选一。
+    返回 {matched, updated, unchanged, not_found, results: [{id, status}]}
+    """
+    fields = list(changes)
+    if ids is not None:
+        ids = _parse_ids(ids)
+        targets = ids
+    else:
+        filters = normalize_filters(filters or {})
+        if not filters:
+            raise BulkUpdateError("缺少 ids 或筛选条件")
+        targets = None
+
+    with transaction.atomic():
+        current = {}
+        if targets is not None:
+            for chunk in _chunks(targets):
+                for row in Candidate.objects.filter(id__in=chunk).values('id', *fields):
+                    current[row['id']] = row
+        else:
+            queryset = filter_candidates(Candidate.objects.all(), filters).order_by('id')
+            # 多取一行即可判断是否超限，筛选范围过大时不必读出整张表
+            rows = list(queryset.values('id', *fields)[:BULK_MAX_IDS + 1])
+            if len(rows) > BULK_MAX_IDS:
+                raise BulkUpdateError(f"筛选结果超过 {BULK_MAX_IDS} 位候选人，请缩小范围")
+            current = {row['id']: row for row in rows}
+            targets = list(current)
+
+        changed = [
+            candidate_id for candidate_id, row in current.items()
+            if any(row[field] != value for field, value in changes.items())
+        ]
+        now = timezone.now()
+        for chunk in _chunks(changed):
+            Candidate.objects.filter(id__in=chunk).update(updated_at=now, **changes)
+        if changed:
+            transaction.on_commit(stats.invalidate)
+            events.publish('candidates', 'updated', ids=changed)
+
+    changed_set = set(changed)
+    results = []
+    for candidate_id in targets:
+        if candidate_id not in current:
+            status = 'not_found'
+        elif candidate_id in changed_set:
+            status = 'updated'
+        else:
+            status = 'unchanged'
+        results.append({'id': candidate_id, 'status': status})
+
+    return {
+        'matched': len(current),
+        'updated': len(changed),
+        'unchanged': len(current) - len(changed),
+        'not_found': [item['id'] for item in results if item['status'] == 'not_found'],
+        'results': results,
+    }
+
+
+# ==============
+# 🚀 executemany 批量写入
+# ==============
+def _adapters(model, field_names, connection):
+    """日期时间列的转换函数；同一批数据里时间戳、日期大量重复，做缓存"""
+    adapters = []
+    for name in field_names:
+        field = model._meta.get_field(name)
+        if isinstance(field, models.DateTimeField):
+            adapters.append(lru_cache(maxsize=1024)(connection.ops.adapt_datetimefield_value))
+        elif isinstance(field, models.DateField):
+            adapters.append(lru_cache(maxsize=1024)(connection.ops.adapt_datefield_value))
+        else:
+            adapters.append(None)
+    return adapters
+
+
+def _prepare(row, adapters):
+    return [value if adapt is None else adapt(value) for adapt, value in zip(adapters, row)]
+
+
+def insert_rows(model, field_names, rows):
+    """rows 为与 field_names 对应的值序列；值需已是字段的 Python 类型（外键传 id）"""
+    rows = list(rows)
+    if not rows:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(name).column) for name in field_names)
+    placeholders = ", ".join(["%s"] * len(field_names))
+    adapters = _adapters(model, field_names, connection)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})",
+            [_prepare(row, adapters) for row in rows],
+        )
+    return len(rows)
+
+
+def update_rows(model, field_names, rows):
+    """按主键更新：rows 为 (pk, 与 field_names 对应的值...) 序列"""
+    rows = list(rows)
+    if not rows:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    assignments = ", ".join(f"{quote(model._meta.get_field(name).column)} = %s" for name in field_names)
+    adapters = _adapters(model, field_names, connection)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {quote(model._meta.db_table)} SET {assignments} WHERE {quote(model._meta.pk.column)} = %s",
+            [_prepare(values, adapters) + [pk] for pk, *values in rows],
+        )
+    return len(rows)
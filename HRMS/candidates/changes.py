@@ -0,0 +1,118 @@
+# candidates/changes.py
+"""
+候选人增量同步（change feed）
+
+客户端保存上次返回的 cursor，下次带 ?since=cursor 只取此后新增 / 修改的候选人及已删除的 id，
+代价与变更量成正比，不必重新下载整个人才库。
+
+- 变更按 (updated_at, id) 顺序读取，走 candidate_updated_idx；一页放不下时 has_more=true，
+  cursor 指向本页最后一行，继续请求即可。翻页 cursor 同时记录本轮同步的起点
+  （增量同步为原 since，全量同步为第一页的请求时间）
+- 删除写入 CandidateTombstone（post_delete 信号），保留 CANDIDATE_TOMBSTONE_RETENTION_DAYS 天；
+  同步起点早于保留期时返回 410，客户端需重新全量同步。翻页 cursor 按起点判断，
+  全量同步翻到很早的数据时不会因为最后一行的 updated_at 过期
+- 读完所有变更后，新 cursor 取「当前时间 - CANDIDATE_SYNC_OVERLAP_SECONDS」：
+  updated_at 在事务提交前就已确定，且多台服务器时钟可能有偏差，留出重叠窗口避免漏掉变更，
+  代价是窗口内的行可能重复返回（客户端按 id 覆盖即可）
+- 不带 since 时从头返回全部候选人（不含删除记录），用于首次同步
+
+所有绕过 save 的批量写入（bulk.py、importer.py、cooperation.py）都会同步 updated_at。
+收藏状态按用户区分，不改变 updated_at，需由客户端自行维护。
+"""
+import base64
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Candidate, CandidateTombstone
+
+logger = logging.getLogger(__name__)
+
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 2000
+
+
+class SyncCursorError(Exception):
+    """cursor 无法解析"""
+
+
+class SyncCursorExpired(SyncCursorError):
+    """cursor 早于删除记录的保留期，无法保证增量完整"""
+
+
+def encode_cursor(timestamp, last_id=0, origin=None):
+    """origin 只出现在翻页 cursor 中，为本轮同步的起点"""
+    parts = [timestamp.isoformat(), str(last_id)]
+    if origin is not None:
+        parts.append(origin.isoformat())
+    return base64.urlsafe_b64encode("|".join(parts).encode()).decode().rstrip("=")
+
+
+def decode_cursor(value):
+    """cursor → (timestamp, last_id, origin)；同步结束时返回的 cursor 没有 origin"""
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        timestamp, last_id, *origin = raw.split("|")
+        if len(origin) > 1:
+            raise ValueError(raw)
+        timestamp = datetime.fromisoformat(timestamp)
+        last_id = int(last_id)
+        origin = datetime.fromisoformat(origin[0]) if origin else None
+    except ValueError:
+        raise SyncCursorError("cursor 无效")
+    if timezone.is_naive(timestamp) or (origin is not None and timezone.is_naive(origin)):
+        raise SyncCursorError("cursor 无效")
+    return timestamp, last_id, origin
+
+
+def record_deletions(candidate_ids):
+    CandidateTombstone.objects.bulk_create(
+        [CandidateTombstone(candidate_id=candidate_id) for candidate_id in candidate_ids]
+    )
+
+
+def changes_since(since=None, limit=SYNC_PAGE_SIZE, queryset=None):
+    """
+    返回 {changed: [Candidate], deleted: [id], cursor, has_more}
+    queryset 可传入已裁剪列（only）的候选人 queryset，需包含 updated_at
+    """
+    now = timezone.now()
+    queryset = (Candidate.objects.all() if queryset is None else queryset).order_by("updated_at", "id")
+    start = None
+    origin = now  # 全量同步：只需关心同步开始之后的删除
+    if since:
+        start, last_id, origin = decode_cursor(since)
+        origin = origin or start
+        if origin < now - timedelta(days=settings.CANDIDATE_TOMBSTONE_RETENTION_DAYS):
+            raise SyncCursorExpired("cursor 已过期，请重新全量同步")
+        queryset = queryset.filter(Q(updated_at__gt=start) | Q(updated_at=start, id__gt=last_id))
+
+    changed = list(queryset[:limit + 1])
+    has_more = len(changed) > limit
+    changed = changed[:limit]
+
+    deleted = []
+    if start is not None:
+        tombstones = CandidateTombstone.objects.filter(deleted_at__gte=max(start, origin))
+        if has_more:
+            tombstones = tombstones.filter(deleted_at__lte=changed[-1].updated_at)
+        deleted = sorted(set(tombstones.values_list("candidate_id", flat=True)))
+
+    if has_more:
+        cursor = encode_cursor(changed[-1].updated_at, changed[-1].id, origin)
+    else:
+        cursor = encode_cursor(now - timedelta(seconds=settings.CANDIDATE_SYNC_OVERLAP_SECONDS))
+    return {"changed": changed, "deleted": deleted, "cursor": cursor, "has_more": has_more}
+
+
+def prune_tombstones(retention_days=None):
+    """删除超过保留期的删除记录"""
+    retention_days = settings.CANDIDATE_TOMBSTONE_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    removed = CandidateTombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
+    if removed:
+        logger.info("🧹 清理过期候选人删除记录 %s 条", removed)
+    return removed
@@ -0,0 +1,78 @@
+# candidates/cooperation.py
+"""
+候选人合作情况汇总
+
+Candidate 上冗余保存合作次数、最近合作时间、最好 / 最差合作结果和最近的项目，
+列表可以直接按这些列筛选、排序（有索引），不必逐行统计合作记录。
+合作记录增删改时由信号在同一事务内重新汇总（见 CooperationRecord.save）。
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import events
+from .models import Candidate, CooperationRecord
+
+# 合作结果从好到差
+RESULT_RANK = {'优秀': 4, '良好': 3, '一般': 2, '不再合作': 1}
+ROLLUP_FIELDS = (
+    'cooperation_count', 'last_cooperation_date', 'best_cooperation_result',
+    'worst_cooperation_result', 'latest_project',
+)
+
+
+def rollup_fields(records):
+    """records 为 (project_name, start_date, cooperation_result, id) 序列，返回汇总字段"""
+    records = list(records)
+    if not records:
+        return {
+            'cooperation_count': 0,
+            'last_cooperation_date': None,
+            'best_cooperation_result': '',
+            'worst_cooperation_result': '',
+            'latest_project': '',
+        }
+    latest = max(records, key=lambda r: (r[1], r[3]))
+    ranked = [r[2] for r in records if r[2] in RESULT_RANK]
+    return {
+        'cooperation_count': len(records),
+        'last_cooperation_date': latest[1],
+        'best_cooperation_result': max(ranked, key=RESULT_RANK.get, default=''),
+        'worst_cooperation_result': min(ranked, key=RESULT_RANK.get, default=''),
+        'latest_project': latest[0],
+    }
+
+
+def refresh_rollups(*candidate_ids):
+    """
+    重新汇总指定候选人的合作情况。先锁住候选人行，
+    同一候选人的并发写入依次汇总，不会互相覆盖。
+    """
+    candidate_ids = {pk for pk in candidate_ids if pk}
+    if not candidate_ids:
+        return
+    with transaction.atomic():
+        locked = Candidate.objects.select_for_update().filter(id__in=candidate_ids).order_by('id')
+        current = {row.pop('id'): row for row in locked.values('id', *ROLLUP_FIELDS)}
+        records = {pk: [] for pk in current}
+        rows = CooperationRecord.objects.filter(candidate_id__in=list(current)).values_list(
+            'candidate_id', 'project_name', 'start_date', 'cooperation_result', 'id'
+        )
+        for candidate_id, *record in rows:
+            records[candidate_id].append(record)
+        now = timezone.now()
+        changed = []
+        for candidate_id, items in records.items():
+            fields = rollup_fields(items)
+            if fields != current[candidate_id]:
+                Candidate.objects.filter(id=candidate_id).update(updated_at=now, **fields)
+                changed.append(candidate_id)
+        if changed:
+            events.publish('candidates', 'updated', ids=changed)
+
+
+def rebuild_rollups(chunk_size=1000):
+    """重算全部候选人的汇总字段（导入历史合作记录等绕过信号的操作之后执行）"""
+    ids = list(Candidate.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        refresh_rollups(*ids[start:start + chunk_size])
+    return len(ids)
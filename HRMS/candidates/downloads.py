@@ -0,0 +1,97 @@
+# candidates/downloads.py
+"""
+支持 HTTP Range 的文件下载（断点续传、分段下载）
+
+只处理单个区间 bytes=start-end / bytes=start- / bytes=-suffix；
+多区间请求按完整文件返回。If-Range 与 ETag/Last-Modified 不一致时同样返回完整文件。
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(stat):
+    return f'"{int(stat.st_mtime)}-{stat.st_size}"'
+
+
+def _parse_range(header, size):
+    """返回 (start, end)（含 end）；无法满足时返回 None；格式不支持时返回 False"""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return False
+    start, end = match.groups()
+    if not start and not end:
+        return False
+    if not start:
+        length = int(end)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+class _RangeReader:
+    """只读出文件的 [start, start + length) 区间"""
+
+    def __init__(self, fp, start, length, block_size=64 * 1024):
+        self.fp = fp
+        self.remaining = length
+        self.block_size = block_size
+        fp.seek(start)
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.fp.read(min(self.block_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.fp.close()
+
+
+def ranged_file_response(request, path, content_type, filename):
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = _etag(stat)
+
+    range_header = request.META.get("HTTP_RANGE", "")
+    if_range = request.META.get("HTTP_IF_RANGE", "").strip()
+    if range_header and if_range:
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            fresh = if_range == etag
+        else:
+            modified = parse_http_date_safe(if_range)
+            fresh = modified is not None and int(stat.st_mtime) <= modified
+        if not fresh:
+            range_header = ""
+
+    byte_range = _parse_range(range_header, size) if range_header else False
+    if byte_range is None:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is False:
+        response = FileResponse(open(path, "rb"), content_type=content_type, as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _RangeReader(open(path, "rb"), start, length), status=206, content_type=content_type
+        )
+        response["Content-Length"] = str(length)
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return response
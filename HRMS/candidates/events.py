@@ -0,0 +1,311 @@
+# candidates/events.py
+"""
+变更推送（Server-Sent Events）
+
+候选人、合作记录、收藏的增删改及统计变化以事件形式推送给已打开的页面，
+页面收到事件后按增量接口（changes.py）拉取变化的部分，不再反复全量 GET。
+
+- publish()：事务提交后发布事件，回滚的修改不会推送；推送失败只记日志，不影响写入
+- 进程内由 Hub 分发给订阅的连接，每个连接一个有界队列，消费不及时溢出时通知客户端重新同步
+- 跨进程由可替换的后端（settings.EVENT_BACKEND）负责：
+  - LocalBackend：发布与订阅在同一进程（开发环境、单进程部署、测试）
+  - DatabaseBackend：事件写入 ChangeEvent 表，推送服务每个进程一个线程按 id 轮询后在进程内分发，
+    多个 gunicorn / worker 进程写入的事件也能送达；事件只是「有变化」的通知，偶尔漏掉
+    （如 MySQL 自增 id 乱序提交）时，客户端下一次同步仍会拿到全部变更
+- EventStream：SSE 响应内容，ASGI 下为异步迭代（不占线程），WSGI 下为同步迭代（开发用）
+
+事件格式：{"channel": "candidates", "action": "updated", "ids": [1, 2], "at": 提交时间戳}；
+收藏事件只推送给收藏人本人；统计频道推送发生变化的统计项。
+统计事件合并处理：本进程缓存的统计晚于事件提交时间时直接使用，否则重新计算，
+重新计算最多每 EVENT_STATS_INTERVAL 秒一次，批量导入时数百条事件只触发几次全表聚合。
+"""
+import json
+import queue
+import time
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ('candidates', 'cooperations', 'favorites', 'stats')
+SUBSCRIBER_QUEUE_SIZE = 1000
+EVENT_POLL_BATCH = 500
+
+
+# ==============
+# 📮 发布
+# ==============
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.EVENT_BACKEND)()
+
+
+def publish(channel, action, **data):
+    """事务提交后发布事件（不在事务中时立即发布），at 为提交时间"""
+    event = {'channel': channel, 'action': action, **data}
+    transaction.on_commit(lambda: _send({**event, 'at': time.time()}))
+
+
+def _send(event):
+    try:
+        get_backend().publish(event)
+    except Exception:
+        logger.exception("❌ 推送事件失败：%s", event.get('channel'))
+
+
+# ==============
+# 📡 进程内分发
+# ==============
+class Subscription:
+    """
+    单个连接的事件队列。事件可能在任意线程分发：
+    异步连接通过 call_soon_threadsafe 放入所属事件循环的 asyncio.Queue，同步连接使用 queue.Queue。
+    """
+
+    def __init__(self, channels, loop=None):
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self.overflowed = False
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE) if loop else queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        if self.loop is None:
+            self._put(event)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # 事件循环已关闭，连接随之结束
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except (asyncio.QueueFull, queue.Full):
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Hub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def add(self, subscription):
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+    def remove(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, event):
+        with self._lock:
+            targets = [s for s in self._subscriptions if event.get('channel') in s.channels]
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+
+# ==============
+# 🔌 后端
+# ==============
+class LocalBackend:
+    """进程内发布订阅：只有同一进程内的连接能收到事件"""
+
+    def __init__(self):
+        self.hub = Hub()
+
+    def publish(self, event):
+        self.hub.dispatch(event)
+
+    def subscribe(self, channels, loop=None):
+        subscription = Subscription(channels, loop)
+        self.hub.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.hub.remove(subscription)
+
+
+class DatabaseBackend(LocalBackend):
+    """跨进程：事件写入 ChangeEvent 表，有订阅的进程启动一个轮询线程转发新事件"""
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, event):
+        ChangeEvent.objects.create(channel=event['channel'], payload=event)
+
+    def subscribe(self, channels, loop=None):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="change-event-listener", daemon=True)
+                self._listener.start()
+        return super().subscribe(channels, loop)
+
+    def _listen(self):
+        last_id = None
+        while True:
+            try:
+                if last_id is None:
+                    last_id = ChangeEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+                rows = list(
+                    ChangeEvent.objects.filter(id__gt=last_id).order_by('id')
+                    .values_list('id', 'payload')[:EVENT_POLL_BATCH]
+                )
+            except DatabaseError:
+                logger.exception("❌ 读取变更事件失败")
+                rows = []
+            finally:
+                close_old_connections()
+            for event_id, payload in rows:
+                last_id = event_id
+                self.hub.dispatch(payload)
+            if len(rows) < EVENT_POLL_BATCH:
+                time.sleep(settings.EVENT_POLL_INTERVAL)
+
+
+def prune_events(max_age_hours=None):
+    """删除 DatabaseBackend 中超过保留时长的事件"""
+    max_age_hours = settings.EVENT_RETENTION_HOURS if max_age_hours is None else max_age_hours
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    return ChangeEvent.objects.filter(created_at__lt=cutoff).delete()[0]
+
+
+# ==============
+# 🌊 SSE 响应
+# ==============
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class EventStream:
+    """
+    一个 SSE 连接：先推送 retry 间隔（订阅统计时附带当前统计），之后逐条转发事件，
+    空闲时每 EVENT_HEARTBEAT_SECONDS 发送注释行保活，连接满 EVENT_STREAM_MAX_SECONDS 后关闭，由浏览器自动重连。
+    """
+
+    _stats_lock = threading.Lock()
+    _stats_refresh_after = 0  # 同一进程内的连接共用：早于该时刻（monotonic）不再重新计算统计
+
+    def __init__(self, channels, user_id=None, backend=None):
+        self.channels = frozenset(channels)
+        self.user_id = user_id
+        self.backend = backend or get_backend()
+        self.last_stats = {}
+        self.stats_pending_at = None  # 尚未推送的 stats 事件中最晚的提交时间
+
+    def _mark_stats(self, event):
+        at = event.get('at', float('inf'))
+        self.stats_pending_at = max(self.stats_pending_at or at, at)
+
+    def _stats_changes(self):
+        """
+        与上次推送相比发生变化的统计项；需要重新计算但未到 EVENT_STATS_INTERVAL 时返回 None，稍后再试。
+        发布事件的进程清除的是它自己的缓存，本进程的缓存早于事件提交时间时重新计算
+        """
+        from .stats import get_stats
+
+        with EventStream._stats_lock:
+            entry = get_stats()
+            if self.stats_pending_at is not None and entry.get('computed_at', 0) < self.stats_pending_at:
+                if time.monotonic() < EventStream._stats_refresh_after:
+                    return None
+                entry = get_stats(refresh=True)
+                EventStream._stats_refresh_after = time.monotonic() + settings.EVENT_STATS_INTERVAL
+        self.stats_pending_at = None
+        data = entry['data']
+        changed = {key: value for key, value in data.items() if self.last_stats.get(key) != value}
+        self.last_stats = data
+        return changed
+
+    def _wait_timeout(self):
+        """有待推送的统计时，等到允许重新计算为止"""
+        if self.stats_pending_at is None:
+            return settings.EVENT_HEARTBEAT_SECONDS
+        wait = EventStream._stats_refresh_after - time.monotonic()
+        return min(max(wait, 0), settings.EVENT_HEARTBEAT_SECONDS)
+
+    def _visible(self, event):
+        return event.get('channel') != 'favorites' or event.get('user_id') == self.user_id
+
+    def _overflow(self, subscription):
+        if subscription.overflowed:
+            subscription.overflowed = False
+            return format_event('resync', {})
+        return None
+
+    def __iter__(self):
+        subscription = self.backend.subscribe(self.channels)
+        deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+        try:
+            yield f"retry: {settings.EVENT_RETRY_MS}\n\n"
+            if 'stats' in self.channels:
+                yield format_event('stats', self._stats_changes())
+            while time.monotonic() < deadline:
+                event = subscription.get(self._wait_timeout())
+                message = self._overflow(subscription)
+                if message:
+                    yield message
+                if event is not None and event['channel'] == 'stats':
+                    self._mark_stats(event)
+                elif event is not None and self._visible(event):
+                    yield format_event(event['channel'], event)
+                changed = self._stats_changes() if self.stats_pending_at is not None else None
+                if changed:
+                    yield format_event('stats', changed)
+                elif event is None:
+                    yield ": ping\n\n"
+        finally:
+            self.backend.unsubscribe(subscription)
+
+    async def __aiter__(self):
+        subscription = self.backend.subscribe(self.channels, loop=asyncio.get_running_loop())
+        stats_changes = sync_to_async(self._stats_changes)
+        deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+        try:
+            yield f"retry: {settings.EVENT_RETRY_MS}\n\n"
+            if 'stats' in self.channels:
+                yield format_event('stats', await stats_changes())
+            while time.monotonic() < deadline:
+                event = await subscription.aget(self._wait_timeout())
+                message = self._overflow(subscription)
+                if message:
+                    yield message
+                if event is not None and event['channel'] == 'stats':
+                    self._mark_stats(event)
+                elif event is not None and self._visible(event):
+                    yield format_event(event['channel'], event)
+                changed = await stats_changes() if self.stats_pending_at is not None else None
+                if changed:
+                    yield format_event('stats', changed)
+                elif event is None:
+                    yield ": ping\n\n"
+        finally:
+            self.backend.unsubscribe(subscription)
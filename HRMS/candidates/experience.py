@@ -0,0 +1,112 @@
+# candidates/experience.py
+"""
+工作经历结构化
+
+Candidate.experience 仍保存 AI 返回的经历列表（前端沿用），保存候选人时由信号
+拆分为 Experience 行：公司、职位、起止月份、时长、是否教育相关。
+进行中的经历按同步时的日期计算时长，可定期执行 rebuild_experiences 刷新。
+"""
+import re
+from datetime import date
+
+from .bulk import insert_rows
+from .models import Candidate, Experience
+from .utils import parse_experience
+
+EDUCATION_KEYWORDS = (
+    "教育", "教师", "老师", "助教", "教练", "培训", "讲师", "教研", "课程", "辅导", "家教", "授课", "教学",
+    "学校", "中学", "小学", "幼儿园", "学而思", "新东方",
+    "teacher", "teaching", "tutor", "instructor", "lecturer", "education", "school", "academy",
+)
+CURRENT_WORDS = ("至今", "现在", "目前", "今", "present", "now", "current")
+
+MONTH_RE = re.compile(r"(\d{4})\s*(?:[-/.年]\s*(\d{1,2}))?")
+
+
+def parse_month(value):
+    """'2020-09' / '2020.9' / '2020年9月' / '2020' → 当月 1 日；无法识别返回 None"""
+    match = MONTH_RE.search(str(value or ""))
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2) or 1)
+    if not 1900 <= year <= 2100 or not 1 <= month <= 12:
+        return None
+    return date(year, month, 1)
+
+
+def months_between(start, end):
+    """首尾月份都计入，如 2020-01 ~ 2020-06 为 6 个月"""
+    if not start or not end or end < start:
+        return 0
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
+
+def is_education_related(*texts):
+    text = " ".join(str(t) for t in texts if t).lower()
+    return any(keyword in text for keyword in EDUCATION_KEYWORDS)
+
+
+def experience_fields(raw, today=None):
+    """把原始经历列表转换为 Experience 的字段字典列表"""
+    today = today or date.today()
+    rows = []
+    for order, item in enumerate(parse_experience(raw)):
+        company = str(item.get("company") or "").strip()[:200]
+        position = str(item.get("position") or "").strip()[:200]
+        description = str(item.get("description") or "").strip()
+        start = parse_month(item.get("start_date"))
+        end_text = str(item.get("end_date") or "").strip().lower()
+        is_current = any(word in end_text for word in CURRENT_WORDS)
+        end = None if is_current else parse_month(end_text)
+        rows.append({
+            "order": order,
+            "company": company,
+            "position": position,
+            "start_date": start,
+            "end_date": end,
+            "is_current": is_current,
+            "months": months_between(start, today if is_current else end),
+            "is_education": is_education_related(company, position, description),
+            "description": description,
+        })
+    return rows
+
+
+def sync_experiences(candidate):
+    """按 Candidate.experience 重建该候选人的经历行"""
+    Experience.objects.filter(candidate_id=candidate.pk).delete()
+    Experience.objects.bulk_create(
+        Experience(candidate_id=candidate.pk, **fields) for fields in experience_fields(candidate.experience)
+    )
+
+
+EXPERIENCE_FIELDS = (
+    "order", "company", "position", "start_date", "end_date", "is_current", "months", "is_education", "description",
+)
+
+
+def sync_experiences_many(candidates, replace=True):
+    """sync_experiences 的批量版本，用于批量导入等不触发 save 信号的写入之后；replace 含义同 index_candidates"""
+    candidates = list(candidates)
+    if replace:
+        Experience.objects.filter(candidate_id__in=[c.pk for c in candidates]).delete()
+    insert_rows(Experience, ("candidate",) + EXPERIENCE_FIELDS, [
+        (c.pk, *(fields[name] for name in EXPERIENCE_FIELDS))
+        for c in candidates for fields in experience_fields(c.experience)
+    ])
+
+
+def rebuild_experiences(chunk_size=1000):
+    """重建全部经历行（批量导入等绕过 save 信号的操作之后执行）"""
+    Experience.objects.all().delete()
+    total = 0
+    batch = []
+    for candidate in Candidate.objects.only("id", "experience").iterator(chunk_size=chunk_size):
+        batch.extend(
+            Experience(candidate_id=candidate.id, **fields) for fields in experience_fields(candidate.experience)
+        )
+        if len(batch) >= chunk_size:
+            Experience.objects.bulk_create(batch)
+            total, batch = total + len(batch), []
+    Experience.objects.bulk_create(batch)
+    return total + len(batch)
@@ -0,0 +1,374 @@
+# candidates/export.py
+"""
+候选人数据导出（流式 XLSX / gzip CSV / 列式）
+
+xlsx 是一个 zip 包，工作表本身是按行书写的 XML。这里直接以流的方式生成：
+- 候选人按 (-created_at, -id) 做 keyset 分批读取，每批 EXPORT_CHUNK_SIZE 行，
+  MySQL 下也不会把整张表读进内存
+- 每写完一批就把 zip 已压缩好的字节交给 StreamingHttpResponse，首字节无需等待全表
+- 列宽由前 EXPORT_WIDTH_SAMPLE_ROWS 行估算（中文按 2 个字符宽）
+
+因此内存占用与行数无关。CSV 与列式格式面向 BI，使用英文字段名和原始值。
+"""
+import re
+import io
+import csv
+import gzip
+import json
+import zipfile
+import unicodedata
+from xml.sax.saxutils import escape
+
+from django.db.models import Q
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_WIDTH_SAMPLE_ROWS = 500
+MAX_COLUMN_WIDTH = 50
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# (表头, 取值函数)
+CANDIDATE_COLUMNS = [
+    ("姓名", lambda c: c.name),
+    ("性别", lambda c: c.gender or ""),
+    ("年龄", lambda c: c.age),
+    ("电话", lambda c: c.phone),
+    ("邮箱", lambda c: c.email),
+    ("学历", lambda c: c.education),
+    ("专业", lambda c: c.major or ""),
+    ("毕业院校", lambda c: c.university or ""),
+    ("毕业时间", lambda c: str(c.graduation_date) if c.graduation_date else ""),
+    ("Base", lambda c: c.base),
+    ("合作状态", lambda c: c.cooperation_status),
+    ("匹配度", lambda c: c.match_level),
+    ("创建时间", lambda c: c.created_at.strftime("%Y-%m-%d %H:%M")),
+]
+CANDIDATE_EXPORT_FIELDS = (
+    "id", "name", "gender", "age", "phone", "email", "education", "major", "university",
+    "graduation_date", "base", "cooperation_status", "match_level", "created_at", "updated_at",
+)
+
+# 机器可读格式的列：(字段名, 类型)
+DATA_COLUMNS = [
+    ("id", "int"),
+    ("name", "str"),
+    ("gender", "str"),
+    ("age", "int"),
+    ("phone", "str"),
+    ("email", "str"),
+    ("education", "str"),
+    ("major", "str"),
+    ("university", "str"),
+    ("graduation_date", "date"),
+    ("base", "str"),
+    ("cooperation_status", "str"),
+    ("match_level", "str"),
+    ("created_at", "datetime"),
+    ("updated_at", "datetime"),
+]
+
+
+def iter_candidates(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """按 (-created_at, -id) keyset 分批遍历，走 candidate_created_idx 索引"""
+    queryset = queryset.only(*CANDIDATE_EXPORT_FIELDS).order_by("-created_at", "-id")
+    last = None
+    while True:
+        batch = queryset
+        if last is not None:
+            batch = batch.filter(Q(created_at__lt=last.created_at) | Q(created_at=last.created_at, id__lt=last.id))
+        batch = list(batch[:chunk_size])
+        yield from batch
+        if len(batch) < chunk_size:
+            return
+        last = batch[-1]
+
+
+def candidate_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    for candidate in iter_candidates(queryset, chunk_size):
+        yield [getter(candidate) for _, getter in CANDIDATE_COLUMNS]
+
+
+def candidate_records(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """按 DATA_COLUMNS 输出原始值，日期时间转为 ISO 8601 字符串"""
+    for candidate in iter_candidates(queryset, chunk_size):
+        row = []
+        for name, kind in DATA_COLUMNS:
+            value = getattr(candidate, name)
+            if value is not None and kind in ("date", "datetime"):
+                value = value.isoformat()
+            row.append(value)
+        yield row
+
+
+# ==============
+# 📄 流式 XLSX 写入
+# ==============
+ILLEGAL_XML_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+CONTENT_TYPES_XML = XML_HEADER + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+ROOT_RELS_XML = XML_HEADER + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+WORKBOOK_RELS_XML = XML_HEADER + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+# 样式 0：默认；样式 1：表头（加粗 + 金色填充 + 居中）
+STYLES_XML = XML_HEADER + (
+    f'<styleSheet xmlns="{MAIN_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FF000000"/><name val="Calibri"/></font></fonts>'
+    '<fills count="3"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFD4AF37"/><bgColor rgb="FFD4AF37"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="center"/></xf></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _workbook_xml(sheet_title):
+    name = escape(sheet_title, {'"': "&quot;"})
+    return XML_HEADER + (
+        f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+        f'<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def display_width(value):
+    """估算单元格显示宽度，全角字符按 2 计"""
+    if value is None:
+        return 0
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in str(value))
+
+
+def _cell(value, style=0):
+    style_attr = f' s="{style}"' if style else ""
+    if value is None or value == "":
+        return f"<c{style_attr}/>"
+    if isinstance(value, bool):
+        return f'<c{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c{style_attr}><v>{value}</v></c>"
+    text = escape(ILLEGAL_XML_CHARS_RE.sub("", str(value)))
+    return f'<c{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(values, style=0):
+    return "<row>" + "".join(_cell(value, style) for value in values) + "</row>"
+
+
+class _Sink:
+    """zipfile 的只写输出端，暂存已生成的字节供生成器取走"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_xlsx(headers, rows, sheet_title="Sheet1", sample_size=EXPORT_WIDTH_SAMPLE_ROWS):
+    """把 rows（可迭代的行列表）写成单工作表 xlsx，逐块产出字节"""
+    rows = iter(rows)
+    sample = []
+    for row in rows:
+        sample.append(row)
+        if len(sample) >= sample_size:
+            break
+
+    widths = [display_width(header) for header in headers]
+    for row in sample:
+        for index, value in enumerate(row):
+            widths[index] = max(widths[index], display_width(value))
+    cols = "".join(
+        f'<col min="{index}" max="{index}" width="{min(width + 2, MAX_COLUMN_WIDTH)}" customWidth="1"/>'
+        for index, width in enumerate(widths, 1)
+    )
+
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        archive.writestr("_rels/.rels", ROOT_RELS_XML)
+        archive.writestr("xl/workbook.xml", _workbook_xml(sheet_title))
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS_XML)
+        archive.writestr("xl/styles.xml", STYLES_XML)
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((
+                XML_HEADER + f'<worksheet xmlns="{MAIN_NS}">'
+                '<sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                '</sheetView></sheetViews>'
+                f"<cols>{cols}</cols><sheetData>" + _row(headers, style=1)
+            ).encode("utf-8"))
+
+            buffer = [_row(row) for row in sample]
+            sample = None
+            for row in rows:
+                buffer.append(_row(row))
+                if len(buffer) >= 1000:
+                    sheet.write("".join(buffer).encode("utf-8"))
+                    buffer = []
+                    data = sink.drain()
+                    if data:
+                        yield data
+            buffer.append("</sheetData></worksheet>")
+            sheet.write("".join(buffer).encode("utf-8"))
+    yield sink.drain()
+
+
+def candidate_xlsx(queryset):
+    headers = [header for header, _ in CANDIDATE_COLUMNS]
+    return stream_xlsx(headers, candidate_rows(queryset), sheet_title="候选人数据")
+
+
+# ==============
+# 💾 写入文件（后台导出任务使用）
+# ==============
+class _Counter:
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def write_xlsx(queryset, fp):
+    rows = _Counter(candidate_rows(queryset))
+    headers = [header for header, _ in CANDIDATE_COLUMNS]
+    for chunk in stream_xlsx(headers, rows, sheet_title="候选人数据"):
+        fp.write(chunk)
+    return rows.count
+
+
+def write_csv_gz(queryset, fp):
+    count = 0
+    with gzip.GzipFile(fileobj=fp, mode="wb") as archive:
+        with io.TextIOWrapper(archive, encoding="utf-8", newline="") as text:
+            writer = csv.writer(text)
+            writer.writerow([name for name, _ in DATA_COLUMNS])
+            for row in candidate_records(queryset):
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+COLUMNAR_FORMAT = "hrms-columnar"
+COLUMNAR_ROW_GROUP_SIZE = 10000
+
+
+def _encode_column(kind, values):
+    """低基数的字符串列做字典编码：dictionary 存取值，indices 存下标"""
+    if kind == "str":
+        dictionary = list(dict.fromkeys(values))
+        if len(dictionary) <= len(values) // 2:
+            positions = {value: index for index, value in enumerate(dictionary)}
+            return {"dictionary": dictionary, "indices": [positions[value] for value in values]}
+    return {"values": values}
+
+
+def write_columnar(queryset, fp, row_group_size=COLUMNAR_ROW_GROUP_SIZE):
+    """
+    gzip 压缩的 JSON Lines，按 Parquet 的思路分行组按列存储：
+    第一行为表头 {"format", "version", "columns"}，之后每行一个行组
+    {"rows": n, "columns": {字段名: {"values": [...]} | {"dictionary": [...], "indices": [...]}}}，
+    最后一行为 {"footer": {"rows", "row_groups"}}。读取见 read_columnar。
+    """
+    total = groups = 0
+
+    with gzip.GzipFile(fileobj=fp, mode="wb") as archive:
+        def emit(obj):
+            archive.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+
+        def flush(rows):
+            columns = {}
+            for index, (name, kind) in enumerate(DATA_COLUMNS):
+                columns[name] = _encode_column(kind, [row[index] for row in rows])
+            emit({"rows": len(rows), "columns": columns})
+
+        emit({
+            "format": COLUMNAR_FORMAT,
+            "version": 1,
+            "columns": [{"name": name, "type": kind} for name, kind in DATA_COLUMNS],
+        })
+        rows = []
+        for row in candidate_records(queryset):
+            rows.append(row)
+            if len(rows) >= row_group_size:
+                flush(rows)
+                total, groups, rows = total + len(rows), groups + 1, []
+        if rows:
+            flush(rows)
+            total, groups = total + len(rows), groups + 1
+        emit({"footer": {"rows": total, "row_groups": groups}})
+    return total
+
+
+def read_columnar(fp):
+    """读取列式导出文件，返回 {字段名: 值列表}"""
+    result = None
+    with gzip.GzipFile(fileobj=fp, mode="rb") as archive:
+        for line in archive:
+            block = json.loads(line)
+            if "format" in block:
+                result = {column["name"]: [] for column in block["columns"]}
+            elif "columns" in block:
+                for name, column in block["columns"].items():
+                    if "dictionary" in column:
+                        result[name].extend(column["dictionary"][i] for i in column["indices"])
+                    else:
+                        result[name].extend(column["values"])
+    return result
+
+
+# 格式 → (写入函数, 扩展名, Content-Type)
+EXPORT_WRITERS = {
+    "xlsx": (write_xlsx, "xlsx", XLSX_CONTENT_TYPE),
+    "csv": (write_csv_gz, "csv.gz", "application/gzip"),
+    "columnar": (write_columnar, "jsonl.gz", "application/gzip"),
+}
@@ -0,0 +1,147 @@
+# candidates/export_jobs.py
+"""
+后台导出任务
+
+接口只登记任务，文件由 run_ingestion_worker 在后台生成并保存到
+MEDIA_ROOT/exports/。缓存键 = sha256(格式 + 筛选条件 + 数据指纹)，
+数据指纹取筛选结果的 (行数, 最大 updated_at)：匹配的候选人有任何新增、
+修改或删除，指纹都会变化；未变化时直接复用已生成的文件。
+"""
+import os
+import json
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .export import EXPORT_WRITERS
+from .filters import filter_candidates, normalize_filters
+from .models import Candidate, ExportJob
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = "exports"
+
+
+def export_queryset(filters):
+    return filter_candidates(Candidate.objects.all(), filters)
+
+
+def data_fingerprint(queryset):
+    stats = queryset.order_by().aggregate(rows=Count("id"), last_updated=Max("updated_at"))
+    if stats["last_updated"]:
+        stats["last_updated"] = stats["last_updated"].isoformat()
+    return stats
+
+
+def make_cache_key(export_format, filters, fingerprint):
+    payload = json.dumps([export_format, filters, fingerprint], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _file_exists(job):
+    return bool(job.file) and job.file.storage.exists(job.file.name)
+
+
+def request_export(export_format, params, created_by=None):
+    """
+    返回 (job, reused)。数据未变化时复用已完成或进行中的同键任务，
+    否则新建一条待处理任务。
+    """
+    filters = normalize_filters(params)
+    key = make_cache_key(export_format, filters, data_fingerprint(export_queryset(filters)))
+
+    for job in ExportJob.objects.filter(cache_key=key, status__in=("pending", "running", "done")):
+        if job.status != "done" or _file_exists(job):
+            return job, True
+
+    job = ExportJob.objects.create(
+        format=export_format, filters=filters, cache_key=key, created_by=created_by
+    )
+    return job, False
+
+
+def requeue_stale_exports():
+    """回收崩溃进程遗留的任务：未超过最大重试次数的重新排队，否则标记失败"""
+    cutoff = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    stale = ExportJob.objects.filter(status="running", locked_at__lt=cutoff)
+    requeued = stale.filter(attempts__lt=settings.INGESTION_MAX_ATTEMPTS).update(
+        status="pending", worker=None, locked_at=None
+    )
+    stale.update(status="failed", error="处理超时", worker=None, finished_at=timezone.now())
+    return requeued
+
+
+def claim_next_export(worker_id):
+    """与 claim_next_task 相同，用带状态条件的 UPDATE 抢占任务"""
+    pending_ids = ExportJob.objects.filter(status="pending").order_by("id").values_list("id", flat=True)[:20]
+    for job_id in pending_ids:
+        claimed = ExportJob.objects.filter(id=job_id, status="pending").update(
+            status="running",
+            worker=worker_id,
+            locked_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return ExportJob.objects.get(id=job_id)
+    return None
+
+
+def run_export(job):
+    """
+    生成导出文件。开始前重新计算数据指纹，文件内容与最终的 cache_key 一致；
+    同一缓存键已有现成文件时直接引用。
+    """
+    writer, extension, _ = EXPORT_WRITERS[job.format]
+    queryset = export_queryset(job.filters)
+    fingerprint = data_fingerprint(queryset)
+    job.cache_key = make_cache_key(job.format, job.filters, fingerprint)
+
+    name = f"{EXPORT_DIR}/candidates_{job.cache_key[:20]}.{extension}"
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    try:
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{job.pk}.tmp"
+            try:
+                with open(temp_path, "wb") as fp:
+                    writer(queryset, fp)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        job.file.name = name
+        job.size = os.path.getsize(path)
+        job.row_count = fingerprint["rows"]
+        job.status = "done"
+        logger.info("✅ 导出完成：#%s %s（%s 行）", job.pk, name, job.row_count)
+    except Exception as e:
+        logger.exception("❌ 导出失败：#%s", job.pk)
+        job.status, job.error = "failed", str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["cache_key", "file", "size", "row_count", "status", "error", "finished_at"])
+    return job
+
+
+def prune_exports(max_age_hours=None):
+    """删除超过保留时长的导出任务；文件不再被其它任务引用时一并删除"""
+    max_age_hours = settings.EXPORT_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    if not max_age_hours:
+        return 0
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    expired = ExportJob.objects.filter(created_at__lt=cutoff).exclude(status__in=("pending", "running"))
+    names = {name for name in expired.values_list("file", flat=True) if name}
+    removed = expired.delete()[0]
+
+    still_used = set(ExportJob.objects.filter(file__in=names).values_list("file", flat=True))
+    for name in names - still_used:
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        if os.path.exists(path):
+            os.remove(path)
+    if removed:
+        logger.info("🧹 清理过期导出任务 %s 个", removed)
+    return removed
@@ -0,0 +1,188 @@
+# candidates/extraction.py
+"""
+PDF 文本提取服务
+
+pdfminer 是纯 Python 的 CPU 密集型解析，放在 ProcessPoolExecutor 中执行，
+批量上传时可以利用全部 CPU 核心。提示词只用到前几千字，因此解析在
+读满 max_pages 页或 max_chars 个字符后即停止；每个文件另有时间预算，
+避免个别异常 PDF 长时间占用进程。
+"""
+import io
+import mmap
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionError(Exception):
+    """PDF 无法解析"""
+
+
+class ExtractionTimeout(ExtractionError):
+    """超出单文件解析时间预算"""
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout("PDF 解析超时")
+
+
+def _open_source(source):
+    """source 为本地文件路径时用 mmap 只读映射，不再复制到临时文件；否则视为内存字节"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    with open(source, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _extract(source, max_pages, max_chars):
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    logging.getLogger("pdfminer").setLevel(logging.ERROR)
+
+    output = io.StringIO()
+    manager = PDFResourceManager(caching=True)
+    fp = _open_source(source)
+    try:
+        with TextConverter(manager, output, laparams=LAParams()) as device:
+            interpreter = PDFPageInterpreter(manager, device)
+            for page in PDFPage.get_pages(fp, maxpages=max_pages or 0):
+                interpreter.process_page(page)
+                if max_chars and output.tell() >= max_chars:
+                    break
+    finally:
+        fp.close()
+    return output.getvalue()
+
+
+def extract_pdf_text(source, max_pages=0, max_chars=0, timeout=0):
+    """
+    提取 PDF 文字，返回 (text, 耗时毫秒)。source 为本地文件路径或 PDF 字节。
+    在主线程（包括进程池子进程）中通过 SIGALRM 执行时间预算。
+    """
+    started = time.perf_counter()
+    use_alarm = (
+        bool(timeout)
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        text = _extract(source, max_pages, max_chars)
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"PDF 解析失败：{e}")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return text.strip(), round((time.perf_counter() - started) * 1000, 1)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    进程内共享的解析进程池；PDF_EXTRACT_PROCESSES 为 0 时在当前线程解析。
+    守护进程不能再创建子进程，此时同样退回当前线程解析。
+    """
+    global _pool
+    if not settings.PDF_EXTRACT_PROCESSES:
+        return None
+    if multiprocessing.current_process().daemon:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACT_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool(pool):
+    """
+    子进程卡死时丢弃任务所在的进程池，下次提交时重建。
+    进程池已被其它线程重建时不再处理，避免连带终止新进程池中的解析
+    """
+    global _pool
+    with _pool_lock:
+        if pool is None or _pool is not pool:
+            return
+        _pool = None
+    for process in list(getattr(pool, "_processes", {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """
+    进程退出前关闭解析进程池。multiprocessing 子进程退出时会等待全部子进程结束，
+    而 ProcessPoolExecutor 的退出钩子在 multiprocessing 子进程中不会执行，不关闭会一直阻塞。
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def submit(source):
+    """提交解析任务，返回结果为 (text, 耗时毫秒) 的 Future"""
+    args = (source, settings.PDF_EXTRACT_MAX_PAGES, settings.PDF_EXTRACT_MAX_CHARS, settings.PDF_EXTRACT_TIMEOUT)
+    pool = get_pool()
+    if pool is None:
+        future = Future()
+        try:
+            future.set_result(extract_pdf_text(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    future = pool.submit(extract_pdf_text, *args)
+    # 超时或进程异常退出时只重建提交时所用的进程池
+    future.executor = pool
+    return future
+
+
+def result(future):
+    """
+    等待解析结果；子进程未能自行中止时由父进程兜底超时。
+    排队中的任务不计时，只有开始执行后才计算宽限期。
+    """
+    grace = settings.PDF_EXTRACT_TIMEOUT + 5 if settings.PDF_EXTRACT_TIMEOUT else None
+    deadline = None
+    try:
+        while True:
+            try:
+                return future.result(timeout=1)
+            except FutureTimeoutError:
+                if grace is None or not future.running():
+                    continue
+                deadline = deadline or time.monotonic() + grace
+                if time.monotonic() > deadline:
+                    logger.error("⚠️ PDF 解析进程无响应，重建进程池")
+                    _reset_pool(getattr(future, "executor", None))
+                    raise ExtractionTimeout("PDF 解析超时")
+    except BrokenProcessPool:
+        logger.error("⚠️ PDF 解析进程异常退出，重建进程池")
+        _reset_pool(getattr(future, "executor", None))
+        raise ExtractionError("PDF 解析进程异常退出")
+
+
+def extract(source):
+    return result(submit(source))
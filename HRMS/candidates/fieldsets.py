@@ -0,0 +1,81 @@
+# candidates/fieldsets.py
+"""
+稀疏字段集（sparse fieldsets）
+
+- ?fields=id,name,match_level：只返回列出的字段
+- ?expand=experience：精简表示默认不含 Meta.heavy_fields 中的大字段，列出后才返回
+
+输出字段确定后，only_for_fields() 据此生成 .only()，未输出的列不会从数据库读取。
+"""
+
+FIELDSET_PARAMS = ('fields', 'expand')
+
+
+def parse_list(value):
+    """"a, b,c" → {"a", "b", "c"}；空值返回 None"""
+    names = {name.strip() for name in (value or '').split(',') if name.strip()}
+    return names or None
+
+
+def fieldset_context(request):
+    params = request.query_params
+    return {
+        'fields': parse_list(params.get('fields')),
+        'expand': parse_list(params.get('expand')) or set(),
+    }
+
+
+def wants_field(context, name):
+    fields = context.get('fields')
+    return fields is None or name in fields
+
+
+class SparseFieldsMixin:
+    """按 context 中的 fields / expand 裁剪序列化器字段"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested:
+            return {name: field for name, field in fields.items() if name in requested}
+
+        heavy = set(getattr(self.Meta, 'heavy_fields', ())) - set(self.context.get('expand') or ())
+        return {name: field for name, field in fields.items() if name not in heavy}
+
+
+def serializer_fields(serializer_class, context):
+    """不绑定数据，仅求出给定 context 下的输出字段"""
+    return serializer_class(context=context).fields
+
+
+def only_for_fields(queryset, fields, extra=()):
+    """
+    按序列化器输出字段裁剪查询列，extra 为额外需要的列（如游标分页的排序字段）。
+    source 为关联对象属性（如 candidate.name）时自动 select_related 并只取用到的列；
+    SerializerMethodField（source='*'）不占用列；反向一对多关系（如 experiences）自动 prefetch_related。
+    """
+    opts = queryset.model._meta
+    concrete = {field.name: field for field in opts.concrete_fields}
+    reverse = {rel.get_accessor_name() for rel in opts.related_objects}
+    columns = {opts.pk.name, *extra}
+    related = set()
+    prefetch = set()
+    for field in fields.values():
+        if field.source == '*':
+            continue
+        parts = field.source.split('.')
+        if parts[0] in reverse:
+            prefetch.add(parts[0])
+            continue
+        model_field = concrete.get(parts[0])
+        if model_field is None:
+            continue
+        columns.add(parts[0])
+        if len(parts) > 1 and model_field.is_relation:
+            related.add(parts[0])
+            columns.add('__'.join(parts))
+    if related:
+        queryset = queryset.select_related(*related)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset.only(*columns)
@@ -0,0 +1,180 @@
+# candidates/filters.py
+"""
+候选人列表的服务端筛选，参数与人才库页面的筛选项一一对应：
+
+- search：姓名 / 院校 / 专业 / 电话 / 邮箱 / 城市 / 工作经历 模糊搜索
+- match_level、cooperation_status、education、base：精确匹配，"all" 或空表示不过滤
+- age：年龄段 20-25、26-30、31-35、36+
+- has_education_experience：有教育相关工作经历（1/true）
+- worked_at：曾就职的公司/机构（前缀匹配，如「新东方」匹配「新东方教育科技集团」）
+- min_teaching_months：教育相关经历累计月数下限
+- min_cooperations：合作次数下限；cooperated_since：最近一次合作不早于该日期；
+  best_result：合作记录中最好的合作结果（优秀 / 良好 / 一般 / 不再合作）
+- ordering：recent_cooperation（最近合作在前）、cooperation_count（合作次数多的在前），默认按创建时间倒序
+
+经历相关条件基于 Experience 表的索引，以 id IN (子查询) 的形式过滤；
+合作相关条件直接使用 Candidate 上的汇总字段（见 cooperation.py）。
+
+合作记录列表的筛选见 filter_cooperations。
+"""
+from datetime import date
+
+from django.db.models import Q, Sum
+
+from .models import Experience
+from .utils import normalize_date, safe_int
+
+SEARCH_FIELDS = ('name', 'university', 'major', 'phone', 'email', 'base', 'experience')
+EXACT_FILTERS = ('match_level', 'cooperation_status', 'education', 'base')
+AGE_BUCKETS = {
+    '20-25': (20, 25),
+    '26-30': (26, 30),
+    '31-35': (31, 35),
+    '36+': (36, None),
+}
+EXPERIENCE_FILTERS = ('has_education_experience', 'worked_at', 'min_teaching_months')
+COOPERATION_FILTERS = ('min_cooperations', 'cooperated_since', 'best_result')
+FILTER_PARAMS = ('search',) + EXACT_FILTERS + ('age',) + EXPERIENCE_FILTERS + COOPERATION_FILTERS
+DEFAULT_ORDERING = ('-created_at', '-id')
+CANDIDATE_ORDERINGS = {
+    'recent_cooperation': ('-last_cooperation_date', '-id'),
+    'cooperation_count': ('-cooperation_count', '-id'),
+}
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def _value(params, key):
+    value = str(params.get(key) or '').strip()
+    return '' if value == 'all' else value
+
+
+def _date(params, key):
+    """2024-03-01 / 2024-03 / 2024年3月 → date；无法识别时忽略该条件"""
+    value = normalize_date(_value(params, key))
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def filter_candidates(queryset, params):
+    """按请求参数（QueryDict 或 dict）过滤候选人 queryset"""
+    search = _value(params, 'search')
+    if search:
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': search})
+        queryset = queryset.filter(condition)
+
+    for field in EXACT_FILTERS:
+        value = _value(params, field)
+        if value:
+            queryset = queryset.filter(**{field: value})
+
+    bucket = AGE_BUCKETS.get(_value(params, 'age'))
+    if bucket:
+        low, high = bucket
+        queryset = queryset.filter(age__gte=low)
+        if high is not None:
+            queryset = queryset.filter(age__lte=high)
+
+    if _value(params, 'has_education_experience').lower() in TRUE_VALUES:
+        queryset = queryset.filter(id__in=Experience.objects.filter(is_education=True).values('candidate_id'))
+
+    company = _value(params, 'worked_at')
+    if company:
+        # 前缀写成范围条件，SQLite / MySQL 都能走 experience_company_idx（LIKE 在 SQLite 下不走索引）
+        worked = Experience.objects.filter(company__gte=company, company__lt=company + '\uffff')
+        queryset = queryset.filter(id__in=worked.values('candidate_id'))
+
+    min_months = safe_int(_value(params, 'min_teaching_months'))
+    if min_months:
+        teaching = (
+            Experience.objects.filter(is_education=True)
+            .values('candidate_id')
+            .annotate(total=Sum('months'))
+            .filter(total__gte=min_months)
+            .values('candidate_id')
+        )
+        queryset = queryset.filter(id__in=teaching)
+
+    min_cooperations = safe_int(_value(params, 'min_cooperations'))
+    if min_cooperations:
+        queryset = queryset.filter(cooperation_count__gte=min_cooperations)
+
+    cooperated_since = _date(params, 'cooperated_since')
+    if cooperated_since:
+        queryset = queryset.filter(last_cooperation_date__gte=cooperated_since)
+
+    best_result = _value(params, 'best_result')
+    if best_result:
+        queryset = queryset.filter(best_cooperation_result=best_result)
+
+    return queryset
+
+
+def candidate_ordering(params):
+    """
+    列表排序字段。按最近合作排序时只列出有合作记录的候选人：
+    没有合作时间的行无法参与游标分页的位置比较。
+    返回 (ordering, 附加过滤条件)
+    """
+    key = _value(params, 'ordering')
+    if key == 'recent_cooperation':
+        return CANDIDATE_ORDERINGS[key], Q(last_cooperation_date__isnull=False)
+    return CANDIDATE_ORDERINGS.get(key, DEFAULT_ORDERING), Q()
+
+
+def normalize_filters(params):
+    """只保留有效的筛选参数，用于保存导出任务的筛选条件及计算缓存键"""
+    return {key: _value(params, key) for key in FILTER_PARAMS if _value(params, key)}
+
+
+# ==============
+# 🤝 合作记录筛选
+# ==============
+COOPERATION_SEARCH_FIELDS = ('candidate__name', 'project_name', 'role')
+
+
+def filter_cooperations(queryset, params):
+    """
+    合作记录筛选：
+    - candidate：候选人 id
+    - project：项目名称（模糊匹配）
+    - result：合作结果（优秀 / 良好 / 一般 / 不再合作）
+    - date_from、date_to：开始时间范围（含两端）
+    - has_agreement：1 只要有协议文件的记录，0 只要没有的
+    - search：候选人姓名 / 项目名称 / 角色 模糊搜索
+    """
+    candidate_id = safe_int(_value(params, 'candidate'))
+    if candidate_id:
+        queryset = queryset.filter(candidate_id=candidate_id)
+
+    project = _value(params, 'project')
+    if project:
+        queryset = queryset.filter(project_name__icontains=project)
+
+    result = _value(params, 'result')
+    if result:
+        queryset = queryset.filter(cooperation_result=result)
+
+    date_from = _date(params, 'date_from')
+    if date_from:
+        queryset = queryset.filter(start_date__gte=date_from)
+    date_to = _date(params, 'date_to')
+    if date_to:
+        queryset = queryset.filter(start_date__lte=date_to)
+
+    has_agreement = _value(params, 'has_agreement').lower()
+    if has_agreement:
+        with_file = Q(agreement_file__isnull=False) & ~Q(agreement_file='')
+        queryset = queryset.filter(with_file) if has_agreement in TRUE_VALUES else queryset.exclude(with_file)
+
+    search = _value(params, 'search')
+    if search:
+        condition = Q()
+        for field in COOPERATION_SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': search})
+        queryset = queryset.filter(condition)
+
+    return queryset
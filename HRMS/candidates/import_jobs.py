@@ -0,0 +1,94 @@
+# candidates/import_jobs.py
+"""
+后台批量导入任务
+
+接口保存上传的 CSV / XLSX 后登记任务，由 run_ingestion_worker 调用 importer 导入，
+有错误行时在 MEDIA_ROOT/imports/ 生成错误报告。任务超时重新执行是安全的：
+已导入的行在 skip 模式下会被跳过，在 update 模式下会被再次更新。
+"""
+import os
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .importer import ImportFormatError, import_candidates
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+IMPORT_DIR = "imports"
+
+
+def enqueue_import(file, created_by=None, on_duplicate="skip"):
+    job = ImportJob(file_name=file.name, created_by=created_by, on_duplicate=on_duplicate)
+    job.file.save(os.path.basename(file.name), file, save=False)
+    job.save()
+    return job
+
+
+def requeue_stale_imports():
+    """回收崩溃进程遗留的任务：未超过最大重试次数的重新排队，否则标记失败"""
+    cutoff = timezone.now() - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT)
+    stale = ImportJob.objects.filter(status="running", locked_at__lt=cutoff)
+    requeued = stale.filter(attempts__lt=settings.INGESTION_MAX_ATTEMPTS).update(
+        status="pending", worker=None, locked_at=None
+    )
+    stale.update(status="failed", error="处理超时", worker=None, finished_at=timezone.now())
+    return requeued
+
+
+def claim_next_import(worker_id):
+    """与 claim_next_task 相同，用带状态条件的 UPDATE 抢占任务"""
+    pending_ids = ImportJob.objects.filter(status="pending").order_by("id").values_list("id", flat=True)[:20]
+    for job_id in pending_ids:
+        claimed = ImportJob.objects.filter(id=job_id, status="pending").update(
+            status="running",
+            worker=worker_id,
+            locked_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return ImportJob.objects.get(id=job_id)
+    return None
+
+
+def run_import(job):
+    """导入文件并记录各项计数；有错误行时保存错误报告"""
+    report_name = f"{IMPORT_DIR}/errors_{job.pk}.csv"
+    report_path = os.path.join(settings.MEDIA_ROOT, report_name)
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    try:
+        with open(job.file.path, "rb") as fp, open(report_path, "w", encoding="utf-8", newline="") as report:
+            result = import_candidates(fp, job.file_name, on_duplicate=job.on_duplicate, error_fp=report)
+        job.total_rows = result["total"]
+        job.created_count = result["created"]
+        job.updated_count = result["updated"]
+        job.skipped_count = result["skipped"]
+        job.error_count = result["errors"]
+        job.status, job.error = "done", ""
+        logger.info(
+            "✅ 导入完成：#%s 新增 %s，更新 %s，跳过 %s，错误 %s",
+            job.pk, job.created_count, job.updated_count, job.skipped_count, job.error_count,
+        )
+    except ImportFormatError as e:
+        job.status, job.error = "failed", str(e)
+    except Exception as e:
+        logger.exception("❌ 导入失败：#%s", job.pk)
+        job.status, job.error = "failed", str(e)
+
+    if job.status == "done" and job.error_count:
+        job.error_report.name = report_name
+    else:
+        job.error_report = None
+        if os.path.exists(report_path):
+            os.remove(report_path)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        "total_rows", "created_count", "updated_count", "skipped_count", "error_count",
+        "error_report", "status", "error", "finished_at",
+    ])
+    return job
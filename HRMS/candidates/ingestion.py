@@ -0,0 +1,552 @@
+# candidates/ingestion.py
+"""
+简历导入流水线：提取文字 → AI 解析评分 → 写入数据库
+
+同步上传接口和 run_ingestion_worker 后台进程共用这里的各个阶段；
+异步模式下以数据库（IngestionJob / IngestionTask）作为任务队列，
+不依赖 Redis 等外部服务。
+"""
+import os
+import re
+import json
+import socket
+import hashlib
+import logging
+import time
+import threading
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from . import extraction, metrics, parse_cache
+from .ai_client import AIClientError, get_client
+from .extraction import ExtractionError
+from .models import Candidate, IngestionJob, IngestionTask
+from .utils import normalize_date, parse_experience, safe_int
+
+logger = logging.getLogger(__name__)
+
+MIN_TEXT_LENGTH = 40
+RESUME_UPLOAD_TO = Candidate._meta.get_field('resume_file').upload_to
+
+
+class IngestionError(Exception):
+    """单份简历处理失败，message 即返回给前端的失败原因"""
+
+
+# ==============
+# 📄 文本提取
+# ==============
+def pdf_source(file):
+    """
+    返回交给解析进程的数据源，避免再写一份临时文件：
+    - 已落盘的上传文件（TemporaryUploadedFile）和已存储的 FieldFile 直接传本地路径，由子进程 mmap 读取
+    - 内存中的小文件（InMemoryUploadedFile）传字节
+    """
+    if hasattr(file, 'temporary_file_path'):
+        return file.temporary_file_path()
+    try:
+        return file.path
+    except (AttributeError, NotImplementedError, ValueError):
+        return b"".join(file.chunks())
+
+
+def wait_for_text(future):
+    """等待进程池中的解析结果，返回 (text, 耗时毫秒)"""
+    try:
+        text, extract_ms = extraction.result(future)
+    except ExtractionError as e:
+        raise IngestionError(str(e))
+    metrics.observe_stage('extract', extract_ms)
+    return text, extract_ms
+
+
+def elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+# ==============
+# 🤖 AI 调用部分
+# ==============
+PROMPT_TEMPLATE = """
+你是一位专业的人才简历分析系统，专注于为教育行业筛选优质候选人。
+请阅读以下简历文本，严格输出 JSON，字段如下：
+{{
+  "data": {{
+    "name": "",
+    "gender": "",
+    "age": "",
+    "phone": "",
+    "email": "",
+    "major": "",
+    "degree": "",
+    "university": "",
+    "graduation_date": "",
+    "base": "",
+    "experience": [
+      {{
+        "company": "",
+        "position": "",
+        "start_date": "",
+        "end_date": "",
+        "description": ""
+      }}
+    ]
+  }},
+  "score": ""
+}}
+
+🎯 字段提取要求：
+
+1. **专业（major）**：优先提取【生物/数学/物理/计算机/化学/商业/机械工程】等具体专业名称。
+   如果无法确定具体专业，则按大类标记：理学、工学、经管、语言、文哲史、其他
+
+2. **Base（所在地/期望工作地）**：
+   - 优先识别：上海、杭州、广州、南京、宁波（这五个城市）
+   - 如果候选人不在以上城市或未明确说明，则标记为"远程"
+   - 注意：提取城市名称，不要省份（如"浙江杭州"应提取为"杭州"）
+
+3. **工作经历（experience）**：
+   - **优先提取教育相关经历**（教师、助教、教练、培训师、课程设计等）
+   - 按时间倒序排列（最近的经历排在前面）
+   - 每条经历必须包含：公司/机构名、职位、起止时间、工作描述
+
+4. **毕业时间（graduation_date）**：
+   - 必须是 YYYY-MM-DD 格式
+   - 如果只有年月，则补充为 YYYY-MM-01
+   - 如果只有年份，则补充为 YYYY-01-01
+
+📊 **简历匹配度评分（score）**：
+- **A类**：有教育行业经验 + 较匹配（如：曾任教师/教练，教育背景优秀）
+- **B类**：无教育经验 + 项目经验丰富（如：有丰富实习/项目，潜力大）
+- **C类**：有教育经验 + 匹配度一般（如：短期教育相关实习，经验较浅）
+- **D类**：无教育经验 + 匹配度一般（如：应届生，经验较少）
+- **E类**：匹配度低（如：信息不足或专业领域差异大）
+
+注：教育行业经验特指在学校、培训机构、教育公司的教学、课程设计、教育产品相关工作。
+
+❗务必返回纯 JSON，不要任何解释性文字。
+
+以下是简历文本：
+{text}
+"""
+
+
+def prompt_version():
+    """提示词或模型变化时版本随之变化，旧版本的缓存自动失效"""
+    return hashlib.sha256(f"{settings.AI_MODEL}\n{PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()[:16]
+
+
+def lookup_parse_cache(texts):
+    """批量读取解析缓存，返回与 texts 顺序一致的结果；未启用或未命中为 None"""
+    if not settings.AI_PARSE_CACHE_ENABLED:
+        return [None] * len(texts)
+    return parse_cache.lookup_many(texts, prompt_version())
+
+
+def store_parse_cache(items):
+    """items 为 [(text, result)]，跳过解析失败的结果"""
+    items = [(text, result) for text, result in items if result]
+    if settings.AI_PARSE_CACHE_ENABLED and items:
+        parse_cache.store_many(items, prompt_version())
+
+
+def request_ai_parse(text):
+    """
+    调用通义千问提取简历字段 + 匹配评分。只发 HTTP 请求、不访问数据库，
+    可以放到 AI 客户端的线程池中执行（线程池中的线程不会回收数据库连接）
+    """
+    prompt = PROMPT_TEMPLATE.format(text=text[:4000])
+
+    try:
+        content = get_client().chat(prompt)
+        match = re.search(r"\{[\s\S]*\}", content)
+        if not match:
+            raise ValueError(f"AI 未返回 JSON 格式：{content[:200]}")
+        json_str = match.group(0)
+        return json.loads(json_str)
+    except (AIClientError, ValueError) as e:
+        logger.warning("⚠️ AI响应异常：%s", e)
+        return None
+
+
+def call_ai_parse(text):
+    """同一份简历文本优先读取解析缓存，未命中时调用 AI 并写入缓存"""
+    result = lookup_parse_cache([text])[0]
+    if result is None:
+        result = request_ai_parse(text)
+        store_parse_cache([(text, result)])
+    return result
+
+
+# ==============
+# 🔍 判重预检
+# ==============
+PHONE_RE = re.compile(r"(?<!\d)(?:\+?86[\s-]?)?(1[3-9]\d[\s-]?\d{4}[\s-]?\d{4})(?!\d)")
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+MATCH_LABELS = {'file': '简历文件', 'phone': '电话', 'email': '邮箱'}
+
+
+class DuplicateCandidate(IngestionError):
+    """简历对应的候选人已存在（on_duplicate='skip' 时抛出）"""
+
+    def __init__(self, candidate, matched_by):
+        self.candidate = candidate
+        self.matched_by = matched_by
+        super().__init__(
+            f"候选人已存在：{candidate.name}（ID {candidate.id}，{MATCH_LABELS[matched_by]}相同）"
+        )
+
+
+PreparedResume = namedtuple('PreparedResume', 'text fingerprint existing matched_by timings')
+IngestionResult = namedtuple('IngestionResult', 'candidate created timings')
+
+
+def file_fingerprint(file):
+    """按块流式计算 SHA-256，不把整个文件读入内存"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_phone(value):
+    """去掉空格、横线和 +86 前缀，统一电话格式便于判重"""
+    phone = re.sub(r"[\s-]", "", str(value or ""))
+    return re.sub(r"^(\+?86)(?=1\d{10}$)", "", phone)
+
+
+def normalize_email(value):
+    """去掉首尾空白并转为小写，统一邮箱格式便于判重"""
+    return str(value or "").strip().lower()
+
+
+def extract_contacts(text):
+    """用正则从简历文本中粗提取手机号和邮箱（不依赖 AI）"""
+    phones = {normalize_phone(match) for match in PHONE_RE.findall(text)}
+    emails = {normalize_email(email) for email in EMAIL_RE.findall(text)}
+    return phones, emails
+
+
+def find_duplicate(fingerprint=None, phones=(), emails=()):
+    """按 简历指纹 → 电话 → 邮箱 依次查找已存在的候选人，均走索引"""
+    lookups = [
+        ('file', {'resume_sha256': fingerprint} if fingerprint else None),
+        ('phone', {'phone__in': [p for p in phones if p]} if any(phones) else None),
+        ('email', {'email__in': [e for e in emails if e]} if any(emails) else None),
+    ]
+    for matched_by, lookup in lookups:
+        if lookup:
+            candidate = Candidate.objects.filter(**lookup).first()
+            if candidate:
+                return candidate, matched_by
+    return None, None
+
+
+def prescreen_file(file, on_duplicate='skip'):
+    """
+    按文件指纹判重，返回 (fingerprint, existing, matched_by)。
+    skip 模式下命中直接抛出 DuplicateCandidate，不再解析 PDF 或调用 AI。
+    """
+    fingerprint = file_fingerprint(file)
+    existing, matched_by = find_duplicate(fingerprint=fingerprint)
+    if existing and on_duplicate == 'skip':
+        raise DuplicateCandidate(existing, matched_by)
+    return fingerprint, existing, matched_by
+
+
+def prescreen_text(text, fingerprint, existing, matched_by, on_duplicate='skip', timings=None):
+    """校验提取出的文字，并用正则提取的电话/邮箱再判重一次"""
+    if len(text) < MIN_TEXT_LENGTH:
+        raise IngestionError("内容过短")
+
+    if not existing:
+        phones, emails = extract_contacts(text)
+        existing, matched_by = find_duplicate(phones=phones, emails=emails)
+        if existing and on_duplicate == 'skip':
+            raise DuplicateCandidate(existing, matched_by)
+    return PreparedResume(text, fingerprint, existing, matched_by, timings or {})
+
+
+def prepare_resume(file, on_duplicate='skip'):
+    """AI 调用前的预处理：计算文件指纹、提取文字并用正则联系方式判重"""
+    fingerprint, existing, matched_by = prescreen_file(file, on_duplicate)
+    text, extract_ms = wait_for_text(extraction.submit(pdf_source(file)))
+    return prescreen_text(text, fingerprint, existing, matched_by, on_duplicate, {'extract_ms': extract_ms})
+
+
+# ==============
+# 💾 入库
+# ==============
+def candidate_fields(ai_result):
+    """AI 结果 → Candidate 字段"""
+    result_json = ai_result.get("data", {})
+    return dict(
+        name=result_json.get("name", ""),
+        gender=result_json.get("gender", ""),
+        age=safe_int(result_json.get("age")),
+        phone=normalize_phone(result_json.get("phone", "")),
+        email=normalize_email(result_json.get("email")),
+        major=result_json.get("major", ""),
+        education=result_json.get("degree", "本科"),
+        university=result_json.get("university", ""),
+        graduation_date=normalize_date(result_json.get("graduation_date")),
+        base=result_json.get("base", "远程"),
+        experience=json.dumps(parse_experience(result_json.get("experience")), ensure_ascii=False),
+        match_level=ai_result.get("score", "D"),
+    )
+
+
+def save_parsed_resume(prepared, ai_result, file_name, file, on_duplicate='skip'):
+    """
+    保存解析结果：预检命中的候选人在 update 模式下原地更新，
+    否则按 AI 识别出的电话/邮箱再判重一次，最后才新建候选人。
+    """
+    started = time.perf_counter()
+    fields = candidate_fields(ai_result)
+    existing, matched_by = prepared.existing, prepared.matched_by
+    if not existing:
+        existing, matched_by = find_duplicate(phones=[fields['phone']], emails=[fields['email']])
+    if existing and on_duplicate == 'skip':
+        raise DuplicateCandidate(existing, matched_by)
+
+    try:
+        with transaction.atomic():
+            if existing:
+                # 合作状态由人工维护，不被简历覆盖；AI 未识别出的字段保留原值
+                for field, value in fields.items():
+                    if value not in (None, ""):
+                        setattr(existing, field, value)
+                candidate, created = existing, False
+            else:
+                candidate, created = Candidate(cooperation_status="未合作", **fields), True
+            candidate.resume_sha256 = prepared.fingerprint
+            if isinstance(file, FieldFile) and file.name.startswith(RESUME_UPLOAD_TO):
+                # 异步导入的文件已经存放在 resumes/ 下，直接引用，不再复制
+                candidate.resume_file.name = file.name
+            else:
+                candidate.resume_file.save(os.path.basename(file_name), file, save=False)
+            candidate.save()
+    except IntegrityError:
+        # 更新后的电话/邮箱与另一位候选人冲突
+        raise IngestionError(f"电话 {fields['phone']} 或邮箱 {fields['email']} 已被其他候选人使用")
+    prepared.timings['save_ms'] = elapsed_ms(started)
+    metrics.observe_stage('save', prepared.timings['save_ms'])
+    return IngestionResult(candidate, created, prepared.timings)
+
+
+def timed_ai_parse(text, parse=call_ai_parse):
+    started = time.perf_counter()
+    result = parse(text)
+    ai_ms = elapsed_ms(started)
+    metrics.observe_stage('ai', ai_ms)
+    return result, ai_ms
+
+
+def timed_ai_request(text):
+    return timed_ai_parse(text, request_ai_parse)
+
+
+def process_resume(file_name, file, on_stage=None, on_duplicate='skip'):
+    """
+    完整处理一份简历，返回 IngestionResult；失败时抛出 IngestionError。
+    on_stage(stage) 在进入 parsing / saving 阶段时回调，用于汇报进度。
+    """
+    prepared = prepare_resume(file, on_duplicate)
+
+    if on_stage:
+        on_stage('parsing')
+    ai_result, prepared.timings['ai_ms'] = timed_ai_parse(prepared.text)
+    if not ai_result:
+        raise IngestionError("AI 无返回或解析失败")
+
+    if on_stage:
+        on_stage('saving')
+    return save_parsed_resume(prepared, ai_result, file_name, file, on_duplicate)
+
+
+def process_resumes(files, on_duplicate='skip'):
+    """
+    同步批量处理：先做指纹判重并把所有 PDF 同时提交到解析进程池，
+    再并发调用 AI，最后依次入库。
+    返回 (results, timings)：results 为 [(file, IngestionResult 或 Exception)]，
+    顺序与 files 一致；timings 含各阶段总耗时和每个文件的耗时（毫秒）。
+    """
+    outcomes = [None] * len(files)
+    file_timings = [{} for _ in files]
+    stages = {}
+
+    started = time.perf_counter()
+    screened = {}
+    for idx, file in enumerate(files):
+        try:
+            screened[idx] = prescreen_file(file, on_duplicate) + (extraction.submit(pdf_source(file)),)
+        except Exception as e:
+            outcomes[idx] = e
+    stages['prescreen_ms'] = elapsed_ms(started)
+
+    started = time.perf_counter()
+    prepared = {}
+    for idx, (fingerprint, existing, matched_by, future) in screened.items():
+        try:
+            text, file_timings[idx]['extract_ms'] = wait_for_text(future)
+            prepared[idx] = prescreen_text(text, fingerprint, existing, matched_by, on_duplicate, file_timings[idx])
+        except Exception as e:
+            outcomes[idx] = e
+    stages['extract_ms'] = elapsed_ms(started)
+
+    # 缓存在当前线程批量读写，只有未命中的简历交给 AI 客户端的线程池
+    started = time.perf_counter()
+    pending = list(prepared)
+    ai_results = {}
+    cached = lookup_parse_cache([prepared[idx].text for idx in pending])
+    lookup_ms = elapsed_ms(started)
+    for idx, result in zip(pending, cached):
+        if result is not None:
+            ai_results[idx] = (result, lookup_ms)
+            metrics.observe_stage('ai', lookup_ms)
+    misses = [idx for idx in pending if idx not in ai_results]
+    responses = get_client().map(timed_ai_request, [prepared[idx].text for idx in misses])
+    ai_results.update(zip(misses, responses))
+    store_parse_cache([
+        (prepared[idx].text, response[0]) for idx, response in zip(misses, responses)
+        if not isinstance(response, Exception)
+    ])
+    stages['ai_ms'] = elapsed_ms(started)
+
+    started = time.perf_counter()
+    for idx in pending:
+        ai_result = ai_results[idx]
+        if isinstance(ai_result, Exception):
+            outcomes[idx] = ai_result
+            continue
+        ai_result, file_timings[idx]['ai_ms'] = ai_result
+        if not ai_result:
+            outcomes[idx] = IngestionError("AI 无返回或解析失败")
+            continue
+        try:
+            outcomes[idx] = save_parsed_resume(
+                prepared[idx], ai_result, files[idx].name, files[idx], on_duplicate
+            )
+        except Exception as e:
+            outcomes[idx] = e
+    stages['save_ms'] = elapsed_ms(started)
+    stages['total_ms'] = round(sum(stages.values()), 1)
+
+    timings = {
+        'stages': stages,
+        'files': {file.name: file_timings[idx] for idx, file in enumerate(files) if file_timings[idx]},
+    }
+    return list(zip(files, outcomes)), timings
+
+
+# ==============
+# 📥 任务队列
+# ==============
+def enqueue_files(files, created_by=None, on_duplicate='skip'):
+    """保存上传文件并为每个文件创建一条待处理任务，立即返回 IngestionJob"""
+    with transaction.atomic():
+        job = IngestionJob.objects.create(total=len(files), created_by=created_by, on_duplicate=on_duplicate)
+        tasks = []
+        for file in files:
+            task = IngestionTask(job=job, file_name=file.name)
+            task.file.save(file.name, file, save=False)
+            tasks.append(task)
+        # 文件先落盘，任务一条 INSERT 写入
+        IngestionTask.objects.bulk_create(tasks)
+    return job
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def requeue_stale_tasks():
+    """
+    回收被崩溃进程领取后长时间未完成的任务：
+    未超过最大重试次数的重新排队，否则标记失败
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.INGESTION_TASK_TIMEOUT)
+    stale = IngestionTask.objects.filter(status__in=IngestionTask.ACTIVE_STATUSES, locked_at__lt=cutoff)
+    requeued = stale.filter(attempts__lt=settings.INGESTION_MAX_ATTEMPTS).update(
+        status='pending', worker=None, locked_at=None
+    )
+    exhausted = list(stale.values_list('job_id', flat=True).distinct())
+    stale.update(status='failed', error='处理超时', worker=None)
+    for job_id in exhausted:
+        refresh_job_status(job_id)
+    return requeued
+
+
+def claim_next_task(worker_id):
+    """
+    领取下一条待处理任务。
+    通过带状态条件的 UPDATE 实现抢占，多个 worker 进程并发领取时
+    只有一个能更新成功，MySQL / SQLite 下行为一致。
+    """
+    pending_ids = IngestionTask.objects.filter(status='pending').values_list('id', flat=True)[:20]
+    for task_id in pending_ids:
+        claimed = IngestionTask.objects.filter(id=task_id, status='pending').update(
+            status='extracting',
+            worker=worker_id,
+            locked_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            task = IngestionTask.objects.select_related('job').get(id=task_id)
+            if task.job.status == 'pending':
+                IngestionJob.objects.filter(id=task.job_id, status='pending').update(status='running')
+            return task
+    return None
+
+
+def _set_task_stage(task, stage):
+    task.status = stage
+    IngestionTask.objects.filter(id=task.id).update(status=stage, locked_at=timezone.now())
+
+
+def run_task(task):
+    """执行一条已领取的任务，结束后更新所属 IngestionJob 的状态"""
+    try:
+        result = process_resume(
+            task.file_name,
+            task.file,
+            on_stage=lambda stage: _set_task_stage(task, stage),
+            on_duplicate=task.job.on_duplicate,
+        )
+    except DuplicateCandidate as e:
+        task.status, task.error = 'duplicate', str(e)
+        task.candidate, task.matched_by = e.candidate, e.matched_by
+    except IngestionError as e:
+        task.status, task.error = 'failed', str(e)
+    except Exception as e:
+        logger.exception("❌ 解析异常：%s", task.file_name)
+        task.status, task.error = 'failed', str(e)
+    else:
+        task.status = 'done' if result.created else 'updated'
+        task.candidate, task.timings = result.candidate, result.timings
+        logger.info("✅ 成功导入：%s（评分 %s）", result.candidate.name, result.candidate.match_level)
+
+    if task.status == 'duplicate' and task.file:
+        # 候选人已存在，上传的文件不再需要；成功时文件已归候选人所有
+        task.file.delete(save=False)
+    task.save(update_fields=['status', 'error', 'candidate', 'matched_by', 'timings', 'file', 'updated_at'])
+    refresh_job_status(task.job_id)
+    return task
+
+
+def refresh_job_status(job_id):
+    """所有文件都处理完毕时将任务标记为已完成"""
+    unfinished = IngestionTask.objects.filter(job_id=job_id).exclude(
+        status__in=IngestionTask.FINISHED_STATUSES
+    ).exists()
+    if not unfinished:
+        IngestionJob.objects.filter(id=job_id).exclude(status='done').update(
+            status='done', finished_at=timezone.now()
+        )
@@ -0,0 +1,34 @@
+# candidates/management/commands/ai_parse_cache.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from candidates import parse_cache
+from candidates.ingestion import prompt_version
+
+
+class Command(BaseCommand):
+    help = "查看、淘汰或清空 AI 简历解析缓存"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prune", action="store_true", help="按容量上限和过期时间淘汰条目")
+        parser.add_argument(
+            "--invalidate", action="store_true",
+            help="删除旧提示词版本的条目（修改 call_ai_parse 的提示词后执行）",
+        )
+        parser.add_argument("--clear", action="store_true", help="清空全部缓存")
+
+    def handle(self, *args, **options):
+        version = prompt_version()
+
+        if options["clear"]:
+            removed = parse_cache.clear()
+            self.stdout.write(f"🗑️ 已清空缓存，共删除 {removed} 条")
+        elif options["invalidate"]:
+            removed = parse_cache.clear(keep_version=version)
+            self.stdout.write(f"🗑️ 已删除旧版本缓存 {removed} 条")
+        if options["prune"]:
+            removed = parse_cache.prune()
+            self.stdout.write(f"🧹 已淘汰 {removed} 条")
+
+        self.stdout.write(json.dumps(parse_cache.stats(version), ensure_ascii=False, indent=2))
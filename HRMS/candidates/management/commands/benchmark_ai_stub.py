@@ -0,0 +1,35 @@
+# candidates/management/commands/benchmark_ai_stub.py
+from django.core.management.base import BaseCommand
+
+from candidates.benchmark.stub_ai import StubAIServer
+
+
+class Command(BaseCommand):
+    help = "启动模拟 DashScope chat/completions 接口（可配置延迟与错误率），供上传压测使用"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency-ms", type=float, default=800, help="平均响应时间")
+        parser.add_argument("--jitter-ms", type=float, default=200, help="响应时间标准差")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="返回 500 的比例")
+        parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="返回 429 的比例")
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        server = StubAIServer(
+            (options["host"], options["port"]),
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            error_rate=options["error_rate"],
+            rate_limit_rate=options["rate_limit_rate"],
+            seed=options["seed"],
+        )
+        self.stdout.write(f"🤖 模拟 AI 接口已启动，服务端设置 AI_API_URL={server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"请求统计：{dict(server.counts)}")
@@ -0,0 +1,22 @@
+# candidates/management/commands/benchmark_corpus.py
+from django.core.management.base import BaseCommand
+
+from candidates.benchmark.corpus import write_corpus
+
+
+class Command(BaseCommand):
+    help = "生成合成 PDF 简历，用于上传 / 导入的性能基准测试"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="输出目录")
+        parser.add_argument("--count", type=int, default=100)
+        parser.add_argument("--pages", type=int, default=1, help="每份简历的页数（页数越多解析越慢）")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--start", type=int, default=0, help="起始编号，决定电话 / 邮箱，换编号可生成不重复的简历")
+
+    def handle(self, *args, **options):
+        paths = write_corpus(
+            options["directory"], options["count"],
+            pages=options["pages"], seed=options["seed"], start=options["start"],
+        )
+        self.stdout.write(f"✅ 已生成 {len(paths)} 份简历：{options['directory']}")
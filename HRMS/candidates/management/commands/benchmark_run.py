@@ -0,0 +1,77 @@
+# candidates/management/commands/benchmark_run.py
+import json
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from candidates.benchmark.load import (
+    DEFAULT_SCENARIOS, SCENARIOS, BenchmarkError, LoadRunner, compare, default_results_path, save_results,
+)
+
+
+class Command(BaseCommand):
+    help = "对运行中的服务执行压测场景，输出 p50 / p95 / p99 与吞吐量，结果保存为 JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000/", help="服务地址（不含 /api/）")
+        parser.add_argument(
+            "--scenarios", default=",".join(DEFAULT_SCENARIOS),
+            help=f"逗号分隔，可选：{', '.join(SCENARIOS)}",
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=200, help="每个场景的请求数（部分场景有自己的默认值）")
+        parser.add_argument("--warmup", type=int, default=5, help="每个场景正式计时前的预热请求数")
+        parser.add_argument("--timeout", type=float, default=120)
+        parser.add_argument("--username", default="bench_user0", help="列表接口带上的用户名（收藏状态）")
+        parser.add_argument("--corpus", help="upload 场景使用的 PDF 目录（benchmark_corpus 生成）")
+        parser.add_argument("--files-per-request", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="结果文件，默认 benchmark_results/<时间>.json")
+        parser.add_argument("--compare", help="与之前保存的结果对比")
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options["scenarios"].split(",") if name.strip()]
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"未知场景：{', '.join(unknown)}")
+        previous = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as fp:
+                    previous = json.load(fp)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"无法读取对比结果：{e}")
+
+        runner = LoadRunner(
+            options["base_url"],
+            concurrency=options["concurrency"],
+            requests=options["requests"],
+            warmup=options["warmup"],
+            timeout=options["timeout"],
+            username=options["username"],
+            corpus=options["corpus"],
+            files_per_request=options["files_per_request"],
+            seed=options["seed"],
+        )
+
+        def progress(name, result):
+            latency = result["latency_ms"]
+            self.stdout.write(
+                f"{name:<20} {result['requests']:>6} 次  错误 {result['errors']:<4} "
+                f"p50 {latency['p50']} / p95 {latency['p95']} / p99 {latency['p99']} ms  "
+                f"{result['throughput_rps']} req/s"
+                + (f"  SQL {result['avg_queries']}" if result["avg_queries"] is not None else "")
+            )
+
+        try:
+            results = runner.run(names, progress=progress)
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        except requests.RequestException as e:
+            raise CommandError(f"无法访问 {options['base_url']}：{e}")
+
+        path = save_results(results, options["output"] or default_results_path())
+        self.stdout.write(f"✅ 数据规模 {results['dataset']}，结果已保存：{path}")
+        if previous:
+            for line in compare(previous, results):
+                self.stdout.write(line)
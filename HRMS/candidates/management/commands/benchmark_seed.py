@@ -0,0 +1,45 @@
+# candidates/management/commands/benchmark_seed.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from candidates.benchmark.data import SEED_CHUNK_SIZE, generate
+
+
+class Command(BaseCommand):
+    help = "生成合成候选人、工作经历、合作记录和收藏，用于性能基准测试（建议使用独立数据库）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--candidates", type=int, default=10000, help="候选人数量")
+        parser.add_argument("--cooperation-ratio", type=float, default=0.3, help="有合作记录的候选人比例")
+        parser.add_argument("--max-cooperations", type=int, default=5, help="每位候选人最多合作记录数")
+        parser.add_argument("--favorite-users", type=int, default=3, help="收藏用户数（bench_user0……）")
+        parser.add_argument("--favorites-per-user", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0, help="随机种子，相同种子生成相同数据")
+        parser.add_argument("--chunk-size", type=int, default=SEED_CHUNK_SIZE)
+        parser.add_argument("--no-index", action="store_true", help="不写检索文档（之后可执行 rebuild_search_index）")
+
+    def handle(self, *args, **options):
+        total = options["candidates"]
+        started = time.perf_counter()
+
+        def progress(done):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {done}/{total}（{done / max(elapsed, 1e-6):.0f} 位/秒）")
+
+        result = generate(
+            total,
+            cooperation_ratio=options["cooperation_ratio"],
+            max_cooperations=options["max_cooperations"],
+            favorite_users=options["favorite_users"],
+            favorites_per_user=options["favorites_per_user"],
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            index=not options["no_index"],
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"✅ 候选人 {result['candidates']}，合作记录 {result['cooperations']}，"
+            f"收藏 {result['favorites']}（{elapsed:.1f} 秒）"
+        )
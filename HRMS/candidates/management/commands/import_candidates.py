@@ -0,0 +1,48 @@
+# candidates/management/commands/import_candidates.py
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from candidates.importer import IMPORT_CHUNK_SIZE, ImportFormatError, import_candidates
+
+
+class Command(BaseCommand):
+    help = "从 CSV / XLSX 批量导入候选人（列与导出文件一致，不经过 AI 解析）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help=".csv / .csv.gz / .xlsx 文件")
+        parser.add_argument(
+            "--on-duplicate", choices=("skip", "update"), default="skip",
+            help="电话或邮箱已存在时跳过或更新",
+        )
+        parser.add_argument("--errors", help="错误报告路径，默认为 <文件名>.errors.csv")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        errors_path = options["errors"] or f"{path}.errors.csv"
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as fp, open(errors_path, "w", encoding="utf-8", newline="") as report:
+                result = import_candidates(
+                    fp, os.path.basename(path),
+                    on_duplicate=options["on_duplicate"],
+                    error_fp=report,
+                    chunk_size=options["chunk_size"],
+                )
+        except (OSError, ImportFormatError) as e:
+            if os.path.exists(errors_path):
+                os.remove(errors_path)
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        if not result["errors"]:
+            os.remove(errors_path)
+        self.stdout.write(
+            f"✅ 共 {result['total']} 行：新增 {result['created']}，更新 {result['updated']}，"
+            f"跳过 {result['skipped']}，错误 {result['errors']}"
+            f"（{elapsed:.1f} 秒，{result['total'] / max(elapsed, 1e-6):.0f} 行/秒）"
+        )
+        if result["errors"]:
+            self.stdout.write(f"⚠️ 错误报告：{errors_path}")
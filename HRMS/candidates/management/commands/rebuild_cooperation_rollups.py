@@ -0,0 +1,15 @@
+# candidates/management/commands/rebuild_cooperation_rollups.py
+from django.core.management.base import BaseCommand
+
+from candidates.cooperation import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "按合作记录重算候选人的合作次数、最近合作时间等汇总字段"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_rollups(chunk_size=options["chunk_size"])
+        self.stdout.write(f"✅ 已重算 {total} 位候选人的合作汇总")
@@ -0,0 +1,15 @@
+# candidates/management/commands/rebuild_experiences.py
+from django.core.management.base import BaseCommand
+
+from candidates.experience import rebuild_experiences
+
+
+class Command(BaseCommand):
+    help = "按 Candidate.experience 重建结构化工作经历（同时刷新进行中经历的时长）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_experiences(chunk_size=options["chunk_size"])
+        self.stdout.write(f"✅ 已重建 {total} 条工作经历")
@@ -0,0 +1,15 @@
+# candidates/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from candidates.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "重建候选人全文检索索引（批量导入等绕过 save 的操作之后执行）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_index(chunk_size=options["chunk_size"])
+        self.stdout.write(f"✅ 已重建 {total} 位候选人的检索文档")
@@ -0,0 +1,164 @@
+# candidates/management/commands/run_ingestion_worker.py
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from candidates import extraction, parse_cache
+from candidates.changes import prune_tombstones
+from candidates.events import prune_events
+from candidates.export_jobs import claim_next_export, prune_exports, requeue_stale_exports, run_export
+from candidates.import_jobs import claim_next_import, requeue_stale_imports, run_import
+from candidates.ingestion import claim_next_task, default_worker_id, requeue_stale_tasks, run_task
+
+logger = logging.getLogger(__name__)
+
+
+def process_next(worker_id):
+    """领取并处理一项任务（简历导入优先，其次是批量导入、导出），队列为空时返回 False"""
+    requeue_stale_tasks()
+    task = claim_next_task(worker_id)
+    if task is not None:
+        logger.info("📄 [%s] 正在处理：%s", worker_id, task.file_name)
+        run_task(task)
+        return True
+
+    requeue_stale_imports()
+    import_job = claim_next_import(worker_id)
+    if import_job is not None:
+        logger.info("📥 [%s] 正在批量导入：#%s %s", worker_id, import_job.pk, import_job.file_name)
+        run_import(import_job)
+        return True
+
+    requeue_stale_exports()
+    export_job = claim_next_export(worker_id)
+    if export_job is not None:
+        logger.info("📦 [%s] 正在导出：#%s (%s)", worker_id, export_job.pk, export_job.format)
+        run_export(export_job)
+        return True
+    return False
+
+
+def consume(stopping, poll_interval, once):
+    """
+    循环领取并处理任务，队列为空时休眠 poll_interval 秒。
+    数据库暂时不可用（死锁、连接断开、database is locked）时记录日志后重试，线程不退出
+    """
+    worker_id = default_worker_id()
+    try:
+        while not stopping.is_set():
+            try:
+                busy = process_next(worker_id)
+            except Exception:
+                logger.exception("❌ [%s] 处理队列出错，%s 秒后重试", worker_id, poll_interval)
+                close_old_connections()
+                stopping.wait(poll_interval)
+                continue
+            if busy:
+                continue
+            if once:
+                break
+            stopping.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+
+def worker_loop(poll_interval, once=False, threads=1):
+    """
+    单个 worker 进程。threads > 1 时在进程内并发处理多份简历，
+    线程之间共享 AI 客户端的连接池和限速器。
+    """
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stopping.set())
+
+    consumers = [
+        threading.Thread(target=consume, args=(stopping, poll_interval, once), name=f"consumer-{i}")
+        for i in range(max(1, threads))
+    ]
+    for consumer in consumers:
+        consumer.start()
+    last_prune = time.monotonic()
+    try:
+        while any(consumer.is_alive() for consumer in consumers):
+            for consumer in consumers:
+                consumer.join(timeout=1)
+            if time.monotonic() - last_prune > settings.AI_PARSE_CACHE_PRUNE_INTERVAL:
+                last_prune = time.monotonic()
+                try:
+                    parse_cache.prune()
+                    prune_exports()
+                    prune_tombstones()
+                    prune_events()
+                except Exception:
+                    logger.exception("❌ 清理过期数据出错，下个周期重试")
+                    close_old_connections()
+    except KeyboardInterrupt:
+        stopping.set()
+        for consumer in consumers:
+            consumer.join()
+    finally:
+        extraction.shutdown_pool()
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "运行后台 worker，从数据库队列中领取并处理上传的简历、批量导入和导出任务"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=settings.INGESTION_WORKER_PROCESSES,
+            help="并行 worker 进程数",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=settings.INGESTION_WORKER_THREADS,
+            help="每个进程内的并发线程数（受 AI 限速器统一约束）",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=settings.INGESTION_POLL_INTERVAL,
+            help="队列为空时的轮询间隔（秒）",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="处理完当前队列后退出",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options["processes"])
+        poll_interval = options["poll_interval"]
+        once = options["once"]
+        threads = max(1, options["threads"])
+
+        self.stdout.write(f"🚀 启动 {processes} 个简历导入 worker（每个 {threads} 线程）")
+        if processes == 1:
+            worker_loop(poll_interval, once, threads)
+            return
+
+        # fork 前关闭数据库连接，避免子进程共用同一连接
+        connections.close_all()
+        # 子进程不能是守护进程：守护进程无法再创建 PDF 解析进程池
+        workers = [
+            multiprocessing.Process(target=worker_loop, args=(poll_interval, once, threads))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        def shutdown(*args):
+            # 转发 SIGTERM，子进程处理完当前任务后退出
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            shutdown()
+            for worker in workers:
+                worker.join()
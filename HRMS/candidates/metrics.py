@@ -0,0 +1,248 @@
+# candidates/metrics.py
+"""
+请求性能指标
+
+- MetricsMiddleware：按视图（URL name）记录耗时、SQL 条数与耗时（connection.execute_wrapper）、响应大小；
+  耗时超过 METRICS_SLOW_REQUEST_MS 的请求写慢日志，附总耗时最多的几条 SQL
+- observe_stage()：简历导入各阶段（extract / ai / save）的耗时
+- metrics_view：Prometheus 文本格式，挂在 /metrics（不经过 nginx 的 /api/ 转发，只允许内网地址或 METRICS_TOKEN）
+
+指标保存在进程内存中，每个进程单独统计、单独暴露（gunicorn 多 worker 时按实例抓取）；
+流式响应（导出、SSE）只统计到视图返回为止。
+"""
+import time
+import bisect
+import logging
+import ipaddress
+import threading
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+INF_BUCKET = 'le="+Inf"'
+SLOW_LOG_STATEMENTS = 5
+SLOW_LOG_SQL_CHARS = 300
+
+_lock = threading.Lock()
+
+
+# ==============
+# 📈 指标
+# ==============
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with _lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels → [各桶计数, 总和, 次数]
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with _lock:
+            snapshot = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, [le])} {cumulative}"
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, [INF_BUCKET])} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+REQUEST_DURATION = Histogram(
+    "hrms_http_request_duration_seconds", "请求耗时（秒）", ("view", "method"), LATENCY_BUCKETS
+)
+REQUESTS = Counter("hrms_http_requests_total", "请求数", ("view", "method", "status"))
+REQUEST_QUERIES = Histogram("hrms_http_request_db_queries", "每个请求的 SQL 条数", ("view",), QUERY_BUCKETS)
+REQUEST_DB_TIME = Histogram("hrms_http_request_db_seconds", "每个请求的 SQL 总耗时（秒）", ("view",), LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram("hrms_http_response_size_bytes", "响应大小（字节，流式响应不计）", ("view",), SIZE_BUCKETS)
+UPLOAD_STAGE = Histogram("hrms_upload_stage_seconds", "简历导入各阶段耗时（秒）", ("stage",), STAGE_BUCKETS)
+REGISTRY = (REQUEST_DURATION, REQUESTS, REQUEST_QUERIES, REQUEST_DB_TIME, RESPONSE_SIZE, UPLOAD_STAGE)
+
+
+def observe_stage(stage, milliseconds):
+    """记录简历导入阶段耗时；ingestion 中各阶段本来就以毫秒计时"""
+    UPLOAD_STAGE.observe(milliseconds / 1000, stage)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# ==============
+# 🗄️ SQL 统计
+# ==============
+class QueryRecorder:
+    """
+    connection.execute_wrapper：统计 SQL 条数与耗时，并按参数化后的语句聚合
+    （同一条语句执行多次说明可能存在 N+1）
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = {}  # sql → [次数, 总耗时]
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            entry = self.statements.setdefault(sql, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+    @contextmanager
+    def record(self):
+        """在当前线程的所有数据库连接上生效"""
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+    def top(self, limit=SLOW_LOG_STATEMENTS):
+        """按总耗时排序的 [(sql, 次数, 总耗时)]"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(sql, count, duration) for sql, (count, duration) in ranked[:limit]]
+
+
+# ==============
+# 🧭 中间件
+# ==============
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unmatched>"
+    return match.view_name or match._func_path
+
+
+def response_size(response):
+    if response.streaming:
+        length = response.get("Content-Length")
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+def log_slow_request(request, view, status, elapsed, recorder):
+    statements = "\n".join(
+        f"  {count} 次 / {duration * 1000:.1f} ms  {sql[:SLOW_LOG_SQL_CHARS]}"
+        for sql, count, duration in recorder.top()
+    )
+    logger.warning(
+        "🐢 慢请求 %s %s（%s，%s）：%.0f ms，SQL %s 条 / %.0f ms\n%s",
+        request.method, request.path, view, status, elapsed * 1000,
+        recorder.count, recorder.duration * 1000, statements,
+    )
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view = view_label(request)
+        REQUEST_DURATION.observe(elapsed, view, request.method)
+        REQUESTS.inc(view, request.method, str(response.status_code))
+        REQUEST_QUERIES.observe(recorder.count, view)
+        REQUEST_DB_TIME.observe(recorder.duration, view)
+        size = response_size(response)
+        if size is not None:
+            RESPONSE_SIZE.observe(size, view)
+        if elapsed * 1000 >= settings.METRICS_SLOW_REQUEST_MS:
+            log_slow_request(request, view, response.status_code, elapsed, recorder)
+        return response
+
+
+# ==============
+# 📤 /metrics
+# ==============
+@lru_cache(maxsize=None)
+def _allowed_networks(value):
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip())
+
+
+def _allowed(request):
+    if settings.METRICS_TOKEN:
+        return request.headers.get("Authorization") == f"Bearer {settings.METRICS_TOKEN}"
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks(settings.METRICS_ALLOWED_NETWORKS))
+
+
+def metrics_view(request):
+    """Prometheus 抓取接口"""
+    if not _allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0004_favorite'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('running', '处理中'), ('done', '已完成')], default='pending', max_length=20, verbose_name='状态')),
+                ('total', models.IntegerField(default=0, verbose_name='文件数')),
+                ('created_by', models.CharField(blank=True, max_length=150, null=True, verbose_name='上传人')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+            ],
+            options={
+                'verbose_name': '简历导入任务',
+                'verbose_name_plural': '简历导入任务',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='IngestionTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255, verbose_name='文件名')),
+                ('file', models.FileField(blank=True, null=True, upload_to='ingestion/', verbose_name='待处理文件')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('extracting', '提取文本'), ('parsing', 'AI 解析'), ('saving', '写入数据库'), ('done', '成功'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('error', models.TextField(blank=True, default='', null=True, verbose_name='失败原因')),
+                ('attempts', models.IntegerField(default=0, verbose_name='尝试次数')),
+                ('worker', models.CharField(blank=True, max_length=100, null=True, verbose_name='处理进程')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='领取时间')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('candidate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingestion_tasks', to='candidates.candidate', verbose_name='候选人')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='candidates.ingestionjob', verbose_name='导入任务')),
+            ],
+            options={
+                'verbose_name': '简历导入文件',
+                'verbose_name_plural': '简历导入文件',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='ingestion_task_queue_idx')],
+            },
+        ),
+    ]
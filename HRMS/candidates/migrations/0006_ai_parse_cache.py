@@ -0,0 +1,42 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0005_ingestion_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIParseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='缓存键')),
+                ('prompt_version', models.CharField(db_index=True, max_length=32, verbose_name='提示词版本')),
+                ('result', models.JSONField(verbose_name='解析结果')),
+                ('hits', models.IntegerField(default=0, verbose_name='命中次数')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='最近使用时间')),
+            ],
+            options={
+                'verbose_name': 'AI解析缓存',
+                'verbose_name_plural': 'AI解析缓存',
+            },
+        ),
+        migrations.CreateModel(
+            name='AIParseCacheStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prompt_version', models.CharField(max_length=32, unique=True, verbose_name='提示词版本')),
+                ('hits', models.BigIntegerField(default=0, verbose_name='命中')),
+                ('misses', models.BigIntegerField(default=0, verbose_name='未命中')),
+            ],
+            options={
+                'verbose_name': 'AI解析缓存统计',
+                'verbose_name_plural': 'AI解析缓存统计',
+            },
+        ),
+    ]
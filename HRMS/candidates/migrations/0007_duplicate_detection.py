@@ -0,0 +1,33 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0006_ai_parse_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='resume_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True, verbose_name='简历指纹'),
+        ),
+        migrations.AddField(
+            model_name='ingestionjob',
+            name='on_duplicate',
+            field=models.CharField(choices=[('skip', '跳过已存在的候选人'), ('update', '更新已存在的候选人')], default='skip', max_length=10, verbose_name='重复处理方式'),
+        ),
+        migrations.AddField(
+            model_name='ingestiontask',
+            name='matched_by',
+            field=models.CharField(blank=True, max_length=20, null=True, verbose_name='判重依据'),
+        ),
+        migrations.AlterField(
+            model_name='ingestiontask',
+            name='status',
+            field=models.CharField(choices=[('pending', '排队中'), ('extracting', '提取文本'), ('parsing', 'AI 解析'), ('saving', '写入数据库'), ('done', '成功'), ('updated', '已更新'), ('duplicate', '已存在'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0007_duplicate_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestiontask',
+            name='timings',
+            field=models.JSONField(blank=True, default=dict, verbose_name='各阶段耗时(ms)'),
+        ),
+    ]
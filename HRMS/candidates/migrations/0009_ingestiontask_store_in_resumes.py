@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0008_ingestiontask_timings'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingestiontask',
+            name='file',
+            field=models.FileField(blank=True, null=True, upload_to='resumes/', verbose_name='简历文件'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0009_ingestiontask_store_in_resumes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-created_at', '-id'], name='candidate_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['match_level', '-created_at'], name='candidate_level_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['cooperation_status', '-created_at'], name='candidate_coop_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['base', '-created_at'], name='candidate_base_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['education', '-created_at'], name='candidate_edu_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['age'], name='candidate_age_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['major'], name='candidate_major_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cooperationrecord',
+            index=models.Index(fields=['-start_date'], name='coop_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cooperationrecord',
+            index=models.Index(fields=['candidate', '-start_date'], name='coop_candidate_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', '-created_at'], name='favorite_user_created_idx'),
+        ),
+    ]
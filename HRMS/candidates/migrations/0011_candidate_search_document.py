@@ -0,0 +1,118 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:27
+
+import ast
+import json
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 与 search.py / utils.parse_experience 当时的实现相同，复制到迁移中，避免之后修改应用代码影响迁移
+FTS_TABLE = "candidates_search_fts"
+MYSQL_FULLTEXT_INDEX = "candidate_search_content_ft"
+CJK_CHARS = "㐀-䶿一-鿿豈-﫿"
+TOKEN_RE = re.compile(rf"[{CJK_CHARS}]+|[0-9a-z]+")
+CJK_RE = re.compile(rf"^[{CJK_CHARS}]+$")
+CHUNK_SIZE = 1000
+
+
+def tokenize(text, n=2):
+    tokens = []
+    for run in TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if CJK_RE.match(run) and len(run) > n:
+            tokens.extend(run[i:i + n] for i in range(len(run) - n + 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def parse_experience(raw):
+    if not raw:
+        return []
+    for loader in (json.loads, ast.literal_eval):
+        try:
+            parsed = loader(raw)
+        except (ValueError, SyntaxError, TypeError):
+            continue
+        if isinstance(parsed, list):
+            return [item for item in parsed if isinstance(item, dict)]
+    return []
+
+
+def build_document(candidate):
+    parts = [candidate.name, candidate.university, candidate.major, candidate.base]
+    for item in parse_experience(candidate.experience):
+        parts.extend([item.get("company"), item.get("position"), item.get("description")])
+    return "\n".join(str(part).strip() for part in parts if part)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(tokens)")
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            f"ALTER TABLE candidates_candidatesearchdocument "
+            f"ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (content) WITH PARSER ngram"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            f"ALTER TABLE candidates_candidatesearchdocument DROP INDEX {MYSQL_FULLTEXT_INDEX}"
+        )
+
+
+def populate_documents(apps, schema_editor):
+    """按 CHUNK_SIZE 分批读取候选人并写入检索文档，内存占用与候选人总数无关"""
+    Candidate = apps.get_model('candidates', 'Candidate')
+    CandidateSearchDocument = apps.get_model('candidates', 'CandidateSearchDocument')
+    connection = schema_editor.connection
+
+    def flush(batch):
+        CandidateSearchDocument.objects.bulk_create(batch, batch_size=CHUNK_SIZE)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE} (rowid, tokens) VALUES (%s, %s)",
+                    [(doc.candidate_id, " ".join(tokenize(doc.content))) for doc in batch],
+                )
+
+    fields = ('id', 'name', 'university', 'major', 'base', 'experience')
+    batch = []
+    for candidate in Candidate.objects.only(*fields).iterator(chunk_size=CHUNK_SIZE):
+        batch.append(CandidateSearchDocument(candidate_id=candidate.id, content=build_document(candidate)))
+        if len(batch) >= CHUNK_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0010_candidate_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSearchDocument',
+            fields=[
+                ('candidate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='candidates.candidate', verbose_name='候选人')),
+                ('content', models.TextField(verbose_name='检索文本')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '候选人检索文档',
+                'verbose_name_plural': '候选人检索文档',
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+    ]
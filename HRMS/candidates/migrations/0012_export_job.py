@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0011_candidate_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('xlsx', 'Excel'), ('csv', 'CSV（gzip 压缩）'), ('columnar', '列式存储（gzip 压缩的 JSON 行组）')], default='xlsx', max_length=10, verbose_name='格式')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='筛选条件')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('running', '生成中'), ('done', '已完成'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('cache_key', models.CharField(db_index=True, max_length=64, verbose_name='缓存键')),
+                ('file', models.FileField(blank=True, null=True, upload_to='exports/', verbose_name='导出文件')),
+                ('row_count', models.IntegerField(default=0, verbose_name='行数')),
+                ('size', models.BigIntegerField(default=0, verbose_name='文件大小')),
+                ('error', models.TextField(blank=True, default='', null=True, verbose_name='失败原因')),
+                ('attempts', models.IntegerField(default=0, verbose_name='尝试次数')),
+                ('worker', models.CharField(blank=True, max_length=100, null=True, verbose_name='处理进程')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='领取时间')),
+                ('created_by', models.CharField(blank=True, max_length=150, null=True, verbose_name='创建人')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+            ],
+            options={
+                'verbose_name': '导出任务',
+                'verbose_name_plural': '导出任务',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='export_job_queue_idx')],
+            },
+        ),
+    ]
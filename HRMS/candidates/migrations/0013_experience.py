@@ -0,0 +1,123 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:38
+
+import ast
+import json
+import re
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 与 experience.experience_fields / utils.parse_experience 当时的实现相同，复制到迁移中，避免之后修改应用代码影响迁移
+EDUCATION_KEYWORDS = (
+    "教育", "教师", "老师", "助教", "教练", "培训", "讲师", "教研", "课程", "辅导", "家教", "授课", "教学",
+    "学校", "中学", "小学", "幼儿园", "学而思", "新东方",
+    "teacher", "teaching", "tutor", "instructor", "lecturer", "education", "school", "academy",
+)
+CURRENT_WORDS = ("至今", "现在", "目前", "今", "present", "now", "current")
+MONTH_RE = re.compile(r"(\d{4})\s*(?:[-/.年]\s*(\d{1,2}))?")
+CHUNK_SIZE = 1000
+
+
+def parse_experience(raw):
+    if not raw:
+        return []
+    for loader in (json.loads, ast.literal_eval):
+        try:
+            parsed = loader(raw)
+        except (ValueError, SyntaxError, TypeError):
+            continue
+        if isinstance(parsed, list):
+            return [item for item in parsed if isinstance(item, dict)]
+    return []
+
+
+def parse_month(value):
+    match = MONTH_RE.search(str(value or ""))
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2) or 1)
+    if not 1900 <= year <= 2100 or not 1 <= month <= 12:
+        return None
+    return date(year, month, 1)
+
+
+def months_between(start, end):
+    if not start or not end or end < start:
+        return 0
+    return (end.year - start.year) * 12 + end.month - start.month + 1
+
+
+def experience_fields(raw, today):
+    rows = []
+    for order, item in enumerate(parse_experience(raw)):
+        company = str(item.get("company") or "").strip()[:200]
+        position = str(item.get("position") or "").strip()[:200]
+        description = str(item.get("description") or "").strip()
+        start = parse_month(item.get("start_date"))
+        end_text = str(item.get("end_date") or "").strip().lower()
+        is_current = any(word in end_text for word in CURRENT_WORDS)
+        end = None if is_current else parse_month(end_text)
+        text = " ".join(t for t in (company, position, description) if t).lower()
+        rows.append({
+            "order": order,
+            "company": company,
+            "position": position,
+            "start_date": start,
+            "end_date": end,
+            "is_current": is_current,
+            "months": months_between(start, today if is_current else end),
+            "is_education": any(keyword in text for keyword in EDUCATION_KEYWORDS),
+            "description": description,
+        })
+    return rows
+
+
+def populate_experiences(apps, schema_editor):
+    Candidate = apps.get_model('candidates', 'Candidate')
+    Experience = apps.get_model('candidates', 'Experience')
+
+    today = date.today()
+    batch = []
+    for candidate in Candidate.objects.only('id', 'experience').iterator(chunk_size=CHUNK_SIZE):
+        batch.extend(
+            Experience(candidate_id=candidate.id, **fields)
+            for fields in experience_fields(candidate.experience, today)
+        )
+        if len(batch) >= CHUNK_SIZE:
+            Experience.objects.bulk_create(batch)
+            batch = []
+    Experience.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0012_export_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Experience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.PositiveSmallIntegerField(default=0, verbose_name='顺序')),
+                ('company', models.CharField(blank=True, default='', max_length=200, verbose_name='公司/机构')),
+                ('position', models.CharField(blank=True, default='', max_length=200, verbose_name='职位')),
+                ('start_date', models.DateField(blank=True, null=True, verbose_name='开始时间')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='结束时间')),
+                ('is_current', models.BooleanField(default=False, verbose_name='至今')),
+                ('months', models.PositiveIntegerField(default=0, verbose_name='时长(月)')),
+                ('is_education', models.BooleanField(default=False, verbose_name='教育相关')),
+                ('description', models.TextField(blank=True, default='', verbose_name='工作内容')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='experiences', to='candidates.candidate', verbose_name='候选人')),
+            ],
+            options={
+                'verbose_name': '工作经历',
+                'verbose_name_plural': '工作经历',
+                'ordering': ['candidate', 'order'],
+                'indexes': [models.Index(fields=['candidate', 'order'], name='experience_candidate_idx'), models.Index(fields=['company'], name='experience_company_idx'), models.Index(fields=['is_education', 'candidate', 'months'], name='experience_education_idx')],
+            },
+        ),
+        migrations.RunPython(populate_experiences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0013_experience'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='导入文件')),
+                ('file_name', models.CharField(max_length=255, verbose_name='文件名')),
+                ('on_duplicate', models.CharField(choices=[('skip', '跳过已存在的候选人'), ('update', '更新已存在的候选人')], default='skip', max_length=10, verbose_name='重复处理方式')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('running', '导入中'), ('done', '已完成'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('total_rows', models.IntegerField(default=0, verbose_name='数据行数')),
+                ('created_count', models.IntegerField(default=0, verbose_name='新增')),
+                ('updated_count', models.IntegerField(default=0, verbose_name='更新')),
+                ('skipped_count', models.IntegerField(default=0, verbose_name='跳过')),
+                ('error_count', models.IntegerField(default=0, verbose_name='错误行数')),
+                ('error_report', models.FileField(blank=True, null=True, upload_to='imports/', verbose_name='错误报告')),
+                ('error', models.TextField(blank=True, default='', null=True, verbose_name='失败原因')),
+                ('attempts', models.IntegerField(default=0, verbose_name='尝试次数')),
+                ('worker', models.CharField(blank=True, max_length=100, null=True, verbose_name='处理进程')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='领取时间')),
+                ('created_by', models.CharField(blank=True, max_length=150, null=True, verbose_name='上传人')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+            ],
+            options={
+                'verbose_name': '导入任务',
+                'verbose_name_plural': '导入任务',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='import_job_queue_idx')],
+            },
+        ),
+    ]
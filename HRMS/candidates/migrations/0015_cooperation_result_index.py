@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0014_import_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cooperationrecord',
+            index=models.Index(fields=['cooperation_result', '-start_date'], name='coop_result_start_idx'),
+        ),
+    ]
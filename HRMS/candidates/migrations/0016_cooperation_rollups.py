@@ -0,0 +1,99 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:57
+
+from django.db import migrations, models
+
+# 与 cooperation.rollup_fields 当时的实现相同，复制到迁移中，避免之后修改应用代码影响迁移
+RESULT_RANK = {'优秀': 4, '良好': 3, '一般': 2, '不再合作': 1}
+ROLLUP_FIELDS = (
+    'cooperation_count', 'last_cooperation_date', 'best_cooperation_result',
+    'worst_cooperation_result', 'latest_project',
+)
+CHUNK_SIZE = 1000
+
+
+def rollup_fields(records):
+    """records 为 (project_name, start_date, cooperation_result, id) 列表，至少一条"""
+    latest = max(records, key=lambda r: (r[1], r[3]))
+    ranked = [r[2] for r in records if r[2] in RESULT_RANK]
+    return {
+        'cooperation_count': len(records),
+        'last_cooperation_date': latest[1],
+        'best_cooperation_result': max(ranked, key=RESULT_RANK.get, default=''),
+        'worst_cooperation_result': min(ranked, key=RESULT_RANK.get, default=''),
+        'latest_project': latest[0],
+    }
+
+
+def populate_rollups(apps, schema_editor):
+    """
+    合作记录按候选人顺序流式读取，每个候选人的记录读完即汇总，
+    按 CHUNK_SIZE 批量写回；没有合作记录的候选人保持字段默认值
+    """
+    Candidate = apps.get_model('candidates', 'Candidate')
+    CooperationRecord = apps.get_model('candidates', 'CooperationRecord')
+
+    rows = CooperationRecord.objects.order_by('candidate_id', 'id').values_list(
+        'candidate_id', 'project_name', 'start_date', 'cooperation_result', 'id'
+    )
+    changed = []
+    current_id, records = None, []
+
+    def finish_group():
+        changed.append(Candidate(id=current_id, **rollup_fields(records)))
+        if len(changed) >= CHUNK_SIZE:
+            Candidate.objects.bulk_update(changed, ROLLUP_FIELDS)
+            changed.clear()
+
+    for candidate_id, *record in rows.iterator(chunk_size=CHUNK_SIZE):
+        if candidate_id != current_id and records:
+            finish_group()
+            records = []
+        current_id = candidate_id
+        records.append(record)
+    if records:
+        finish_group()
+    Candidate.objects.bulk_update(changed, ROLLUP_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0015_cooperation_result_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='best_cooperation_result',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='最好合作结果'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='cooperation_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='合作次数'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='last_cooperation_date',
+            field=models.DateField(blank=True, null=True, verbose_name='最近合作时间'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='latest_project',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='最近合作项目'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='worst_cooperation_result',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='最差合作结果'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-last_cooperation_date', '-id'], name='candidate_last_coop_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['-cooperation_count', '-id'], name='candidate_coop_count_idx'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-18 05:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0016_cooperation_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('candidate_id', models.BigIntegerField(verbose_name='候选人 id')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='删除时间')),
+            ],
+            options={
+                'verbose_name': '候选人删除记录',
+                'verbose_name_plural': '候选人删除记录',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['updated_at', 'id'], name='candidate_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidatetombstone',
+            index=models.Index(fields=['deleted_at'], name='candidate_tombstone_idx'),
+        ),
+    ]
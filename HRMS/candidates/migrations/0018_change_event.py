@@ -0,0 +1,27 @@
+# Generated by Django 5.0.4 on 2026-10-18 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0017_candidate_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(max_length=20, verbose_name='频道')),
+                ('payload', models.JSONField(verbose_name='事件内容')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='发布时间')),
+            ],
+            options={
+                'verbose_name': '变更事件',
+                'verbose_name_plural': '变更事件',
+                'indexes': [models.Index(fields=['created_at'], name='change_event_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+import re
+
+from django.db import migrations
+from django.utils import timezone
+
+# 与 ingestion.normalize_phone / normalize_email 相同的规则，复制到迁移中，避免之后修改应用代码影响迁移
+PHONE_SEPARATORS_RE = re.compile(r"[\s-]")
+PHONE_PREFIX_RE = re.compile(r"^(\+?86)(?=1\d{10}$)")
+CHUNK_SIZE = 1000
+
+
+def normalize_phone(value):
+    return PHONE_PREFIX_RE.sub("", PHONE_SEPARATORS_RE.sub("", str(value or "")))
+
+
+def normalize_email(value):
+    return str(value or "").strip().lower()
+
+
+def normalize_contacts(apps, schema_editor):
+    """
+    把历史数据中的电话（+86、空格、横线）和邮箱（大小写、空白）统一为新写入的格式，
+    判重才能命中旧数据。规范化后会与其他候选人重复的值保持原样，留给人工合并。
+    """
+    Candidate = apps.get_model('candidates', 'Candidate')
+    rows = Candidate.objects.order_by('id').values_list('id', 'phone', 'email')
+    taken_phones = set()
+    taken_emails = set()
+    for _, phone, email in rows.iterator(chunk_size=CHUNK_SIZE):
+        taken_phones.add(phone)
+        taken_emails.add(email)
+
+    now = timezone.now()
+    changed = []
+    for candidate_id, phone, email in rows.iterator(chunk_size=CHUNK_SIZE):
+        new_phone, new_email = normalize_phone(phone), normalize_email(email)
+        if new_phone != phone and new_phone in taken_phones:
+            new_phone = phone
+        if new_email != email and new_email in taken_emails:
+            new_email = email
+        if (new_phone, new_email) == (phone, email):
+            continue
+        taken_phones.discard(phone)
+        taken_phones.add(new_phone)
+        taken_emails.discard(email)
+        taken_emails.add(new_email)
+        # 同步更新 updated_at，增量同步的客户端能拿到新值
+        changed.append(Candidate(id=candidate_id, phone=new_phone, email=new_email, updated_at=now))
+        if len(changed) >= CHUNK_SIZE:
+            Candidate.objects.bulk_update(changed, ['phone', 'email', 'updated_at'])
+            changed = []
+    Candidate.objects.bulk_update(changed, ['phone', 'email', 'updated_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0018_change_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_contacts, migrations.RunPython.noop),
+    ]
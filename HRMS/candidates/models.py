@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # ---------------------------------------------------------
 # 候选人主表 Candidate
@@ -58,8 +59,17 @@ class Candidate(models.Model):
         verbose_name="简历匹配度"
     )
 
+    # 合作情况汇总（由合作记录的信号维护，见 cooperation.py）
+    cooperation_count = models.PositiveIntegerField(default=0, verbose_name="合作次数")
+    last_cooperation_date = models.DateField(null=True, blank=True, verbose_name="最近合作时间")
+    best_cooperation_result = models.CharField(max_length=50, blank=True, default='', verbose_name="最好合作结果")
+    worst_cooperation_result = models.CharField(max_length=50, blank=True, default='', verbose_name="最差合作结果")
+    latest_project = models.CharField(max_length=100, blank=True, default='', verbose_name="最近合作项目")
+
     # ✅ 新增字段：保存原始 PDF 文件
     resume_file = models.FileField(upload_to="resumes/", null=True, blank=True, verbose_name="简历文件")
+    # 简历文件 SHA-256，用于上传前判重
+    resume_sha256 = models.CharField(max_length=64, null=True, blank=True, db_index=True, verbose_name="简历指纹")
 
     # 系统字段
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
@@ -68,12 +78,82 @@ class Candidate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.match_level})"
 
+    # 检索文档（search.build_document）用到的字段
+    SEARCH_FIELDS = ('name', 'university', 'major', 'base', 'experience')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 记录加载时的工作经历与检索字段，保存时只有变化才重建 Experience 行和检索文档（signals.py）
+        if 'experience' in instance.__dict__:
+            instance._loaded_experience = instance.experience
+        if all(name in instance.__dict__ for name in cls.SEARCH_FIELDS):
+            instance._loaded_search_fields = instance.search_field_values()
+        return instance
+
+    def search_field_values(self):
+        return tuple(getattr(self, name) for name in self.SEARCH_FIELDS)
+
     class Meta:
         verbose_name = "候选人"
         verbose_name_plural = "候选人库"
+        indexes = [
+            # 列表 / 导出按创建时间倒序（含游标分页的 id 兜底排序）
+            models.Index(fields=['-created_at', '-id'], name='candidate_created_idx'),
+            # 筛选 + 按创建时间排序
+            models.Index(fields=['match_level', '-created_at'], name='candidate_level_created_idx'),
+            models.Index(fields=['cooperation_status', '-created_at'], name='candidate_coop_created_idx'),
+            models.Index(fields=['base', '-created_at'], name='candidate_base_created_idx'),
+            models.Index(fields=['education', '-created_at'], name='candidate_edu_created_idx'),
+            models.Index(fields=['age'], name='candidate_age_idx'),
+            # 统计接口按专业分组
+            models.Index(fields=['major'], name='candidate_major_idx'),
+            # 按最近合作 / 合作次数排序
+            models.Index(fields=['-last_cooperation_date', '-id'], name='candidate_last_coop_idx'),
+            models.Index(fields=['-cooperation_count', '-id'], name='candidate_coop_count_idx'),
+            # 增量同步按 (updated_at, id) 顺序读取变更
+            models.Index(fields=['updated_at', 'id'], name='candidate_updated_idx'),
+        ]
 
 
 
+# ---------------------------------------------------------
+# 工作经历表 Experience
+# 由 Candidate.experience（AI 返回的经历列表）拆分而来，保存候选人时自动同步，
+# 用于「有教育行业经历」「在某公司工作过」「教学总月数」等查询
+# ---------------------------------------------------------
+class Experience(models.Model):
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.CASCADE,
+        related_name='experiences',
+        verbose_name="候选人"
+    )
+    order = models.PositiveSmallIntegerField(default=0, verbose_name="顺序")  # AI 按时间倒序返回
+    company = models.CharField(max_length=200, blank=True, default='', verbose_name="公司/机构")
+    position = models.CharField(max_length=200, blank=True, default='', verbose_name="职位")
+    start_date = models.DateField(null=True, blank=True, verbose_name="开始时间")
+    end_date = models.DateField(null=True, blank=True, verbose_name="结束时间")
+    is_current = models.BooleanField(default=False, verbose_name="至今")
+    months = models.PositiveIntegerField(default=0, verbose_name="时长(月)")
+    is_education = models.BooleanField(default=False, verbose_name="教育相关")
+    description = models.TextField(blank=True, default='', verbose_name="工作内容")
+
+    def __str__(self):
+        return f"{self.company} - {self.position}"
+
+    class Meta:
+        verbose_name = "工作经历"
+        verbose_name_plural = "工作经历"
+        ordering = ['candidate', 'order']
+        indexes = [
+            models.Index(fields=['candidate', 'order'], name='experience_candidate_idx'),
+            models.Index(fields=['company'], name='experience_company_idx'),
+            # 覆盖索引：教育经历筛选与教学月数汇总只读索引
+            models.Index(fields=['is_education', 'candidate', 'months'], name='experience_education_idx'),
+        ]
+
+
 # ---------------------------------------------------------
 # 候选人合作记录表 CooperationRecord
 # ---------------------------------------------------------
@@ -107,10 +187,28 @@ class CooperationRecord(models.Model):
     def __str__(self):
         return f"{self.candidate.name} - {self.project_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 记录加载时的候选人，改挂到其他候选人时两边的合作汇总都要刷新
+        instance._loaded_candidate_id = instance.__dict__.get('candidate_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # 记录与候选人合作汇总（post_save 信号中更新）在同一事务内提交
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._loaded_candidate_id = self.candidate_id
+
     class Meta:
         verbose_name = "合作记录"
         verbose_name_plural = "合作记录"
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['-start_date'], name='coop_start_idx'),
+            models.Index(fields=['candidate', '-start_date'], name='coop_candidate_start_idx'),
+            models.Index(fields=['cooperation_result', '-start_date'], name='coop_result_start_idx'),
+        ]
 
 
 # ---------------------------------------------------------
@@ -173,3 +271,278 @@ class Favorite(models.Model):
         verbose_name_plural = "收藏"
         unique_together = ['user', 'candidate']  # 同一用户不能重复收藏
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='favorite_user_created_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# 简历导入任务表 IngestionJob / IngestionTask
+# 以数据库作为任务队列：上传接口只负责落盘并建任务，
+# 由 run_ingestion_worker 进程异步完成 提取 → AI → 入库
+# ---------------------------------------------------------
+class IngestionJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', '排队中'),
+        ('running', '处理中'),
+        ('done', '已完成'),
+    ]
+    ON_DUPLICATE_CHOICES = [
+        ('skip', '跳过已存在的候选人'),
+        ('update', '更新已存在的候选人'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="状态")
+    total = models.IntegerField(default=0, verbose_name="文件数")
+    on_duplicate = models.CharField(max_length=10, choices=ON_DUPLICATE_CHOICES, default='skip', verbose_name="重复处理方式")
+    created_by = models.CharField(max_length=150, null=True, blank=True, verbose_name="上传人")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="完成时间")
+
+    def __str__(self):
+        return f"导入任务 #{self.pk} ({self.status})"
+
+    class Meta:
+        verbose_name = "简历导入任务"
+        verbose_name_plural = "简历导入任务"
+        ordering = ['-created_at']
+
+
+class IngestionTask(models.Model):
+    # pending → extracting → parsing → saving → done / failed
+    STATUS_CHOICES = [
+        ('pending', '排队中'),
+        ('extracting', '提取文本'),
+        ('parsing', 'AI 解析'),
+        ('saving', '写入数据库'),
+        ('done', '成功'),
+        ('updated', '已更新'),
+        ('duplicate', '已存在'),
+        ('failed', '失败'),
+    ]
+    ACTIVE_STATUSES = ('extracting', 'parsing', 'saving')
+    FINISHED_STATUSES = ('done', 'updated', 'duplicate', 'failed')
+
+    job = models.ForeignKey(
+        IngestionJob,
+        on_delete=models.CASCADE,
+        related_name='tasks',
+        verbose_name="导入任务"
+    )
+    file_name = models.CharField(max_length=255, verbose_name="文件名")
+    # 直接存放到简历目录，导入成功后由候选人引用同一文件，避免二次写盘
+    file = models.FileField(upload_to="resumes/", null=True, blank=True, verbose_name="简历文件")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="状态")
+    error = models.TextField(null=True, blank=True, default='', verbose_name="失败原因")
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ingestion_tasks',
+        verbose_name="候选人"
+    )
+    matched_by = models.CharField(max_length=20, null=True, blank=True, verbose_name="判重依据")
+    timings = models.JSONField(default=dict, blank=True, verbose_name="各阶段耗时(ms)")
+    attempts = models.IntegerField(default=0, verbose_name="尝试次数")
+    worker = models.CharField(max_length=100, null=True, blank=True, verbose_name="处理进程")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="领取时间")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+    class Meta:
+        verbose_name = "简历导入文件"
+        verbose_name_plural = "简历导入文件"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='ingestion_task_queue_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# AI 解析结果缓存 AIParseCache
+# 以「规范化简历文本 + 提示词/模型版本」的哈希为键，重复上传直接复用结果
+# ---------------------------------------------------------
+class AIParseCache(models.Model):
+    key = models.CharField(max_length=64, unique=True, verbose_name="缓存键")
+    prompt_version = models.CharField(max_length=32, db_index=True, verbose_name="提示词版本")
+    result = models.JSONField(verbose_name="解析结果")
+    hits = models.IntegerField(default=0, verbose_name="命中次数")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="最近使用时间")
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.prompt_version})"
+
+    class Meta:
+        verbose_name = "AI解析缓存"
+        verbose_name_plural = "AI解析缓存"
+
+
+class AIParseCacheStat(models.Model):
+    prompt_version = models.CharField(max_length=32, unique=True, verbose_name="提示词版本")
+    hits = models.BigIntegerField(default=0, verbose_name="命中")
+    misses = models.BigIntegerField(default=0, verbose_name="未命中")
+
+    def __str__(self):
+        return f"{self.prompt_version}: {self.hits}/{self.hits + self.misses}"
+
+    class Meta:
+        verbose_name = "AI解析缓存统计"
+        verbose_name_plural = "AI解析缓存统计"
+
+
+# ---------------------------------------------------------
+# 候选人搜索文档 CandidateSearchDocument
+# 汇总姓名、院校、专业、城市和工作经历，供全文检索使用；
+# SQLite 下另有 FTS5 虚拟表 candidates_search_fts，MySQL 下为 ngram FULLTEXT 索引
+# ---------------------------------------------------------
+class CandidateSearchDocument(models.Model):
+    candidate = models.OneToOneField(
+        Candidate,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+        verbose_name="候选人"
+    )
+    content = models.TextField(verbose_name="检索文本")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    def __str__(self):
+        return f"{self.candidate_id}: {self.content[:30]}"
+
+    class Meta:
+        verbose_name = "候选人检索文档"
+        verbose_name_plural = "候选人检索文档"
+
+
+# ---------------------------------------------------------
+# 后台导出任务 ExportJob
+# 按人才库筛选条件生成导出文件；相同格式 + 筛选条件 + 数据指纹的文件直接复用
+# ---------------------------------------------------------
+class ExportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', '排队中'),
+        ('running', '生成中'),
+        ('done', '已完成'),
+        ('failed', '失败'),
+    ]
+    FORMAT_CHOICES = [
+        ('xlsx', 'Excel'),
+        ('csv', 'CSV（gzip 压缩）'),
+        ('columnar', '列式存储（gzip 压缩的 JSON 行组）'),
+    ]
+
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='xlsx', verbose_name="格式")
+    filters = models.JSONField(default=dict, blank=True, verbose_name="筛选条件")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="状态")
+    # sha256(格式 + 筛选条件 + 数据指纹)，数据未变化时复用已生成的文件
+    cache_key = models.CharField(max_length=64, db_index=True, verbose_name="缓存键")
+    file = models.FileField(upload_to="exports/", null=True, blank=True, verbose_name="导出文件")
+    row_count = models.IntegerField(default=0, verbose_name="行数")
+    size = models.BigIntegerField(default=0, verbose_name="文件大小")
+    error = models.TextField(null=True, blank=True, default='', verbose_name="失败原因")
+    attempts = models.IntegerField(default=0, verbose_name="尝试次数")
+    worker = models.CharField(max_length=100, null=True, blank=True, verbose_name="处理进程")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="领取时间")
+    created_by = models.CharField(max_length=150, null=True, blank=True, verbose_name="创建人")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="完成时间")
+
+    def __str__(self):
+        return f"导出任务 #{self.pk} ({self.format}, {self.status})"
+
+    class Meta:
+        verbose_name = "导出任务"
+        verbose_name_plural = "导出任务"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='export_job_queue_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# 批量导入任务 ImportJob
+# 上传结构化的 CSV / XLSX（列与导出文件一致），不经过 AI 解析直接入库
+# ---------------------------------------------------------
+class ImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', '排队中'),
+        ('running', '导入中'),
+        ('done', '已完成'),
+        ('failed', '失败'),
+    ]
+
+    file = models.FileField(upload_to="imports/", verbose_name="导入文件")
+    file_name = models.CharField(max_length=255, verbose_name="文件名")
+    on_duplicate = models.CharField(
+        max_length=10, choices=IngestionJob.ON_DUPLICATE_CHOICES, default='skip', verbose_name="重复处理方式"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="状态")
+    total_rows = models.IntegerField(default=0, verbose_name="数据行数")
+    created_count = models.IntegerField(default=0, verbose_name="新增")
+    updated_count = models.IntegerField(default=0, verbose_name="更新")
+    skipped_count = models.IntegerField(default=0, verbose_name="跳过")
+    error_count = models.IntegerField(default=0, verbose_name="错误行数")
+    error_report = models.FileField(upload_to="imports/", null=True, blank=True, verbose_name="错误报告")
+    error = models.TextField(null=True, blank=True, default='', verbose_name="失败原因")
+    attempts = models.IntegerField(default=0, verbose_name="尝试次数")
+    worker = models.CharField(max_length=100, null=True, blank=True, verbose_name="处理进程")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="领取时间")
+    created_by = models.CharField(max_length=150, null=True, blank=True, verbose_name="上传人")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="完成时间")
+
+    def __str__(self):
+        return f"导入任务 #{self.pk} ({self.file_name}, {self.status})"
+
+    class Meta:
+        verbose_name = "导入任务"
+        verbose_name_plural = "导入任务"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='import_job_queue_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# 候选人删除记录 CandidateTombstone
+# 增量同步接口据此告知客户端哪些候选人已被删除，超过保留期后清理（见 changes.py）
+# ---------------------------------------------------------
+class CandidateTombstone(models.Model):
+    candidate_id = models.BigIntegerField(verbose_name="候选人 id")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="删除时间")
+
+    def __str__(self):
+        return f"已删除候选人 #{self.candidate_id}"
+
+    class Meta:
+        verbose_name = "候选人删除记录"
+        verbose_name_plural = "候选人删除记录"
+        indexes = [
+            models.Index(fields=['deleted_at'], name='candidate_tombstone_idx'),
+        ]
+
+
+# ---------------------------------------------------------
+# 变更事件 ChangeEvent
+# EVENT_BACKEND 为 DatabaseBackend 时，各进程发布的事件写入此表，
+# 推送服务按 id 轮询后转发给已连接的客户端（见 events.py）
+# ---------------------------------------------------------
+class ChangeEvent(models.Model):
+    channel = models.CharField(max_length=20, verbose_name="频道")
+    payload = models.JSONField(verbose_name="事件内容")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="发布时间")
+
+    def __str__(self):
+        return f"{self.channel} #{self.pk}"
+
+    class Meta:
+        verbose_name = "变更事件"
+        verbose_name_plural = "变更事件"
+        indexes = [
+            models.Index(fields=['created_at'], name='change_event_created_idx'),
+        ]
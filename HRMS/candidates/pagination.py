@@ -0,0 +1,56 @@
+# candidates/pagination.py
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from .filters import DEFAULT_ORDERING, candidate_ordering
+
+
+class CandidateCursorPagination(CursorPagination):
+    """
+    按 -created_at（或 ?ordering= 指定的合作排序）的游标（keyset）分页，翻页代价与表大小无关。
+    仅在请求带 cursor 或 page_size 参数时启用，不带参数时仍返回完整列表，兼容旧前端。
+    """
+    ordering = DEFAULT_ORDERING
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        # ?ordering=recent_cooperation / cooperation_count，游标按对应字段编码
+        return candidate_ordering(request.query_params)[0]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count'] = {'type': 'integer', 'example': 123}
+        return schema
+
+
+class CooperationPagination(PageNumberPagination):
+    """
+    合作记录按页码分页（页面显示「第 x / y 页」），返回 {count, next, previous, results}。
+    同样仅在带 page 或 page_size 参数时启用。
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.page_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,130 @@
+# candidates/parse_cache.py
+"""
+AI 解析结果缓存（内容寻址）
+
+键 = sha256(规范化后的简历文本 + 提示词版本)，同一份简历被重复上传时
+直接返回上次的解析结果，跳过 AI 调用。提示词或模型变化后版本号改变，
+旧条目不再命中，并由 prune() 按数量 / 时间淘汰。
+"""
+import re
+import hashlib
+import logging
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import AIParseCache, AIParseCacheStat
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text):
+    """全角转半角、合并空白，避免排版差异导致缓存未命中"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def make_key(text, version):
+    return hashlib.sha256(f"{version}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def _count(version, **amounts):
+    amounts = {field: amount for field, amount in amounts.items() if amount}
+    if not amounts:
+        return
+    increments = {field: F(field) + amount for field, amount in amounts.items()}
+    updated = AIParseCacheStat.objects.filter(prompt_version=version).update(**increments)
+    if not updated:
+        try:
+            AIParseCacheStat.objects.create(prompt_version=version, **amounts)
+        except IntegrityError:
+            AIParseCacheStat.objects.filter(prompt_version=version).update(**increments)
+
+
+def lookup_many(texts, version):
+    """
+    批量查询，返回与 texts 顺序一致的解析结果（未命中为 None）；同时记录命中/未命中次数。
+    不论多少份简历都只有一次查询、一次命中计数更新和一次统计更新
+    """
+    keys = [make_key(text, version) for text in texts]
+    if not keys:
+        return []
+    found = dict(AIParseCache.objects.filter(key__in=set(keys)).values_list("key", "result"))
+    if found:
+        AIParseCache.objects.filter(key__in=found).update(hits=F("hits") + 1, last_used_at=timezone.now())
+    hits = sum(key in found for key in keys)
+    _count(version, hits=hits, misses=len(keys) - hits)
+    return [found.get(key) for key in keys]
+
+
+def store_many(items, version):
+    """items 为 [(text, result)]，一条 INSERT 写入；键已存在说明其它进程刚写入了相同内容，直接跳过"""
+    now = timezone.now()
+    entries = {}
+    for text, result in items:
+        if isinstance(result, dict):
+            key = make_key(text, version)
+            entries[key] = AIParseCache(key=key, prompt_version=version, result=result, last_used_at=now)
+    AIParseCache.objects.bulk_create(entries.values(), ignore_conflicts=True)
+
+
+def prune(max_entries=None, max_age_days=None):
+    """
+    淘汰过期条目（按最近使用时间）以及超出容量上限的最久未使用条目，
+    返回删除的条目数
+    """
+    max_entries = settings.AI_PARSE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    max_age_days = settings.AI_PARSE_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+
+    removed = 0
+    if max_age_days:
+        cutoff = timezone.now() - timedelta(days=max_age_days)
+        removed += AIParseCache.objects.filter(last_used_at__lt=cutoff).delete()[0]
+
+    if max_entries:
+        boundary = (
+            AIParseCache.objects.order_by("-last_used_at", "-id")
+            .values_list("last_used_at", "id")[max_entries:max_entries + 1]
+        )
+        boundary = list(boundary)
+        if boundary:
+            last_used_at, last_id = boundary[0]
+            removed += AIParseCache.objects.filter(last_used_at__lte=last_used_at).exclude(
+                last_used_at=last_used_at, id__gt=last_id
+            ).delete()[0]
+
+    if removed:
+        logger.info("🧹 AI 解析缓存淘汰 %s 条", removed)
+    return removed
+
+
+def clear(keep_version=None):
+    """清空缓存；指定 keep_version 时只删除其它（旧）版本的条目"""
+    entries = AIParseCache.objects.all()
+    stats = AIParseCacheStat.objects.all()
+    if keep_version:
+        entries = entries.exclude(prompt_version=keep_version)
+        stats = stats.exclude(prompt_version=keep_version)
+    stats.delete()
+    return entries.delete()[0]
+
+
+def stats(version):
+    """当前版本的条目数与命中率，以及旧版本残留条目数"""
+    counter = AIParseCacheStat.objects.filter(prompt_version=version).first()
+    hits = counter.hits if counter else 0
+    misses = counter.misses if counter else 0
+    current = AIParseCache.objects.filter(prompt_version=version)
+    return {
+        "prompt_version": version,
+        "entries": current.count(),
+        "stale_entries": AIParseCache.objects.exclude(prompt_version=version).count(),
+        "entry_hits": current.aggregate(total=Sum("hits"))["total"] or 0,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+    }
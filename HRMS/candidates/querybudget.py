@@ -0,0 +1,109 @@
+# candidates/querybudget.py
+"""
+查询预算（N+1 防护）
+
+- @query_budget(5) / @query_budget(GET=3, POST=8)：声明视图每个请求最多执行的 SQL 条数，
+  可用于视图类、函数视图或 as_view() 的返回值（第三方视图在 urls.py 中包一层）；
+  settings.QUERY_BUDGETS 可按 URL name 覆盖
+- QueryBudgetMiddleware：统计每个请求的 SQL，超出预算时按 QUERY_BUDGET_MODE 处理：
+  raise 抛出 QueryBudgetExceeded（开发 / 测试默认），warn 只记日志，off 不统计（生产默认）
+- 报告按指纹（去掉字面量、合并 IN 列表后的 SQL）聚合重复语句，执行次数最多的通常就是 N+1 的来源
+
+预算按「与数据量无关」的思路给出：列表接口的 SQL 条数不应随行数增长；
+数值包含 JWT 认证读取用户的 1 条，以及 DatabaseBackend 下写接口发布事件的 INSERT。
+流式响应（导出、SSE）只统计到视图返回为止。
+"""
+import re
+import logging
+from collections import Counter
+
+from django.conf import settings
+
+from .metrics import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+REPORT_STATEMENTS = 5
+REPORT_SQL_CHARS = 300
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?|\d+|'(?:[^']|'')*')\s*,?)+\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+_TRANSACTION_RE = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """请求执行的 SQL 超出视图声明的预算"""
+
+
+def query_budget(max_queries=None, **per_method):
+    """声明视图的查询预算；per_method 按 HTTP 方法单独指定（未列出的方法使用 max_queries）"""
+    def decorate(view):
+        view.query_budget = {'*': max_queries, **{method.upper(): value for method, value in per_method.items()}}
+        return view
+    return decorate
+
+
+def budget_for(request):
+    """当前请求的预算，未声明时返回 None"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    override = settings.QUERY_BUDGETS.get(match.view_name)
+    if override is not None:
+        return override
+    budget = getattr(match.func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(match.func, 'view_class', None), 'query_budget', None)
+    if budget is None:
+        return None
+    return budget.get(request.method, budget['*'])
+
+
+def fingerprint(sql):
+    """去掉字面量、合并 IN 列表，使只有参数不同的语句归为一类"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def repeated_statements(recorder, limit=REPORT_STATEMENTS):
+    """[(指纹, 次数)]，按次数降序，只包含执行了不止一次的语句（事务控制语句不计）"""
+    counts = Counter()
+    for sql, (count, _) in recorder.statements.items():
+        if not _TRANSACTION_RE.match(sql):
+            counts[fingerprint(sql)] += count
+    return [(sql, count) for sql, count in counts.most_common(limit) if count > 1]
+
+
+def budget_report(request, view, budget, recorder):
+    lines = [f"{request.method} {request.path}（{view}）执行了 {recorder.count} 条 SQL，预算 {budget}"]
+    repeated = repeated_statements(recorder)
+    if repeated:
+        lines.append("重复执行的语句（可能是 N+1）：")
+        lines.extend(f"  {count} 次  {sql[:REPORT_SQL_CHARS]}" for sql, count in repeated)
+    return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.QUERY_BUDGET_MODE == 'off':
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        response['X-Query-Count'] = str(recorder.count)
+
+        budget = budget_for(request)
+        if budget is not None and recorder.count > budget:
+            report = budget_report(request, request.resolver_match.view_name, budget, recorder)
+            if settings.QUERY_BUDGET_MODE == 'raise':
+                raise QueryBudgetExceeded(report)
+            logger.warning("⚠️ 查询超出预算：%s", report)
+        return response
@@ -0,0 +1,292 @@
+# candidates/search.py
+"""
+候选人全文检索
+
+每位候选人对应一条 CandidateSearchDocument（姓名、院校、专业、城市、
+工作经历中的公司/职位/描述），按数据库类型选择索引：
+
+- SQLite：FTS5 虚拟表 candidates_search_fts，存放按 CJK 二元组（bigram）切分后的词，bm25 排序
+- MySQL：content 列上的 FULLTEXT 索引（WITH PARSER ngram），MATCH ... AGAINST 排序
+- 其它数据库：退化为 LIKE 匹配
+
+高亮片段统一在 Python 中基于原始文本生成，与后端无关。
+"""
+import re
+import html
+import unicodedata
+
+from django.db import connection
+from django.utils import timezone
+
+from .bulk import insert_rows
+from .models import Candidate, CandidateSearchDocument
+from .utils import parse_experience
+
+FTS_TABLE = "candidates_search_fts"
+MYSQL_FULLTEXT_INDEX = "candidate_search_content_ft"
+
+CJK_CHARS = "㐀-䶿一-鿿豈-﫿"
+TOKEN_RE = re.compile(rf"[{CJK_CHARS}]+|[0-9a-z]+")
+CJK_RE = re.compile(rf"^[{CJK_CHARS}]+$")
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text, n=2):
+    """中文按 n 元组切分（单字保留），英文/数字按词切分"""
+    tokens = []
+    for run in TOKEN_RE.findall(normalize(text)):
+        if CJK_RE.match(run) and len(run) > n:
+            tokens.extend(run[i:i + n] for i in range(len(run) - n + 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def query_terms(query):
+    """搜索词按空白拆分，去掉无法检索的符号"""
+    return [term for term in (normalize(part).strip() for part in query.split()) if TOKEN_RE.search(term)]
+
+
+def build_document(candidate):
+    """拼接候选人的可检索字段（Candidate.SEARCH_FIELDS）"""
+    parts = [candidate.name, candidate.university, candidate.major, candidate.base]
+    for item in parse_experience(candidate.experience):
+        parts.extend([item.get("company"), item.get("position"), item.get("description")])
+    return "\n".join(str(part).strip() for part in parts if part)
+
+
+# ==============
+# 🔎 检索后端
+# ==============
+class LikeBackend:
+    """无全文索引时的兜底实现"""
+
+    def index(self, candidate_id, content):
+        pass
+
+    def index_many(self, documents, replace=True):
+        for candidate_id, content in documents:
+            self.index(candidate_id, content)
+
+    def remove(self, candidate_ids):
+        pass
+
+    def search(self, terms, limit):
+        queryset = CandidateSearchDocument.objects.all()
+        for term in terms:
+            queryset = queryset.filter(content__icontains=term)
+        results = []
+        for candidate_id, content in queryset.values_list("candidate_id", "content")[:limit * 5]:
+            lowered = normalize(content)
+            results.append((candidate_id, float(sum(lowered.count(term) for term in terms))))
+        results.sort(key=lambda item: -item[1])
+        return results[:limit]
+
+
+class SQLiteFTSBackend(LikeBackend):
+    def index(self, candidate_id, content):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [candidate_id])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, tokens) VALUES (%s, %s)",
+                [candidate_id, " ".join(tokenize(content))],
+            )
+
+    def index_many(self, documents, replace=True):
+        documents = list(documents)
+        if not documents:
+            return
+        with connection.cursor() as cursor:
+            if replace:
+                cursor.executemany(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(candidate_id,) for candidate_id, _ in documents]
+                )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, tokens) VALUES (%s, %s)",
+                [(candidate_id, " ".join(tokenize(content))) for candidate_id, content in documents],
+            )
+
+    def remove(self, candidate_ids):
+        candidate_ids = list(candidate_ids)
+        if not candidate_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(candidate_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", candidate_ids)
+
+    @staticmethod
+    def match_expression(terms):
+        clauses = []
+        for term in terms:
+            for run in TOKEN_RE.findall(term):
+                tokens = tokenize(run)
+                if len(tokens) == 1 and (len(run) == 1 or not CJK_RE.match(run)):
+                    # 单个汉字或英文词：前缀匹配
+                    clauses.append(f'"{tokens[0]}"*')
+                else:
+                    # 连续的二元组组成短语，要求相邻出现
+                    clauses.append('"' + " ".join(tokens) + '"')
+        return " AND ".join(clauses)
+
+    def search(self, terms, limit):
+        expression = self.match_expression(terms)
+        if not expression:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, -bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s ORDER BY score DESC LIMIT %s",
+                [expression, limit],
+            )
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+class MySQLFulltextBackend(LikeBackend):
+    """FULLTEXT 索引由数据库维护，写入 CandidateSearchDocument 即完成索引"""
+
+    def search(self, terms, limit):
+        expression = " ".join('+"{}"'.format(term.replace('"', " ")) for term in terms)
+        table = CandidateSearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT candidate_id, MATCH(content) AGAINST(%s IN BOOLEAN MODE) AS score FROM {table} "
+                f"WHERE MATCH(content) AGAINST(%s IN BOOLEAN MODE) ORDER BY score DESC LIMIT %s",
+                [expression, expression, limit],
+            )
+            return [(row[0], float(row[1])) for row in cursor.fetchall()]
+
+
+def get_backend():
+    if connection.vendor == "sqlite":
+        return SQLiteFTSBackend()
+    if connection.vendor == "mysql":
+        return MySQLFulltextBackend()
+    return LikeBackend()
+
+
+# ==============
+# 🔄 索引维护
+# ==============
+def index_candidate(candidate):
+    content = build_document(candidate)
+    CandidateSearchDocument.objects.update_or_create(candidate=candidate, defaults={"content": content})
+    get_backend().index(candidate.pk, content)
+
+
+def remove_candidates(candidate_ids):
+    get_backend().remove(candidate_ids)
+
+
+def rebuild_index(chunk_size=1000):
+    """重建全部检索文档（批量导入等绕过 save 信号的操作之后执行）"""
+    backend = get_backend()
+    CandidateSearchDocument.objects.all().delete()
+    if isinstance(backend, SQLiteFTSBackend):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    total = 0
+    batch = []
+    for candidate in Candidate.objects.only("id", *Candidate.SEARCH_FIELDS).iterator(chunk_size=chunk_size):
+        batch.append(CandidateSearchDocument(candidate_id=candidate.id, content=build_document(candidate)))
+        if len(batch) >= chunk_size:
+            total += _flush(backend, batch)
+            batch = []
+    total += _flush(backend, batch)
+    return total
+
+
+def index_candidates(candidates, replace=True):
+    """
+    批量写入检索文档（批量导入等不触发 save 信号的写入之后调用）。
+    replace=False 表示候选人是刚插入的，没有旧文档需要删除
+    """
+    documents = [(c.pk, build_document(c)) for c in candidates]
+    if not documents:
+        return 0
+    if replace:
+        CandidateSearchDocument.objects.filter(candidate_id__in=[pk for pk, _ in documents]).delete()
+    now = timezone.now()
+    insert_rows(
+        CandidateSearchDocument, ("candidate", "content", "updated_at"),
+        [(pk, content, now) for pk, content in documents],
+    )
+    get_backend().index_many(documents, replace)
+    return len(documents)
+
+
+def _flush(backend, documents):
+    CandidateSearchDocument.objects.bulk_create(documents)
+    backend.index_many(((document.candidate_id, document.content) for document in documents), replace=False)
+    return len(documents)
+
+
+# ==============
+# ✨ 检索与高亮
+# ==============
+def match_spans(content, terms):
+    """
+    命中词在原始文本中的 [start, end) 区间，按位置排序、互不重叠（长词优先）。
+    逐字符规范化并记录每个字符来自原文的位置，NFKC 改变长度（如全角、连字）时偏移仍然正确
+    """
+    chars, offsets = [], []
+    for index, char in enumerate(content):
+        for normalized in normalize(char):
+            chars.append(normalized)
+            offsets.append(index)
+    lowered = "".join(chars)
+
+    found = []
+    for term in sorted(set(terms), key=len, reverse=True):
+        for match in re.finditer(re.escape(term), lowered):
+            start, end = match.span()
+            if not any(start < other_end and other_start < end for other_start, other_end in found):
+                found.append((start, end))
+    return sorted((offsets[start], offsets[end - 1] + 1) for start, end in found)
+
+
+def _escape(text):
+    return html.escape(text).replace("\n", " ｜ ")
+
+
+def make_snippet(content, terms, width=80):
+    """截取第一个命中词附近的文本，命中词用 <mark> 包裹；在原文上定位命中词后逐段 HTML 转义"""
+    spans = match_spans(content, terms)
+    start = max(spans[0][0] - width // 4, 0) if spans else 0
+    end = start + width
+
+    pieces = []
+    position = start
+    for span_start, span_end in spans:
+        span_start, span_end = max(span_start, position), min(span_end, end)
+        if span_start >= span_end:
+            continue
+        pieces.append(_escape(content[position:span_start]))
+        pieces.append(f"<mark>{_escape(content[span_start:span_end])}</mark>")
+        position = span_end
+    pieces.append(_escape(content[position:end]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    return f"{prefix}{''.join(pieces)}{suffix}"
+
+
+def search_candidates(query, limit=20):
+    """返回 [(candidate, score, snippet)]，按相关度降序"""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    ranked = get_backend().search(terms, limit)
+    ids = [candidate_id for candidate_id, _ in ranked]
+    candidates = Candidate.objects.in_bulk(ids)
+    contents = dict(
+        CandidateSearchDocument.objects.filter(candidate_id__in=ids).values_list("candidate_id", "content")
+    )
+    return [
+        (candidates[candidate_id], round(score, 6), make_snippet(contents.get(candidate_id, ""), terms))
+        for candidate_id, score in ranked
+        if candidate_id in candidates
+    ]
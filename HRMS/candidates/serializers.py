@@ -1,23 +1,105 @@
 # candidates/serializers.py
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Candidate, CooperationRecord, Favorite
+from .models import (
+    Candidate, CooperationRecord, Experience, ExportJob, Favorite, ImportJob, IngestionJob, IngestionTask,
+)
+from .fieldsets import SparseFieldsMixin
+from .ingestion import normalize_email, normalize_phone
 
-class CandidateSerializer(serializers.ModelSerializer):
+def favorite_ids_for(user):
+    """用户收藏的候选人 id 集合，一次查询"""
+    if user is None or not user.is_authenticated:
+        return set()
+    return set(Favorite.objects.filter(user=user).values_list('candidate_id', flat=True))
+
+
+class ExperienceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Experience
+        fields = (
+            'company', 'position', 'start_date', 'end_date', 'is_current',
+            'months', 'is_education', 'description',
+        )
+
+
+class CandidateSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
+    # 结构化工作经历，需 ?expand=experiences（详情接口默认返回）
+    experiences = ExperienceSerializer(many=True, read_only=True)
     
     class Meta:
         model = Candidate
         fields = "__all__"
+        # 合作汇总由合作记录维护（cooperation.py），简历指纹由上传流程写入，接口不可修改
+        read_only_fields = (
+            'cooperation_count', 'last_cooperation_date', 'best_cooperation_result',
+            'worst_cooperation_result', 'latest_project', 'resume_sha256',
+        )
+        heavy_fields = ('experiences',)
     
     def get_is_favorited(self, obj):
-        """检查当前用户是否收藏了该候选人"""
-        request = self.context.get('request')
-        if request and hasattr(request, 'user') and request.user.is_authenticated:
-            return Favorite.objects.filter(user=request.user, candidate=obj).exists()
-        return False
+        """
+        检查当前用户是否收藏了该候选人。
+        收藏 id 集合取自 context['favorite_ids']；未提供时按请求用户查询一次并写回 context，
+        many=True 时所有子序列化器共用同一个 context，整个列表只查询一次。
+        """
+        favorite_ids = self.context.get('favorite_ids')
+        if favorite_ids is None:
+            request = self.context.get('request')
+            favorite_ids = favorite_ids_for(getattr(request, 'user', None))
+            self.context['favorite_ids'] = favorite_ids
+        return obj.id in favorite_ids
+
+    def validate_phone(self, value):
+        """与导入、判重一致：去掉空格、横线和 +86 前缀"""
+        return self._unique_normalized('phone', normalize_phone(value), value)
+
+    def validate_email(self, value):
+        return self._unique_normalized('email', normalize_email(value), value)
+
+    def _unique_normalized(self, field, normalized, value):
+        """字段自带的唯一性校验针对原始输入，规范化后的值可能与其他候选人重复"""
+        if normalized != value:
+            others = Candidate.objects.filter(**{field: normalized})
+            if self.instance is not None:
+                others = others.exclude(pk=self.instance.pk)
+            if others.exists():
+                label = Candidate._meta.get_field(field).verbose_name
+                raise serializers.ValidationError(f"{label} {normalized} 已被其他候选人使用")
+        return normalized
+
+
+class CandidateListSerializer(CandidateSerializer):
+    """列表精简表示：工作经历、简历文件等大字段默认不返回，?expand= 或详情接口获取"""
+
+    class Meta(CandidateSerializer.Meta):
+        heavy_fields = ('experience', 'experiences', 'resume_file', 'resume_sha256')
+
+
+class CandidateCooperationSerializer(serializers.ModelSerializer):
+    """嵌入候选人详情的合作记录（不重复候选人信息）"""
+    class Meta:
+        model = CooperationRecord
+        exclude = ('candidate',)
+
+
+class CandidateDetailSerializer(CandidateSerializer):
+    """详情：包含全部字段、结构化工作经历及合作记录"""
+    cooperations = CandidateCooperationSerializer(many=True, read_only=True)
+
+    class Meta(CandidateSerializer.Meta):
+        heavy_fields = ()
+
+
+class CandidateBulkChangesSerializer(serializers.ModelSerializer):
+    """批量修改允许的字段，只校验一次后应用到所有选中的候选人"""
+    class Meta:
+        model = Candidate
+        fields = ('match_level', 'cooperation_status')
 
 
-class CooperationRecordSerializer(serializers.ModelSerializer):
+class CooperationRecordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     candidate_name = serializers.CharField(source='candidate.name', read_only=True)
     
     class Meta:
@@ -31,3 +113,78 @@ class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Favorite
         fields = "__all__"
+
+
+class IngestionTaskSerializer(serializers.ModelSerializer):
+    candidate_name = serializers.CharField(source='candidate.name', read_only=True, default=None)
+    match_level = serializers.CharField(source='candidate.match_level', read_only=True, default=None)
+
+    class Meta:
+        model = IngestionTask
+        fields = (
+            'id', 'file_name', 'status', 'error', 'attempts',
+            'candidate', 'candidate_name', 'match_level', 'matched_by', 'timings', 'updated_at',
+        )
+
+
+class IngestionJobSerializer(serializers.ModelSerializer):
+    tasks = IngestionTaskSerializer(many=True, read_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = IngestionJob
+        fields = (
+            'id', 'status', 'total', 'on_duplicate', 'created_by',
+            'created_at', 'finished_at', 'progress', 'tasks',
+        )
+
+    def get_progress(self, obj):
+        """按状态统计文件数，tasks 已 prefetch，不产生额外查询"""
+        counts = {key: 0 for key, _ in IngestionTask.STATUS_CHOICES}
+        for task in obj.tasks.all():
+            counts[task.status] += 1
+        finished = sum(counts[key] for key in IngestionTask.FINISHED_STATUSES)
+        return {
+            'finished': finished,
+            'succeeded': counts['done'] + counts['updated'],
+            'duplicates': counts['duplicate'],
+            'failed': counts['failed'],
+            'percent': round(finished * 100 / obj.total) if obj.total else 100,
+            'by_status': counts,
+        }
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = (
+            'id', 'format', 'filters', 'status', 'row_count', 'size', 'error',
+            'created_by', 'created_at', 'finished_at', 'download_url',
+        )
+
+    def get_download_url(self, obj):
+        if obj.status != 'done':
+            return None
+        url = reverse('export-job-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    error_report_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = (
+            'id', 'file_name', 'on_duplicate', 'status', 'total_rows', 'created_count', 'updated_count',
+            'skipped_count', 'error_count', 'error', 'created_by', 'created_at', 'finished_at', 'error_report_url',
+        )
+
+    def get_error_report_url(self, obj):
+        if not obj.error_report:
+            return None
+        url = reverse('import-job-errors', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,93 @@
+# candidates/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import events, search, stats
+from .changes import record_deletions
+from .cooperation import refresh_rollups
+from .experience import sync_experiences
+from .models import Candidate, CooperationRecord, Favorite
+
+UNCHANGED_UNKNOWN = object()  # 新建或未从数据库加载的实例，无法判断字段是否变化
+
+
+@receiver(post_save, sender=Candidate)
+def sync_search_document(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """检索字段变化时刷新检索文档；只改评分、合作状态等其它字段的 save 跳过"""
+    if raw or (update_fields is not None and not set(update_fields) & set(Candidate.SEARCH_FIELDS)):
+        return
+    values = instance.search_field_values()
+    if not created and getattr(instance, '_loaded_search_fields', UNCHANGED_UNKNOWN) == values:
+        return
+    search.index_candidate(instance)
+    instance._loaded_search_fields = values
+
+
+@receiver(post_save, sender=Candidate)
+def sync_candidate_experiences(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """工作经历变化时重建结构化经历行；经历与加载时相同的 save（如 PATCH 评分）跳过"""
+    if raw or (update_fields is not None and 'experience' not in update_fields):
+        return
+    if not created and getattr(instance, '_loaded_experience', UNCHANGED_UNKNOWN) == instance.experience:
+        return
+    sync_experiences(instance)
+    instance._loaded_experience = instance.experience
+
+
+@receiver(post_delete, sender=Candidate)
+def drop_search_document(sender, instance, **kwargs):
+    # 检索文档随候选人级联删除，FTS 虚拟表需要单独清理
+    search.remove_candidates([instance.pk])
+
+
+@receiver(post_delete, sender=Candidate)
+def record_candidate_tombstone(sender, instance, **kwargs):
+    """记录删除，供增量同步接口返回已删除的 id"""
+    record_deletions([instance.pk])
+
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def invalidate_stats(sender, **kwargs):
+    """候选人新增 / 修改 / 删除后清除统计缓存"""
+    stats.invalidate()
+
+
+@receiver(post_save, sender=CooperationRecord)
+@receiver(post_delete, sender=CooperationRecord)
+def sync_cooperation_rollups(sender, instance, raw=False, origin=None, **kwargs):
+    """合作记录新增 / 修改 / 删除后重新汇总候选人的合作情况（与记录写入同一事务）"""
+    # 删除候选人时级联删除的记录无需汇总
+    if raw or isinstance(origin, Candidate) or getattr(origin, 'model', None) is Candidate:
+        return
+    refresh_rollups(instance.candidate_id, getattr(instance, '_loaded_candidate_id', None))
+
+
+def _action(created):
+    """post_save 的 created 为 True / False，post_delete 没有该参数"""
+    if created is None:
+        return 'deleted'
+    return 'created' if created else 'updated'
+
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def publish_candidate_event(sender, instance, created=None, raw=False, **kwargs):
+    if not raw:
+        events.publish('candidates', _action(created), ids=[instance.pk])
+
+
+@receiver(post_save, sender=CooperationRecord)
+@receiver(post_delete, sender=CooperationRecord)
+def publish_cooperation_event(sender, instance, created=None, raw=False, **kwargs):
+    if not raw:
+        events.publish('cooperations', _action(created), ids=[instance.pk], candidate_id=instance.candidate_id)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def publish_favorite_event(sender, instance, created=None, raw=False, **kwargs):
+    """收藏事件带 user_id，只推送给本人"""
+    if not raw:
+        action = 'removed' if created is None else 'added'
+        events.publish('favorites', action, candidate_id=instance.candidate_id, user_id=instance.user_id)
@@ -0,0 +1,101 @@
+# candidates/stats.py
+"""
+候选人统计（数据看板 / 系统设置页）
+
+- 总数、评分分布、合作状态分布用条件聚合在一条 SQL 中算出；
+  Base 与专业分布通过 UNION 合并为第二条 SQL
+- 结果写入 Django 缓存，候选人新增 / 修改 / 删除时由信号清除
+- 每份结果带 ETag 与 Last-Modified，浏览器可条件请求拿到 304
+- 清除缓存时发布 stats 事件，打开的看板由推送更新，不必轮询；推送服务的缓存早于事件时
+  重新计算（最多每 EVENT_STATS_INTERVAL 秒一次），不依赖各进程共享缓存
+"""
+import json
+import time
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, Q, Value
+from django.utils import timezone
+
+from . import events
+from .models import Candidate
+
+CACHE_KEY = "candidates:stats"
+
+MATCH_LEVELS = [value for value, _ in Candidate._meta.get_field("match_level").choices]
+COOPERATION_STATUSES = [value for value, _ in Candidate._meta.get_field("cooperation_status").choices]
+
+
+def compute_stats():
+    aggregates = {"total": Count("id")}
+    for level in MATCH_LEVELS:
+        aggregates[f"level_{level}"] = Count("id", filter=Q(match_level=level))
+    for index, status in enumerate(COOPERATION_STATUSES):
+        aggregates[f"coop_{index}"] = Count("id", filter=Q(cooperation_status=status))
+    counts = Candidate.objects.aggregate(**aggregates)
+
+    cooperation_distribution = {}
+    for index, status in enumerate(COOPERATION_STATUSES):
+        if counts[f"coop_{index}"]:
+            cooperation_distribution[status] = counts[f"coop_{index}"]
+    # 历史数据中可能存在不在 choices 内的状态
+    others = counts["total"] - sum(cooperation_distribution.values())
+    if others:
+        extra = (
+            Candidate.objects.exclude(cooperation_status__in=COOPERATION_STATUSES)
+            .values_list("cooperation_status").annotate(count=Count("id")).order_by()
+        )
+        cooperation_distribution.update(dict(extra))
+
+    base_stats = (
+        Candidate.objects.annotate(kind=Value("base", output_field=CharField()))
+        .values_list("kind", "base").annotate(count=Count("id")).order_by()
+    )
+    major_stats = (
+        Candidate.objects.annotate(kind=Value("major", output_field=CharField()))
+        .values_list("kind", "major").annotate(count=Count("id")).order_by()
+    )
+    base_distribution = {}
+    major_distribution = {}
+    for kind, value, count in base_stats.union(major_stats, all=True):
+        if kind == "base":
+            base_distribution[value] = count
+        else:
+            major = value or "未知"
+            major_distribution[major] = major_distribution.get(major, 0) + count
+
+    return {
+        "total": counts["total"],
+        "scoreDistribution": {level: counts[f"level_{level}"] for level in MATCH_LEVELS},
+        "cooperationDistribution": cooperation_distribution,
+        "baseDistribution": base_distribution,
+        "majorDistribution": major_distribution,
+    }
+
+
+def get_stats(refresh=False):
+    """
+    返回 {"data", "etag", "last_modified", "computed_at"}，优先读取缓存。
+    refresh=True 时跳过缓存重新计算：其它进程的失效清不到本进程的内存缓存（LocMemCache）
+    """
+    entry = None if refresh else cache.get(CACHE_KEY)
+    if entry is None:
+        started = time.time()
+        data = compute_stats()
+        digest = hashlib.md5(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        entry = {
+            "data": data,
+            "etag": f'"{digest}"',
+            "last_modified": int(timezone.now().timestamp()),
+            # 开始计算的时间：早于此时提交的修改都已包含在结果中
+            "computed_at": started,
+        }
+        cache.set(CACHE_KEY, entry, settings.STATS_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+    # 已订阅统计的页面收到通知后推送变化的统计项（events.EventStream）
+    events.publish("stats", "changed")
@@ -1,3 +1,1537 @@
-from django.test import TestCase
+import io
+import os
+import json
+import hashlib
+import importlib
+import random
+import re
+import signal
+import multiprocessing
+import time
+import tempfile
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import ResolverMatch, URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .ai_client import AIClient, AIClientError, TokenBucket
+from . import events, extraction, parse_cache, search, stats
+from .benchmark import corpus, stub_ai
+from .benchmark.data import generate
+from .benchmark.load import percentile
+from .cooperation import rebuild_rollups
+from .export import write_xlsx
+from .extraction import extract_pdf_text
+from .filters import filter_candidates
+from .importer import _existing_candidates, import_candidates
+from .export_jobs import claim_next_export, prune_exports, run_export
+from .ingestion import (
+    DuplicateCandidate, IngestionResult, candidate_fields, claim_next_task, find_duplicate, process_resumes,
+    requeue_stale_tasks, run_task,
+)
+from .models import (
+    AIParseCache, Candidate, CandidateSearchDocument, CandidateTombstone, CooperationRecord, Experience, ExportJob,
+    Favorite, IngestionJob, IngestionTask,
+)
+from .querybudget import QueryBudgetExceeded, QueryBudgetMiddleware, fingerprint, query_budget
+from .search import build_document, make_snippet, search_candidates, tokenize
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    """本地模拟 DashScope chat/completions 接口"""
+    latency = 0.0
+    fail_first = 0  # 前 N 次请求返回 429
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with self.lock:
+            type(self).calls += 1
+            failing = self.calls <= self.fail_first
+        time.sleep(self.latency)
+
+        if failing:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps({
+            "choices": [{"message": {"content": '{"data": {"name": "张三"}, "score": "A"}'}}],
+            "usage": {"total_tokens": 100},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class AIClientTests(SimpleTestCase):
+    def setUp(self):
+        StubChatHandler.latency = 0.0
+        StubChatHandler.fail_first = 0
+        StubChatHandler.calls = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubChatHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1/chat/completions"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_client(self, **kwargs):
+        options = {"api_url": self.url, "api_key": "test", "timeout": 5, "backoff_base": 0.01}
+        options.update(kwargs)
+        return AIClient(**options)
+
+    def test_batch_runs_concurrently(self):
+        StubChatHandler.latency = 0.3
+        client = self.make_client(max_concurrency=10)
+
+        started = time.monotonic()
+        results = client.map(client.chat, ["简历"] * 10)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(isinstance(r, str) for r in results))
+        self.assertLess(elapsed, 1.5)
+
+    def test_retries_on_429(self):
+        StubChatHandler.fail_first = 2
+        client = self.make_client(max_retries=3)
+
+        self.assertIn("张三", client.chat("简历"))
+        self.assertEqual(StubChatHandler.calls, 3)
+
+    def test_gives_up_after_max_retries(self):
+        StubChatHandler.fail_first = 10
+        client = self.make_client(max_retries=1)
+
+        with self.assertRaises(AIClientError):
+            client.chat("简历")
+        self.assertEqual(StubChatHandler.calls, 2)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_blocks_until_refilled(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(60, clock=lambda: now[0], sleep=sleep)
+        for _ in range(60):
+            bucket.acquire()
+        self.assertEqual(sleeps, [])
+
+        bucket.acquire()
+        self.assertAlmostEqual(sum(sleeps), 1.0)
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(0)
+        for _ in range(1000):
+            bucket.acquire(1000)
+
+
+class TempMediaMixin:
+    """上传的简历、导出文件写到临时目录，测试结束后删除"""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = self.settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class ParseCacheTests(TempMediaMixin, TestCase):
+    """AI 解析缓存：规范化后的文本 + 提示词版本为键，缓存只在调用线程读写"""
+
+    def test_hit_miss_and_normalized_key(self):
+        self.assertEqual(parse_cache.lookup_many(["Ｐｈｙｓｉｃｓ  Teacher\n", "其它"], "v1"), [None, None])
+        parse_cache.store_many([("Ｐｈｙｓｉｃｓ  Teacher\n", {"score": "A"}), ("其它", None)], "v1")
+
+        self.assertEqual(parse_cache.lookup_many([" physics teacher", "其它"], "v1"), [{"score": "A"}, None])
+        self.assertEqual(parse_cache.lookup_many(["physics teacher"], "v2"), [None])
+        self.assertEqual(AIParseCache.objects.get().hits, 1)
+        self.assertEqual(parse_cache.stats("v1")["hits"], 1)
+        self.assertEqual(parse_cache.stats("v1")["misses"], 3)
+
+    def test_prune(self):
+        now = timezone.now()
+        for i, days in enumerate([0, 1, 2, 200]):
+            parse_cache.store_many([(f"简历{i}", {"i": i})], "v1")
+            AIParseCache.objects.filter(key=parse_cache.make_key(f"简历{i}", "v1")).update(
+                last_used_at=now - timedelta(days=days)
+            )
+        self.assertEqual(parse_cache.prune(max_entries=2, max_age_days=180), 2)
+        self.assertEqual(
+            parse_cache.lookup_many(["简历0", "简历1", "简历2", "简历3"], "v1"), [{"i": 0}, {"i": 1}, None, None]
+        )
+
+    @override_settings(PDF_EXTRACT_PROCESSES=0, AI_PARSE_CACHE_ENABLED=True)
+    def test_batch_reads_cache_in_calling_thread(self):
+        threads = []
+
+        def record(name, fn):
+            def wrapper(*args):
+                threads.append((name, threading.current_thread()))
+                return fn(*args)
+            return wrapper
+
+        pdfs = [corpus.make_pdf(corpus.resume_lines(random.Random(i), i)) for i in range(3)]
+        fake_ai = mock.Mock(side_effect=lambda text: stub_ai.parse_resume(text))
+        with mock.patch("candidates.ingestion.request_ai_parse", record("request_ai_parse", fake_ai)), \
+                mock.patch.object(parse_cache, "lookup_many", record("lookup_many", parse_cache.lookup_many)), \
+                mock.patch.object(parse_cache, "store_many", record("store_many", parse_cache.store_many)):
+            for on_duplicate in ("skip", "update"):
+                files = [SimpleUploadedFile(f"{i}.pdf", pdf) for i, pdf in enumerate(pdfs)]
+                results, _ = process_resumes(files, on_duplicate=on_duplicate)
+                self.assertTrue(all(isinstance(outcome, IngestionResult) for _, outcome in results))
+
+        self.assertEqual(fake_ai.call_count, 3)  # 第二次全部命中缓存
+        self.assertEqual(Candidate.objects.count(), 3)
+        main = threading.current_thread()
+        self.assertEqual(
+            [name for name, thread in threads if thread is main],
+            ["lookup_many", "store_many", "lookup_many"],
+        )
+        self.assertTrue(all(thread is not main for name, thread in threads if name == "request_ai_parse"))
+
+
+@override_settings(PDF_EXTRACT_PROCESSES=0, AI_PARSE_CACHE_ENABLED=False)
+class DuplicateDetectionTests(TempMediaMixin, TestCase):
+    """上传判重：简历指纹 → 电话 → 邮箱；历史数据与 PATCH 写入同样规范化"""
+
+    def resume(self, number, phone=None, email=None):
+        lines = corpus.resume_lines(random.Random(number), number)
+        lines[2] = f"电话：{phone}" if phone else lines[2]
+        lines[3] = f"邮箱：{email}" if email else lines[3]
+        return corpus.make_pdf(lines)
+
+    def test_matches_by_fingerprint_phone_and_email(self):
+        pdfs = [self.resume(1), self.resume(2, phone="+86-138-0000-0001"), self.resume(3, email="Alice@Example.COM")]
+        alice = Candidate.objects.create(
+            name="Alice", phone="13800000001", email="alice@example.com",
+            resume_sha256=hashlib.sha256(pdfs[0]).hexdigest(),
+        )
+
+        def upload(on_duplicate):
+            files = [SimpleUploadedFile(f"{i}.pdf", pdf) for i, pdf in enumerate(pdfs)]
+            with mock.patch("candidates.ingestion.request_ai_parse", stub_ai.parse_resume):
+                return [outcome for _, outcome in process_resumes(files, on_duplicate=on_duplicate)[0]]
+
+        skipped = upload("skip")
+        self.assertTrue(all(isinstance(outcome, DuplicateCandidate) for outcome in skipped))
+        self.assertEqual([outcome.matched_by for outcome in skipped], ["file", "phone", "email"])
+        self.assertEqual({outcome.candidate.id for outcome in skipped}, {alice.id})
+
+        updated = upload("update")
+        self.assertEqual([(outcome.candidate.id, outcome.created) for outcome in updated], [(alice.id, False)] * 3)
+        self.assertEqual(Candidate.objects.count(), 1)
+        alice.refresh_from_db()
+        self.assertEqual(alice.resume_sha256, hashlib.sha256(pdfs[2]).hexdigest())
+
+    def test_legacy_contacts_and_patch_are_normalized(self):
+        legacy = Candidate.objects.create(name="旧数据", phone="+86 138-0000-0001", email=" Foo@X.com")
+        clash = Candidate.objects.create(name="重复", phone="+86 13800000002", email="bar@x.com")
+        Candidate.objects.create(name="已规范", phone="13800000002", email="baz@x.com")
+        migration = importlib.import_module("candidates.migrations.0019_normalize_contacts")
+        migration.normalize_contacts(django_apps, None)
+
+        legacy.refresh_from_db()
+        clash.refresh_from_db()
+        self.assertEqual((legacy.phone, legacy.email), ("13800000001", "foo@x.com"))
+        self.assertEqual(clash.phone, "+86 13800000002")  # 会与其他候选人重复，保持原样
+        self.assertEqual(find_duplicate(phones=["13800000001"]), (legacy, "phone"))
+
+        client = APIClient()
+        response = client.patch(f"/api/candidates/{legacy.id}/", {"phone": "+86 139 0000 0003", "email": "Foo@Y.com"}, format="json")
+        self.assertEqual((response.json()["phone"], response.json()["email"]), ("13900000003", "foo@y.com"))
+        response = client.patch(f"/api/candidates/{legacy.id}/", {"phone": "138-0000-0002"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("已被其他候选人使用", response.json()["phone"][0])
+
+
+@override_settings(PDF_EXTRACT_PROCESSES=0, AI_PARSE_CACHE_ENABLED=False, INGESTION_TASK_TIMEOUT=600, INGESTION_MAX_ATTEMPTS=2)
+class IngestionQueueTests(TempMediaMixin, TestCase):
+    """异步导入队列：带状态条件的 UPDATE 领取、超时回收、任务进度接口"""
+
+    def upload(self, *pdfs):
+        files = [SimpleUploadedFile(f"{i}.pdf", pdf) for i, pdf in enumerate(pdfs)]
+        response = APIClient().post("/api/candidates/upload/jobs/", {"files": files}, format="multipart")
+        self.assertEqual(response.status_code, 202)
+        return IngestionJob.objects.get(id=response.json()["job_id"])
+
+    def expire(self, task):
+        IngestionTask.objects.filter(id=task.id).update(locked_at=timezone.now() - timedelta(seconds=601))
+
+    def test_double_claim(self):
+        job = self.upload(b"%PDF-1.4")
+        task = claim_next_task("worker-a")
+        self.assertEqual((task.job_id, task.status, task.worker, task.attempts), (job.id, "extracting", "worker-a", 1))
+        self.assertIsNone(claim_next_task("worker-b"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "running")
+
+        # worker-b 读到的待处理 id 已被 worker-a 抢先领取：条件 UPDATE 不命中，不会重复领取
+        with mock.patch("django.db.models.query.QuerySet.values_list", return_value=[task.id]):
+            self.assertIsNone(claim_next_task("worker-b"))
+        task.refresh_from_db()
+        self.assertEqual((task.worker, task.attempts), ("worker-a", 1))
+
+    def test_requeue_after_lease_expires(self):
+        job = self.upload(b"%PDF-1.4")
+        task = claim_next_task("worker-a")
+        self.assertEqual(requeue_stale_tasks(), 0)  # 租约未过期
+
+        self.expire(task)
+        self.assertEqual(requeue_stale_tasks(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.worker, task.locked_at), ("pending", None, None))
+
+        task = claim_next_task("worker-b")
+        self.assertEqual((task.worker, task.attempts), ("worker-b", 2))
+        self.expire(task)
+        self.assertEqual(requeue_stale_tasks(), 0)  # 已达最大重试次数
+        task.refresh_from_db()
+        job.refresh_from_db()
+        self.assertEqual((task.status, task.error), ("failed", "处理超时"))
+        self.assertEqual(job.status, "done")
+        self.assertIsNone(claim_next_task("worker-c"))
+
+    def test_consumer_survives_database_errors(self):
+        worker = importlib.import_module("candidates.management.commands.run_ingestion_worker")
+        claim = mock.Mock(side_effect=[OperationalError("database is locked"), None])
+        stopping = threading.Event()
+        with mock.patch.object(worker, "claim_next_task", claim), \
+                mock.patch.object(worker, "close_old_connections") as close_old_connections, \
+                mock.patch.object(worker, "connections"), \
+                mock.patch.object(stopping, "wait") as wait, \
+                self.assertLogs(worker.logger, "ERROR") as logs:
+            worker.consume(stopping, 0.5, once=True)
+
+        # 出错后丢弃失效连接、等待后重试，第二轮队列为空正常退出
+        self.assertEqual(claim.call_count, 2)
+        close_old_connections.assert_called_once_with()
+        wait.assert_called_once_with(0.5)
+        self.assertIn("database is locked", logs.output[0])
+
+    def test_job_status_and_progress(self):
+        pdf = corpus.make_pdf(corpus.resume_lines(random.Random(1), 1))
+        job = self.upload(pdf, b"not a pdf")
+        url = f"/api/candidates/upload/jobs/{job.id}/"
+
+        data = APIClient().get(url).json()
+        self.assertEqual((data["status"], data["total"]), ("pending", 2))
+        self.assertEqual(data["progress"]["finished"], 0)
+        self.assertEqual(data["progress"]["percent"], 0)
+        self.assertEqual([task["status"] for task in data["tasks"]], ["pending", "pending"])
+
+        stages = []
+        with mock.patch("candidates.ingestion.request_ai_parse", stub_ai.parse_resume):
+            task = claim_next_task("worker-a")
+            with mock.patch("candidates.ingestion._set_task_stage", side_effect=lambda t, stage: stages.append(stage)):
+                run_task(task)
+            data = APIClient().get(url).json()
+            self.assertEqual((data["status"], data["progress"]["percent"]), ("running", 50))
+            run_task(claim_next_task("worker-a"))
+
+        self.assertEqual(stages, ["parsing", "saving"])
+        data = APIClient().get(url).json()
+        self.assertEqual(data["status"], "done")
+        self.assertIsNotNone(data["finished_at"])
+        progress = data["progress"]
+        self.assertEqual(
+            (progress["finished"], progress["succeeded"], progress["failed"], progress["percent"]), (2, 1, 1, 100)
+        )
+        tasks = {task["file_name"]: task for task in data["tasks"]}
+        self.assertEqual((tasks["0.pdf"]["status"], tasks["1.pdf"]["status"]), ("done", "failed"))
+        self.assertEqual(tasks["0.pdf"]["candidate_name"], Candidate.objects.get().name)
+        self.assertTrue(tasks["1.pdf"]["error"])
+
+
+def extract_in_child(results, source):
+    """worker 子进程中的解析（与 run_ingestion_worker 一样由 fork 创建）"""
+    try:
+        text, _ = extraction.extract(source)
+        results.put(text)
+    except Exception as e:
+        results.put(f"{type(e).__name__}: {e}")
+    finally:
+        extraction.shutdown_pool()
+
+
+@override_settings(PDF_EXTRACT_PROCESSES=1)
+class ExtractionTests(SimpleTestCase):
+    def setUp(self):
+        self.pdf = corpus.make_pdf(["电话：18000000001", "邮箱：resume1@corpus.example.com"])
+
+    def extract_in_worker(self, daemon):
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        worker = context.Process(target=extract_in_child, args=(results, self.pdf), daemon=daemon)
+        worker.start()
+        try:
+            return results.get(timeout=60)
+        finally:
+            worker.join(timeout=10)
+            self.assertFalse(worker.is_alive(), "worker 子进程未能退出")
+
+    def test_extract_in_worker_process(self):
+        # 非守护子进程使用解析进程池；守护子进程不能创建子进程，退回当前线程解析
+        for daemon in (False, True):
+            with self.subTest(daemon=daemon):
+                self.assertIn("resume1@corpus.example.com", self.extract_in_worker(daemon))
+
+    def test_page_and_char_limits(self):
+        lines = [f"page{page} line{line}" for page in range(1, 11) for line in range(corpus.LINES_PER_PAGE)]
+        pdf = corpus.make_pdf(lines)
+
+        text, _ = extract_pdf_text(pdf)
+        self.assertIn("page10", text)
+        text, _ = extract_pdf_text(pdf, max_pages=3)
+        self.assertIn("page3", text)
+        self.assertNotIn("page4", text)
+        # 读满 max_chars 后在当前页结束处停止
+        text, _ = extract_pdf_text(pdf, max_chars=1)
+        self.assertIn("page1", text)
+        self.assertNotIn("page2", text)
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+            f.write(pdf)
+            f.flush()
+            self.assertEqual(extract_pdf_text(f.name, max_pages=3)[0], extract_pdf_text(pdf, max_pages=3)[0])
+
+    def test_timeout_and_broken_pdf(self):
+        lines = [f"line{i}" for i in range(corpus.LINES_PER_PAGE * 300)]
+        handler = signal.getsignal(signal.SIGALRM)
+        with self.assertRaises(extraction.ExtractionTimeout):
+            extract_pdf_text(corpus.make_pdf(lines), timeout=0.01)
+        # 计时器已取消，原有信号处理函数已恢复
+        self.assertEqual(signal.getitimer(signal.ITIMER_REAL), (0.0, 0.0))
+        self.assertIs(signal.getsignal(signal.SIGALRM), handler)
+
+        with self.assertRaisesMessage(extraction.ExtractionError, "PDF 解析失败"):
+            extract_pdf_text(b"not a pdf", timeout=5)
+
+    @override_settings(PDF_EXTRACT_TIMEOUT=1)
+    def test_parent_timeout_resets_pool(self):
+        # 子进程未能自行中止（例如卡在 C 扩展中）：父进程超过宽限期后重建进程池
+        future = mock.Mock(running=mock.Mock(return_value=True), result=mock.Mock(side_effect=FutureTimeoutError))
+        with mock.patch.object(extraction.time, "monotonic", side_effect=[0, 3, 7]), \
+                mock.patch.object(extraction, "_reset_pool") as reset_pool, \
+                self.assertLogs("candidates.extraction", "ERROR"):
+            with self.assertRaises(extraction.ExtractionTimeout):
+                extraction.result(future)
+        self.assertEqual(future.result.call_count, 2)  # 宽限期 6 秒：第一次等待未超出，第二次超出
+        reset_pool.assert_called_once_with(future.executor)
+
+    def test_reset_only_owning_pool(self):
+        # 其它线程已重建进程池：旧任务的超时 / 异常退出不能终止新进程池
+        process = mock.Mock()
+        stale, current = mock.Mock(_processes={}), mock.Mock(_processes={1: process})
+        with mock.patch.object(extraction, "_pool", current):
+            extraction._reset_pool(stale)
+            future = mock.Mock(executor=stale, result=mock.Mock(side_effect=BrokenProcessPool))
+            with self.assertRaises(extraction.ExtractionError), self.assertLogs("candidates.extraction", "ERROR"):
+                extraction.result(future)
+            self.assertIs(extraction._pool, current)
+            process.terminate.assert_not_called()
+            current.shutdown.assert_not_called()
+
+            extraction._reset_pool(current)
+            self.assertIsNone(extraction._pool)
+            process.terminate.assert_called_once_with()
+            current.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+
+class QueryPlanTests(TestCase):
+    """热点查询必须走索引：EXPLAIN 中出现全表扫描或额外排序即失败"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="hr")
+        candidates = Candidate.objects.bulk_create([
+            Candidate(
+                name=f"候选人{i}", phone=f"1380000{i:04d}", email=f"c{i}@example.com",
+                education="本科", base="上海", major="数学", age=20 + i % 20, match_level="ABCDE"[i % 5],
+            )
+            for i in range(50)
+        ])
+        CooperationRecord.objects.create(candidate=candidates[0], project_name="夏令营", start_date="2025-07-01")
+        Favorite.objects.create(user=cls.user, candidate=candidates[0])
+
+    def hot_queries(self):
+        return {
+            "candidate list": Candidate.objects.order_by("-created_at", "-id")[:20],
+            "filter by match_level": Candidate.objects.filter(match_level="A").order_by("-created_at")[:20],
+            "filter by cooperation_status": Candidate.objects.filter(cooperation_status="合作").order_by("-created_at")[:20],
+            "filter by base": Candidate.objects.filter(base="上海").order_by("-created_at")[:20],
+            "filter by education": Candidate.objects.filter(education="硕士").order_by("-created_at")[:20],
+            "filter by age": Candidate.objects.filter(age__gte=26, age__lte=30).values("id"),
+            "group by base": Candidate.objects.values("base").annotate(count=Count("id")).order_by(),
+            "group by major": Candidate.objects.values("major").annotate(count=Count("id")).order_by(),
+            "group by cooperation_status": (
+                Candidate.objects.values("cooperation_status").annotate(count=Count("id")).order_by()
+            ),
+            "cooperation records": CooperationRecord.objects.order_by("-start_date")[:20],
+            "user favorites": Favorite.objects.filter(user=self.user).order_by("-created_at")[:20],
+            "worked at": filter_candidates(Candidate.objects.all(), {"worked_at": "新东方"}).values("id"),
+            "education experience": (
+                filter_candidates(Candidate.objects.all(), {"has_education_experience": "1"}).values("id")
+            ),
+            "teaching months": filter_candidates(Candidate.objects.all(), {"min_teaching_months": "12"}).values("id"),
+        }
+
+    def full_scans(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                details = [row[-1] for row in cursor.fetchall()]
+                return [
+                    detail for detail in details
+                    if (detail.startswith("SCAN") and "INDEX" not in detail) or "TEMP B-TREE" in detail
+                ]
+            if connection.vendor == "mysql":
+                cursor.execute(f"EXPLAIN {sql}", params)
+                columns = [col[0] for col in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                return [
+                    f"{row['table']}: type={row['type']} extra={row['Extra']}" for row in rows
+                    if row["type"] == "ALL" or "filesort" in (row["Extra"] or "")
+                ]
+        self.skipTest(f"不支持 {connection.vendor} 的执行计划检查")
+
+    def test_hot_queries_use_indexes(self):
+        for name, queryset in self.hot_queries().items():
+            with self.subTest(query=name):
+                self.assertEqual(self.full_scans(queryset), [], str(queryset.query))
+
+
+class CandidateListFilterTests(TestCase):
+    """候选人列表的服务端筛选与排序（见 filters.py）"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rows = [
+            ("甲", "A", "北京", "本科", 24, [("2024-05-01", "优秀"), ("2023-01-01", "一般")]),
+            ("乙", "A", "上海", "硕士", 28, [("2024-08-01", "良好")]),
+            ("丙", "C", "北京", "硕士", 33, [("2022-01-01", "一般"), ("2022-06-01", "一般"), ("2022-09-01", "不再合作")]),
+            ("丁", "D", "远程", "博士", 40, []),
+        ]
+        for i, (name, level, base, education, age, records) in enumerate(rows):
+            candidate = Candidate.objects.create(
+                name=name, match_level=level, base=base, education=education, age=age,
+                phone=f"1330000000{i}", email=f"filter{i}@x.com",
+            )
+            for start, result in records:
+                CooperationRecord.objects.create(
+                    candidate=candidate, project_name="项目", start_date=start, cooperation_result=result
+                )
+
+    def names(self, **params):
+        response = APIClient().get("/api/candidates/", {"page_size": 10, **params})
+        return [item["name"] for item in response.json()["results"]]
+
+    def test_filters(self):
+        cases = [
+            ({"match_level": "A"}, {"甲", "乙"}),
+            ({"match_level": "all"}, {"甲", "乙", "丙", "丁"}),
+            ({"base": "北京"}, {"甲", "丙"}),
+            ({"base": "北京", "match_level": "A"}, {"甲"}),
+            ({"education": "硕士"}, {"乙", "丙"}),
+            ({"age": "20-25"}, {"甲"}),
+            ({"age": "36+"}, {"丁"}),
+            ({"min_cooperations": "2"}, {"甲", "丙"}),
+            ({"min_cooperations": "abc"}, {"甲", "乙", "丙", "丁"}),  # 无法识别的值忽略
+            ({"cooperated_since": "2024-06"}, {"乙"}),
+            ({"best_result": "优秀"}, {"甲"}),
+            ({"best_result": "一般"}, {"丙"}),
+            ({"best_result": "一般", "min_cooperations": "4"}, set()),
+            ({"search": "上海"}, {"乙"}),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                self.assertEqual(set(self.names(**params)), expected)
+
+        # 不分页时同样过滤
+        response = APIClient().get("/api/candidates/", {"match_level": "A", "base": "上海"})
+        self.assertEqual([item["name"] for item in response.json()], ["乙"])
+
+    def test_ordering(self):
+        self.assertEqual(self.names(), ["丁", "丙", "乙", "甲"])
+        self.assertEqual(self.names(ordering="cooperation_count"), ["丙", "甲", "乙", "丁"])
+        # 按最近合作排序时没有合作记录的候选人不出现
+        self.assertEqual(self.names(ordering="recent_cooperation"), ["乙", "甲", "丙"])
+        self.assertEqual(self.names(ordering="unknown"), ["丁", "丙", "乙", "甲"])
+        self.assertEqual(self.names(ordering="recent_cooperation", base="北京"), ["甲", "丙"])
+
+        # 游标按排序字段编码，翻页结果与一次取出一致
+        pages = []
+        url, params = "/api/candidates/", {"page_size": 1, "ordering": "recent_cooperation"}
+        while url:
+            body = APIClient().get(url, params).json()
+            pages += [item["name"] for item in body["results"]]
+            self.assertEqual(body["count"], 3)
+            url, params = body["next"], None
+        self.assertEqual(pages, ["乙", "甲", "丙"])
+
+
+class ExperienceFilterTests(TestCase):
+    """结构化工作经历：列表筛选，以及只在经历变化时重建"""
+
+    def experience(self, company, position, start="2020-01", end="2021-12"):
+        return json.dumps([{"company": company, "position": position, "start_date": start, "end_date": end}])
+
+    def names(self, **params):
+        response = APIClient().get("/api/candidates/", {"page_size": 10, **params})
+        return sorted(item["name"] for item in response.json()["results"])
+
+    def test_filters_and_rebuild(self):
+        teacher = Candidate.objects.create(
+            name="Alice", phone="13500000001", email="a@example.com", experience=self.experience("新东方", "数学老师")
+        )
+        engineer = Candidate.objects.create(
+            name="Bob", phone="13500000002", email="b@example.com", experience=self.experience("阿里巴巴", "软件工程师")
+        )
+        Candidate.objects.create(name="Carol", phone="13500000003", email="c@example.com")
+
+        self.assertEqual(self.names(worked_at="新东方"), ["Alice"])
+        self.assertEqual(self.names(worked_at="阿里"), ["Bob"])
+        self.assertEqual(self.names(has_education_experience="1"), ["Alice"])
+        self.assertEqual(self.names(min_teaching_months=12), ["Alice"])
+        self.assertEqual(self.names(min_teaching_months=36), [])
+
+        # 只改评分时不重建经历行
+        rows = list(engineer.experiences.values_list("id", flat=True))
+        APIClient().patch(f"/api/candidates/{engineer.id}/", {"match_level": "A"}, format="json")
+        self.assertEqual(list(engineer.experiences.values_list("id", flat=True)), rows)
+
+        APIClient().patch(
+            f"/api/candidates/{engineer.id}/", {"experience": self.experience("学而思", "物理老师")}, format="json"
+        )
+        self.assertEqual(self.names(has_education_experience="1"), ["Alice", "Bob"])
+        self.assertEqual(teacher.experiences.get().months, 24)
+
+    def test_migration_matches_live_parser(self):
+        migration = importlib.import_module("candidates.migrations.0013_experience")
+        raw = json.dumps([
+            {"company": "新东方", "position": "数学老师", "start_date": "2020年9月", "end_date": "至今"},
+            {"company": "Alibaba", "position": "Engineer", "start_date": "2018.3", "end_date": "2020/08"},
+            {"company": "", "position": "", "start_date": "未知"},
+        ])
+        for i in range(3):
+            Candidate.objects.create(name=f"迁移{i}", phone=f"1350000001{i}", email=f"m{i}@example.com", experience=raw)
+        columns = ("candidate_id", "order", "company", "position", "start_date", "end_date", "is_current", "months",
+                   "is_education", "description")
+        expected = list(Experience.objects.order_by("candidate_id", "order").values_list(*columns))
+        Experience.objects.all().delete()
+
+        with mock.patch.object(migration, "CHUNK_SIZE", 2):
+            migration.populate_experiences(django_apps, None)
+        self.assertEqual(list(Experience.objects.order_by("candidate_id", "order").values_list(*columns)), expected)
+        self.assertEqual(len(expected), 9)
+
+
+class CandidateSearchTests(TestCase):
+    def setUp(self):
+        self.teacher = Candidate.objects.create(
+            name="张三", phone="13800000001", email="zhang@example.com", education="本科",
+            university="复旦大学", major="数学", base="上海",
+            experience=str([{"company": "新东方教育", "position": "数学老师", "description": "高中数学竞赛辅导"}]),
+        )
+        self.engineer = Candidate.objects.create(
+            name="李四", phone="13800000002", email="li@example.com", education="硕士",
+            university="浙江大学", major="计算机", base="杭州",
+            experience='[{"company": "Alibaba", "position": "Python 工程师", "description": "后端开发"}]',
+        )
+
+    def test_tokenize_cjk_bigrams(self):
+        self.assertEqual(tokenize("数学老师 Python"), ["数学", "学老", "老师", "python"])
+
+    def test_search_ranks_and_highlights(self):
+        results = search_candidates("竞赛辅导")
+        self.assertEqual([candidate for candidate, _, _ in results], [self.teacher])
+        self.assertIn("<mark>竞赛辅导</mark>", results[0][2])
+
+        self.assertEqual([c for c, _, _ in search_candidates("浙江 python")], [self.engineer])
+
+    def test_snippet_highlights_raw_text(self):
+        # 命中词不会匹配转义后的实体
+        self.assertEqual(
+            make_snippet("R&D <lead> amp lt", ["amp", "lt"]),
+            "R&amp;D &lt;lead&gt; <mark>amp</mark> <mark>lt</mark>",
+        )
+        self.assertEqual(make_snippet("a<b>\nC++ & c", ["c"]), "a&lt;b&gt; ｜ <mark>C</mark>++ &amp; <mark>c</mark>")
+        # 全角与连字规范化后长度不同，命中位置仍对应原文
+        self.assertEqual(make_snippet("Ｐｙｔｈｏｎ 工程师", ["python"]), "<mark>Ｐｙｔｈｏｎ</mark> 工程师")
+        content = "ﬁ" * 40 + "Python" + "x" * 100
+        self.assertEqual(make_snippet(content, ["python"]), "…" + "ﬁ" * 20 + "<mark>Python</mark>" + "x" * 54 + "…")
+        # 长词优先，重叠的短词不再嵌套
+        self.assertEqual(make_snippet("数学老师", ["数学", "数学老师"]), "<mark>数学老师</mark>")
+
+    def test_migration_populates_in_chunks(self):
+        migration = importlib.import_module("candidates.migrations.0011_candidate_search_document")
+        Candidate.objects.create(name="王五", phone="13800000003", email="wang@example.com", education="本科", base="北京")
+        CandidateSearchDocument.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {migration.FTS_TABLE}")
+
+        documents = CandidateSearchDocument.objects
+        with mock.patch.object(migration, "CHUNK_SIZE", 2), \
+                mock.patch.object(documents, "bulk_create", wraps=documents.bulk_create) as bulk_create:
+            migration.populate_documents(django_apps, mock.Mock(connection=connection))
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 1])
+
+        self.assertEqual(
+            dict(CandidateSearchDocument.objects.values_list("candidate_id", "content")),
+            {c.id: build_document(c) for c in Candidate.objects.all()},
+        )
+        self.assertEqual(migration.tokenize("数学老师 Python"), tokenize("数学老师 Python"))
+        self.assertEqual([c for c, _, _ in search_candidates("竞赛辅导")], [self.teacher])
+        self.assertEqual([c for c, _, _ in search_candidates("北京")], [Candidate.objects.get(name="王五")])
+
+    def test_index_follows_save_and_delete(self):
+        self.engineer.major = "物理"
+        self.engineer.save()
+        self.assertEqual([c for c, _, _ in search_candidates("物理")], [self.engineer])
+
+        self.engineer.delete()
+        self.assertEqual(search_candidates("物理"), [])
+
+    def test_index_skips_unchanged_saves(self):
+        with mock.patch.object(search, "index_candidate", wraps=search.index_candidate) as index:
+            APIClient().patch(f"/api/candidates/{self.engineer.id}/", {"match_level": "A"}, format="json")
+            candidate = Candidate.objects.get(pk=self.engineer.pk)
+            candidate.cooperation_status = "合作"
+            candidate.save()
+            candidate.major = "物理"
+            candidate.save(update_fields=["cooperation_status"])  # 检索字段不在 update_fields 中
+            Candidate.objects.only("id", "match_level").get(pk=self.engineer.pk).save(update_fields=["match_level"])
+            self.assertEqual(index.call_count, 0)
+
+            candidate.save(update_fields=["major"])
+            candidate.save()
+            self.assertEqual(index.call_count, 1)
+            APIClient().patch(f"/api/candidates/{self.engineer.id}/", {"base": "上海"}, format="json")
+            self.assertEqual(index.call_count, 2)
+        self.assertEqual([c for c, _, _ in search_candidates("物理 上海")], [self.engineer])
+
+
+class FavoriteQueryCountTests(TestCase):
+    """收藏状态批量计算：查询次数与候选人数量无关"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="hr")
+        cls.candidates = [
+            Candidate.objects.create(
+                name=f"候选人{i}", phone=f"1390000{i:04d}", email=f"f{i}@example.com",
+                education="本科", major="数学",
+            )
+            for i in range(12)
+        ]
+        for candidate in cls.candidates[::3]:
+            Favorite.objects.create(user=cls.user, candidate=candidate)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_candidate_list(self):
+        # 收藏 id + 候选人
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/candidates/")
+        favorited = {item["id"] for item in response.json() if item["is_favorited"]}
+        self.assertEqual(favorited, {c.id for c in self.candidates[::3]})
+
+    def test_candidate_list_paginated(self):
+        # 收藏 id + 总数 + 当前页
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/candidates/", {"page_size": 5})
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_my_favorites(self):
+        # 用户 + 收藏（join 候选人）
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/candidates/favorites/my/", {"username": "hr"})
+        self.assertEqual(len(response.json()), 4)
+        self.assertTrue(all(item["is_favorited"] and item["favorited_at"] for item in response.json()))
+
+    def test_search(self):
+        # 全文检索 + 候选人 + 检索文本 + 收藏 id
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/candidates/search/", {"q": "数学"})
+        self.assertEqual(response.json()["count"], 12)
+
+    def test_candidate_list_by_username(self):
+        # 前端不带 JWT，按 username 取收藏状态：收藏 id + 候选人
+        with self.assertNumQueries(2):
+            response = APIClient().get("/api/candidates/", {"username": "hr"})
+        favorited = {item["id"] for item in response.json() if item["is_favorited"]}
+        self.assertEqual(favorited, {c.id for c in self.candidates[::3]})
+
+    def test_favorite_ids(self):
+        with self.assertNumQueries(1):
+            response = APIClient().get("/api/candidates/favorites/ids/", {"username": "hr"})
+        self.assertEqual(response.json(), sorted(c.id for c in self.candidates[::3]))
+
+    def test_anonymous_list_skips_favorites(self):
+        with self.assertNumQueries(1):
+            response = APIClient().get("/api/candidates/")
+        self.assertFalse(any(item["is_favorited"] for item in response.json()))
+
+
+class SparseFieldsTests(TestCase):
+    """?fields= / ?expand=：只返回并只查询需要的字段，未知字段忽略"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="hr")
+        for i in range(3):
+            candidate = Candidate.objects.create(
+                name=f"字段{i}", phone=f"1350000000{i}", email=f"fields{i}@x.com",
+                experience=json.dumps([{"company": "北京某中学", "position": "物理老师", "start_date": "2019-09"}]),
+            )
+            CooperationRecord.objects.create(candidate=candidate, project_name=f"项目{i}", role="讲师", start_date="2024-01-01")
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), [query["sql"] for query in queries.captured_queries]
+
+    def selected_columns(self, sql, table):
+        select = sql[:sql.index(" FROM ")]
+        return set(re.findall(rf'"{table}"\."(\w+)"', select))
+
+    def test_fields_limit_payload_and_columns(self):
+        data, queries = self.get("/api/candidates/", {"fields": "id,name,match_level", "username": "hr"})
+        self.assertEqual([set(item) for item in data], [{"id", "name", "match_level"}] * 3)
+        # 未请求 is_favorited，不查询收藏；created_at 为游标分页的排序列
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            self.selected_columns(queries[0], "candidates_candidate"), {"id", "name", "match_level", "created_at"}
+        )
+
+        data, queries = self.get("/api/candidates/", {"fields": "id,is_favorited", "username": "hr"})
+        self.assertEqual([set(item) for item in data], [{"id", "is_favorited"}] * 3)
+        self.assertEqual(len(queries), 2)  # 收藏 id（按 username 关联用户）+ 候选人
+        self.assertEqual(self.selected_columns(queries[-1], "candidates_candidate"), {"id", "created_at"})
+
+    def test_unknown_fields_are_ignored(self):
+        data, queries = self.get("/api/candidates/", {"fields": "id,no_such_field,name__startswith"})
+        self.assertEqual([set(item) for item in data], [{"id"}] * 3)
+        self.assertEqual(self.selected_columns(queries[0], "candidates_candidate"), {"id", "created_at"})
+
+        slim, _ = self.get("/api/candidates/", {"expand": ""})
+        data, queries = self.get("/api/candidates/", {"expand": "no_such_field"})
+        self.assertEqual(data, slim)
+        self.assertNotIn("experience", self.selected_columns(queries[0], "candidates_candidate"))
+
+    def test_expand_heavy_fields(self):
+        data, queries = self.get("/api/candidates/", {"fields": "id,experience,experiences"})
+        self.assertEqual([set(item) for item in data], [{"id", "experience", "experiences"}] * 3)
+        self.assertEqual(data[0]["experiences"][0]["company"], "北京某中学")
+        # 工作经历一次 prefetch
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self.selected_columns(queries[0], "candidates_candidate"), {"id", "experience", "created_at"})
+
+        data, queries = self.get("/api/candidates/", {"expand": "experience"})
+        self.assertIn("experience", data[0])
+        self.assertNotIn("experiences", data[0])
+        self.assertIn("experience", self.selected_columns(queries[0], "candidates_candidate"))
+
+    def test_cooperation_fields_join_only_used_columns(self):
+        data, queries = self.get("/api/candidates/cooperations/", {"fields": "candidate_name,project_name,bogus"})
+        self.assertEqual([set(item) for item in data], [{"candidate_name", "project_name"}] * 3)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.selected_columns(queries[0], "candidates_candidate"), {"id", "name"})
+        self.assertEqual(
+            self.selected_columns(queries[0], "candidates_cooperationrecord"), {"id", "candidate_id", "project_name"}
+        )
+
+
+class CandidateBulkUpdateTests(TestCase):
+    """批量修改：一次校验、一次写入，返回每个 id 的处理结果"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.candidates = [
+            Candidate.objects.create(
+                name=f"批量{i}", phone=f"1370000{i:04d}", email=f"b{i}@example.com",
+                education="本科", major="物理" if i % 2 else "化学", cooperation_status="合作" if i < 3 else "未合作",
+            )
+            for i in range(10)
+        ]
+
+    def test_update_by_ids(self):
+        ids = [c.id for c in self.candidates[:5]] + [999999]
+        # 读取当前值 + 一次 UPDATE（事务的保存点不计入）
+        with self.assertNumQueries(4):
+            response = APIClient().patch(
+                "/api/candidates/bulk/", {"ids": ids, "changes": {"cooperation_status": "合作"}}, format="json"
+            )
+        body = response.json()
+        self.assertEqual((body["matched"], body["updated"], body["unchanged"]), (5, 2, 3))
+        self.assertEqual(body["not_found"], [999999])
+        self.assertEqual(Candidate.objects.filter(cooperation_status="合作").count(), 5)
+
+    def test_update_by_filters(self):
+        response = APIClient().patch(
+            "/api/candidates/bulk/",
+            {"filters": {"search": "物理"}, "changes": {"match_level": "A"}},
+            format="json",
+        )
+        self.assertEqual(response.json()["updated"], 5)
+        self.assertEqual(Candidate.objects.filter(match_level="A").count(), 5)
+
+    def test_filters_over_limit(self):
+        # 只多读一行判断是否超限，不读出全部匹配行
+        with mock.patch("candidates.bulk.BULK_MAX_IDS", 4), CaptureQueriesContext(connection) as queries:
+            response = APIClient().patch(
+                "/api/candidates/bulk/",
+                {"filters": {"search": "物理"}, "changes": {"match_level": "A"}},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("超过 4 位候选人", response.json()["error"])
+        selects = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("SELECT")]
+        self.assertIn("LIMIT 5", selects[-1])
+        self.assertFalse(Candidate.objects.filter(match_level="A").exists())
+
+    def test_invalid_changes(self):
+        client = APIClient()
+        response = client.patch(
+            "/api/candidates/bulk/", {"ids": [self.candidates[0].id], "changes": {"cooperation_status": "已签约"}}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = client.patch("/api/candidates/bulk/", {"filters": {}, "changes": {"match_level": "A"}}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class CandidateImportTests(TestCase):
+    """CSV / XLSX 批量导入：判重、错误报告，以及绕过信号后补写的检索文档和经历"""
+
+    HEADER = "姓名,电话,邮箱,学历,毕业时间,匹配度,工作经历\n"
+
+    def run_import(self, text, file_name="data.csv", **kwargs):
+        report = io.StringIO()
+        result = import_candidates(io.BytesIO(text.encode("utf-8")), file_name, error_fp=report, **kwargs)
+        return result, report.getvalue()
+
+    def test_import_csv(self):
+        Candidate.objects.create(name="老人", phone="13600000000", email="old@example.com", education="本科")
+        experience = json.dumps([{"company": "新东方", "position": "数学老师", "start_date": "2020-01", "end_date": "2020-12"}])
+        result, report = self.run_import(
+            self.HEADER
+            + f'张三,+86 136-0000-0001,ZS@example.com,硕士,2020年7月,A,"{experience.replace(chr(34), chr(34) * 2)}"\n'
+            + "李四,13600000002,ls@example.com,,,,\n"
+            + "重复,13600000002,other@example.com,,,,\n"
+            + "老人,13600000000,old@example.com,,,,\n"
+            + "坏邮箱,13600000003,not-an-email,,,,\n"
+            + "坏学历,13600000004,x@example.com,小学,,,\n"
+        )
+        self.assertEqual(result, {"total": 6, "created": 2, "updated": 0, "skipped": 1, "errors": 3})
+        self.assertEqual(report.count("\n"), 4)
+        self.assertIn("与第 3 行的电话或邮箱重复", report)
+
+        zhang = Candidate.objects.get(phone="13600000001")
+        self.assertEqual((zhang.email, zhang.education, str(zhang.graduation_date)), ("zs@example.com", "硕士", "2020-07-01"))
+        self.assertEqual(zhang.experiences.get().months, 12)
+        self.assertEqual(Candidate.objects.get(phone="13600000002").education, "本科")
+        self.assertEqual(search_candidates("新东方")[0][0], zhang)
+
+    def test_update_existing(self):
+        old = Candidate.objects.create(name="老人", phone="13600000000", email="old@example.com", education="本科")
+        result, _ = self.run_import(self.HEADER + "老人,13600000000,old@example.com,博士,,B,\n", on_duplicate="update")
+        self.assertEqual(result["updated"], 1)
+        old.refresh_from_db()
+        self.assertEqual((old.education, old.match_level), ("博士", "B"))
+        # 内容未变化时不再写入
+        result, _ = self.run_import(self.HEADER + "老人,13600000000,old@example.com,博士,,B,\n", on_duplicate="update")
+        self.assertEqual((result["updated"], result["skipped"]), (0, 1))
+
+    def test_existing_mixed_case_email(self):
+        old = Candidate.objects.create(name="老人", phone="13600000000", email="Old@Example.com", education="本科")
+        # 查出的已有候选人（MySQL 下 email__in 不区分大小写）按小写邮箱对应，避免再插入一行触发唯一约束
+        fields = {"phone": "13600000000", "email": "old@example.com"}
+        self.assertEqual(_existing_candidates([(2, [], fields)], "update")[1], {"old@example.com": old})
+
+        result, report = self.run_import(self.HEADER + "老人,13600000000,OLD@example.com,博士,,,\n", on_duplicate="update")
+        self.assertEqual((result["updated"], result["errors"]), (1, 0), report)
+        old.refresh_from_db()
+        self.assertEqual((old.email, old.education), ("old@example.com", "博士"))
+
+    def test_xlsx_round_trip(self):
+        for i in range(3):
+            Candidate.objects.create(name=f"导出{i}", phone=f"1350000000{i}", email=f"e{i}@example.com", education="本科")
+        buffer = io.BytesIO()
+        write_xlsx(Candidate.objects.all(), buffer)
+        Candidate.objects.all().delete()
+        buffer.seek(0)
+        result = import_candidates(buffer, "candidates.xlsx")
+        self.assertEqual(result["created"], 3)
+        self.assertEqual(set(Candidate.objects.values_list("phone", flat=True)), {f"1350000000{i}" for i in range(3)})
+
+
+class ExportJobTests(TempMediaMixin, TestCase):
+    """后台导出：相同筛选条件复用任务、过期清理、Range 断点续传"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for i in range(30):
+            Candidate.objects.create(
+                name=f"导出{i}", match_level="A" if i % 2 else "B", phone=f"1390000{i:04d}", email=f"export{i}@x.com"
+            )
+
+    def request(self, **filters):
+        response = self.client.post("/api/candidates/export/jobs/", {"format": "csv", **filters}, format="json")
+        return response.status_code, response.json()
+
+    def finish(self):
+        return run_export(claim_next_export("worker-a"))
+
+    def download(self, job, **headers):
+        response = self.client.get(f"/api/candidates/export/jobs/{job.id}/download/", **headers)
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, content
+
+    def test_reuse_for_identical_filters(self):
+        status_code, first = self.request(match_level="A")
+        self.assertEqual((status_code, first["reused"]), (202, False))
+        status_code, again = self.request(match_level="A", page_size="10")  # 非筛选参数不影响缓存键
+        self.assertEqual((status_code, again["id"], again["reused"]), (202, first["id"], True))
+        self.assertNotEqual(self.request(match_level="B")[1]["id"], first["id"])
+
+        self.assertEqual(self.finish().row_count, 15)
+        status_code, done = self.request(match_level="A")
+        self.assertEqual((status_code, done["id"], done["reused"], done["status"]), (200, first["id"], True, "done"))
+
+        # 匹配的候选人有修改，数据指纹变化，重新生成
+        Candidate.objects.filter(match_level="A").first().save()
+        self.assertEqual(self.request(match_level="A")[1]["reused"], False)
+
+    def test_expiry(self):
+        self.request(match_level="A")
+        first = self.finish()
+        # 同一缓存键的新任务引用同一个文件
+        second = run_export(ExportJob.objects.create(format="csv", filters={"match_level": "A"}))
+        self.assertEqual(second.file.name, first.file.name)
+        path = first.file.path
+
+        ExportJob.objects.filter(id=first.id).update(created_at=timezone.now() - timedelta(hours=73))
+        self.assertEqual(prune_exports(), 1)
+        self.assertTrue(os.path.exists(path))  # 仍被 second 引用
+
+        ExportJob.objects.filter(id=second.id).update(created_at=timezone.now() - timedelta(hours=73))
+        self.assertEqual(prune_exports(max_age_hours=0), 0)  # 0 表示不清理
+        self.assertEqual(prune_exports(), 1)
+        self.assertFalse(os.path.exists(path))
+
+        # 文件被删除后不再复用，下载返回 410
+        job = run_export(ExportJob.objects.create(format="csv", filters={}))
+        os.remove(job.file.path)
+        self.assertEqual(self.download(job)[0].status_code, 410)
+        self.assertEqual(self.request()[1]["reused"], False)
+
+    def test_range_download(self):
+        self.request()
+        job = self.finish()
+        with open(job.file.path, "rb") as fp:
+            data = fp.read()
+        size = len(data)
+
+        response, content = self.download(job)
+        self.assertEqual((response.status_code, content, response["Accept-Ranges"]), (200, data, "bytes"))
+        etag = response["ETag"]
+
+        cases = [
+            ("bytes=0-9", 0, 9),
+            ("bytes=10-", 10, size - 1),
+            ("bytes=10-999999", 10, size - 1),
+            ("bytes=-10", size - 10, size - 1),  # 后缀区间：最后 10 字节
+            ("bytes=-999999", 0, size - 1),
+        ]
+        for header, start, end in cases:
+            with self.subTest(range=header):
+                response, content = self.download(job, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(content, data[start:end + 1])
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+                self.assertEqual(response["Content-Length"], str(end - start + 1))
+
+        for header in (f"bytes={size}-", "bytes=-0", "bytes=10-5"):
+            with self.subTest(range=header):
+                response, _ = self.download(job, HTTP_RANGE=header)
+                self.assertEqual((response.status_code, response["Content-Range"]), (416, f"bytes */{size}"))
+
+        # 格式不支持（含多区间）时返回完整文件
+        for header in ("bytes=-", "bytes=a-b", "items=0-9", "bytes=0-1,5-6", "bytes= 0-9"):
+            with self.subTest(range=header):
+                response, content = self.download(job, HTTP_RANGE=header)
+                self.assertEqual((response.status_code, content), (200, data))
+
+        response, content = self.download(job, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual((response.status_code, content), (206, data[:10]))
+        response, content = self.download(job, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"0-0"')
+        self.assertEqual((response.status_code, content), (200, data))
+
+
+class CooperationListTests(TestCase):
+    """合作记录列表：服务端筛选 + 分页，候选人姓名随记录 JOIN 查询"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Candidate.objects.create(name="Alice", phone="13500000001", email="a@example.com", education="本科")
+        cls.bob = Candidate.objects.create(name="Bob", phone="13500000002", email="b@example.com", education="本科")
+        for i in range(30):
+            CooperationRecord.objects.create(
+                candidate=cls.alice if i % 2 else cls.bob,
+                project_name=f"{'春季' if i < 10 else '秋季'}项目{i}",
+                start_date=f"2024-{i % 12 + 1:02d}-01",
+                cooperation_result="优秀" if i % 3 == 0 else "良好",
+                agreement_file="agreements/a.pdf" if i % 5 == 0 else "",
+            )
+
+    def test_paginated(self):
+        # 总数 + 当前页（含候选人 JOIN）
+        with self.assertNumQueries(2):
+            response = APIClient().get("/api/candidates/cooperations/", {"page_size": 7, "page": 2})
+        body = response.json()
+        self.assertEqual((body["count"], len(body["results"])), (30, 7))
+        self.assertTrue(all(item["candidate_name"] for item in body["results"]))
+
+    def test_filters(self):
+        client = APIClient()
+        get = lambda **params: client.get("/api/candidates/cooperations/", params).json()
+        self.assertEqual(len(get(has_agreement=1)), 6)
+        self.assertEqual(len(get(candidate=self.alice.id, result="优秀")), 5)
+        self.assertEqual(len(get(search="alice")), 15)
+        self.assertEqual(len(get(project="春季", date_from="2024-03", date_to="2024-05-01")), 3)
+        self.assertEqual(len(get(date_from="not-a-date")), 30)
+
+
+class CooperationRollupTests(TestCase):
+    """候选人上的合作汇总随合作记录增删改同步；详情接口内嵌合作记录"""
+
+    def setUp(self):
+        self.alice = Candidate.objects.create(name="Alice", phone="13600000001", email="a@example.com", education="本科")
+        self.bob = Candidate.objects.create(name="Bob", phone="13600000002", email="b@example.com", education="本科")
+
+    def rollup(self, candidate):
+        candidate.refresh_from_db()
+        return (
+            candidate.cooperation_count, str(candidate.last_cooperation_date),
+            candidate.best_cooperation_result, candidate.worst_cooperation_result, candidate.latest_project,
+        )
+
+    def test_rollups_follow_records(self):
+        first = CooperationRecord.objects.create(
+            candidate=self.alice, project_name="春季班", start_date="2024-03-01", cooperation_result="一般"
+        )
+        second = CooperationRecord.objects.create(
+            candidate=self.alice, project_name="暑期班", start_date="2024-07-01", cooperation_result="优秀"
+        )
+        self.assertEqual(self.rollup(self.alice), (2, "2024-07-01", "优秀", "一般", "暑期班"))
+
+        second = CooperationRecord.objects.get(pk=second.pk)
+        second.candidate = self.bob
+        second.save()
+        self.assertEqual(self.rollup(self.alice), (1, "2024-03-01", "一般", "一般", "春季班"))
+        self.assertEqual(self.rollup(self.bob), (1, "2024-07-01", "优秀", "优秀", "暑期班"))
+
+        first.delete()
+        self.assertEqual(self.rollup(self.alice), (0, "None", "", "", ""))
+
+    def test_migration_populates_in_chunks(self):
+        migration = importlib.import_module("candidates.migrations.0016_cooperation_rollups")
+        carol = Candidate.objects.create(name="Carol", phone="13600000003", email="c@example.com", education="本科")
+        for candidate, project, start, result in [
+            (self.alice, "春季班", "2024-03-01", "一般"), (self.bob, "秋季班", "2024-09-01", "不再合作"),
+            (self.alice, "暑期班", "2024-07-01", "优秀"), (self.bob, "冬令营", "2024-01-01", "良好"),
+        ]:
+            CooperationRecord.objects.create(
+                candidate=candidate, project_name=project, start_date=start, cooperation_result=result
+            )
+        expected = [self.rollup(candidate) for candidate in (self.alice, self.bob, carol)]
+        Candidate.objects.update(
+            cooperation_count=0, last_cooperation_date=None, best_cooperation_result="",
+            worst_cooperation_result="", latest_project="",
+        )
+
+        with mock.patch.object(migration, "CHUNK_SIZE", 1):
+            migration.populate_rollups(django_apps, None)
+        self.assertEqual([self.rollup(candidate) for candidate in (self.alice, self.bob, carol)], expected)
+        self.assertEqual(expected[1], (2, "2024-09-01", "良好", "不再合作", "秋季班"))
+
+    def test_rollups_are_read_only(self):
+        CooperationRecord.objects.create(candidate=self.alice, project_name="春季班", start_date="2024-03-01")
+        response = APIClient().patch(f"/api/candidates/{self.alice.id}/", {
+            "cooperation_count": 9, "latest_project": "伪造", "resume_sha256": "0" * 64, "match_level": "A",
+        }, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.rollup(self.alice), (1, "2024-03-01", "良好", "良好", "春季班"))
+        self.assertEqual((self.alice.resume_sha256, self.alice.match_level), (None, "A"))
+
+    def test_detail_and_ordering(self):
+        for i, candidate in enumerate([self.alice, self.alice, self.bob]):
+            CooperationRecord.objects.create(candidate=candidate, project_name=f"项目{i}", start_date=f"2024-0{i + 1}-01")
+        Candidate.objects.create(name="Carol", phone="13600000003", email="c@example.com", education="本科")
+
+        client = APIClient()
+        # 候选人 + 工作经历 + 合作记录
+        with self.assertNumQueries(3):
+            body = client.get(f"/api/candidates/{self.alice.id}/").json()
+        self.assertEqual([item["project_name"] for item in body["cooperations"]], ["项目1", "项目0"])
+
+        names = lambda **params: [item["name"] for item in client.get("/api/candidates/", params).json()["results"]]
+        self.assertEqual(names(ordering="recent_cooperation", page_size=1), ["Bob"])
+        self.assertEqual(names(ordering="recent_cooperation", page_size=5), ["Bob", "Alice"])
+        self.assertEqual(names(ordering="cooperation_count", page_size=5), ["Alice", "Bob", "Carol"])
+        self.assertEqual(names(min_cooperations=2, page_size=5), ["Alice"])
+        self.assertEqual(names(cooperated_since="2024-03", page_size=5), ["Bob"])
+
+
+@override_settings(CANDIDATE_SYNC_OVERLAP_SECONDS=0)
+class CandidateChangesTests(TestCase):
+    """增量同步：since 之后的新增 / 修改及删除记录"""
+
+    def test_delta_sync(self):
+        alice = Candidate.objects.create(name="Alice", phone="13700000001", email="a@example.com", education="本科")
+        bob = Candidate.objects.create(name="Bob", phone="13700000002", email="b@example.com", education="本科")
+        client = APIClient()
+
+        first = client.get("/api/candidates/changes/", {"limit": 1}).json()
+        self.assertEqual(([c["name"] for c in first["changed"]], first["has_more"]), (["Alice"], True))
+        second = client.get("/api/candidates/changes/", {"since": first["cursor"], "limit": 1}).json()
+        self.assertEqual(([c["name"] for c in second["changed"]], second["has_more"]), (["Bob"], False))
+        synced = client.get("/api/candidates/changes/", {"since": second["cursor"]}).json()
+        self.assertEqual((synced["changed"], synced["deleted"], synced["has_more"]), ([], [], False))
+
+        client.patch(f"/api/candidates/{alice.id}/", {"match_level": "A"}, format="json")
+        bob_id = bob.id
+        bob.delete()
+        body = client.get("/api/candidates/changes/", {"since": synced["cursor"], "fields": "id,match_level"}).json()
+        self.assertEqual(body["changed"], [{"id": alice.id, "match_level": "A"}])
+        self.assertEqual(body["deleted"], [bob_id])
+
+    def test_full_sync_pages_through_old_rows(self):
+        old = timezone.now() - timedelta(days=90)
+        for i in range(5):
+            Candidate.objects.create(name=f"候选人{i}", phone=f"1370000100{i}", email=f"old{i}@example.com")
+        Candidate.objects.update(updated_at=old)
+        CandidateTombstone.objects.create(candidate_id=999)
+        CandidateTombstone.objects.update(deleted_at=old)
+
+        client = APIClient()
+        names, deleted, params = [], [], {"limit": 2}
+        while True:
+            response = client.get("/api/candidates/changes/", params)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            names += [c["name"] for c in body["changed"]]
+            deleted += body["deleted"]
+            params = {"since": body["cursor"], "limit": 2}
+            if not body["has_more"]:
+                break
+        self.assertEqual(names, [f"候选人{i}" for i in range(5)])
+        self.assertEqual(deleted, [])  # 同步开始之前的删除与本地副本无关
+
+        # 同步结束时的 cursor 仍按自身时间判断保留期
+        with mock.patch("candidates.changes.timezone.now", return_value=timezone.now() + timedelta(days=31)):
+            self.assertEqual(client.get("/api/candidates/changes/", params).status_code, 410)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(APIClient().get("/api/candidates/changes/", {"since": "bogus"}).status_code, 400)
+        with self.settings(CANDIDATE_TOMBSTONE_RETENTION_DAYS=0):
+            cursor = APIClient().get("/api/candidates/changes/").json()["cursor"]
+            self.assertEqual(APIClient().get("/api/candidates/changes/", {"since": cursor}).status_code, 410)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class StatsTests(TestCase):
+    """统计接口：两条 SQL 算出、结果缓存、ETag 条件请求、候选人变化时失效（查询次数不含数据库缓存的读写）"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for i, (level, base, major) in enumerate([("A", "北京", "物理"), ("A", "上海", None), ("C", "北京", "数学")]):
+            Candidate.objects.create(
+                name=f"统计{i}", match_level=level, base=base, major=major,
+                phone=f"1370000000{i}", email=f"stats{i}@x.com",
+            )
+
+    def test_payload_and_query_count(self):
+        with self.assertNumQueries(2):
+            data = self.client.get("/api/candidates/stats/").json()
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(data["scoreDistribution"], {"A": 2, "B": 0, "C": 1, "D": 0, "E": 0})
+        self.assertEqual(data["cooperationDistribution"], {"未合作": 3})
+        self.assertEqual(data["baseDistribution"], {"北京": 2, "上海": 1})
+        self.assertEqual(data["majorDistribution"], {"物理": 1, "未知": 1, "数学": 1})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/candidates/stats/").json(), data)
+
+        # 不在 choices 内的历史状态多一条分组查询
+        Candidate.objects.filter(name="统计0").update(cooperation_status="暂停")
+        cache.clear()
+        with self.assertNumQueries(3):
+            data = self.client.get("/api/candidates/stats/").json()
+        self.assertEqual(data["cooperationDistribution"], {"未合作": 2, "暂停": 1})
+
+    def test_etag_round_trip_and_invalidation(self):
+        response = self.client.get("/api/candidates/stats/")
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.assertEqual(response["Cache-Control"], "no-cache")
+
+        for headers in ({"HTTP_IF_NONE_MATCH": etag}, {"HTTP_IF_MODIFIED_SINCE": last_modified}):
+            with self.subTest(headers=headers), self.assertNumQueries(0):
+                response = self.client.get("/api/candidates/stats/", **headers)
+                self.assertEqual((response.status_code, response.content), (304, b""))
+                self.assertEqual(response["ETag"], etag)
+
+        candidate = Candidate.objects.get(name="统计2")
+        candidate.match_level = "A"
+        candidate.save()
+        self.assertIsNone(cache.get(stats.CACHE_KEY))
+        response = self.client.get("/api/candidates/stats/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["scoreDistribution"]["A"], 3)
+
+        etag = response["ETag"]
+        candidate.delete()
+        self.assertIsNone(cache.get(stats.CACHE_KEY))
+        response = self.client.get("/api/candidates/stats/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()["total"]), (200, 2))
+
+
+@override_settings(EVENT_HEARTBEAT_SECONDS=0.05)
+class EventStreamTests(TestCase):
+    """SSE 推送：提交后的变更按频道送达，收藏事件只推送给本人"""
+
+    def setUp(self):
+        cache.clear()
+        events.EventStream._stats_refresh_after = 0
+
+    def test_stream(self):
+        user = User.objects.create_user(username="alice", password="pw")
+        other = User.objects.create_user(username="bob", password="pw")
+        response = self.client.get("/api/candidates/events/", {"channels": "candidates,favorites,stats", "username": "alice"})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = iter(response.streaming_content)
+        try:
+            self.assertTrue(next(stream).startswith(b"retry:"))
+            self.assertEqual(json.loads(next(stream).decode().split("data: ")[1])["total"], 0)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                candidate = Candidate.objects.create(name="Alice", phone="13800000001", email="a@example.com", education="本科")
+            messages = [next(stream).decode(), next(stream).decode()]
+            self.assertIn(f'"ids": [{candidate.id}]', "".join(messages))
+            self.assertIn('"total": 1', "".join(messages))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Favorite.objects.create(user=other, candidate=candidate)
+                Favorite.objects.create(user=user, candidate=candidate)
+            message = next(stream).decode()
+            self.assertIn("event: favorites", message)
+            self.assertIn(f'"user_id": {user.id}', message)
+            self.assertEqual(next(stream), b": ping\n\n")
+        finally:
+            response.close()
+
+    def test_stats_ignore_stale_local_cache(self):
+        response = self.client.get("/api/candidates/events/", {"channels": "stats"})
+        stream = iter(response.streaming_content)
+        try:
+            next(stream)
+            self.assertEqual(json.loads(next(stream).decode().split("data: ")[1])["total"], 0)
+
+            # 模拟其它进程写入：本进程的统计缓存未被清除，只收到 stats 事件
+            Candidate.objects.bulk_create([Candidate(name="Alice", phone="13800000002", email="x@example.com")])
+            with self.captureOnCommitCallbacks(execute=True):
+                events.publish("stats", "changed")
+            self.assertEqual(json.loads(next(stream).decode().split("data: ")[1])["total"], 1)
+        finally:
+            response.close()
+
+    @override_settings(EVENT_STATS_INTERVAL=60)
+    def test_stats_events_are_coalesced(self):
+        response = self.client.get("/api/candidates/events/", {"channels": "stats"})
+        stream = iter(response.streaming_content)
+        total = lambda message: json.loads(message.decode().split("data: ")[1])["total"]
+        try:
+            next(stream)
+            self.assertEqual(total(next(stream)), 0)
+
+            with mock.patch("candidates.stats.compute_stats", wraps=stats.compute_stats) as compute:
+                # 批量写入：一批事件只重新计算一次，之后的事件早于缓存，直接使用缓存
+                Candidate.objects.bulk_create([Candidate(name="Alice", phone="13800000002", email="x@example.com")])
+                with self.captureOnCommitCallbacks(execute=True):
+                    for _ in range(20):
+                        events.publish("stats", "changed")
+                self.assertEqual(total(next(stream)), 1)
+                self.assertEqual(next(stream), b": ping\n\n")
+                self.assertEqual(compute.call_count, 1)
+
+                # 未到 EVENT_STATS_INTERVAL：推迟计算，到期后推送
+                Candidate.objects.bulk_create([Candidate(name="Bob", phone="13800000003", email="y@example.com")])
+                with self.captureOnCommitCallbacks(execute=True):
+                    events.publish("stats", "changed")
+                self.assertEqual(next(stream), b": ping\n\n")
+                self.assertEqual(compute.call_count, 1)
+                events.EventStream._stats_refresh_after = 0
+                self.assertEqual(total(next(stream)), 2)
+                self.assertEqual(compute.call_count, 2)
+        finally:
+            response.close()
+
+    def test_unknown_channel(self):
+        self.assertEqual(self.client.get("/api/candidates/events/", {"channels": "nope"}).status_code, 400)
+
+
+class MetricsTests(TestCase):
+    """请求指标与慢请求日志"""
+
+    def test_metrics_and_slow_log(self):
+        Candidate.objects.create(name="Alice", phone="13900000001", email="a@example.com", education="本科")
+        with self.settings(METRICS_SLOW_REQUEST_MS=0), self.assertLogs("candidates.metrics", "WARNING") as logs:
+            self.client.get("/api/candidates/", {"page_size": 5})
+        self.assertIn("candidate-list", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn('hrms_http_requests_total{view="candidate-list",method="GET",status="200"}', body)
+        self.assertIn('hrms_http_request_db_queries_bucket{view="candidate-list",le="+Inf"}', body)
+        self.assertIn("# TYPE hrms_upload_stage_seconds histogram", body)
+
+        with self.settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+
+
+class QueryBudgetTests(TestCase):
+    """查询预算：每个接口都声明预算，超出时报告重复执行的语句"""
+
+    def test_every_endpoint_has_budget(self):
+        def callbacks(patterns):
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver):
+                    yield from callbacks(pattern.url_patterns)
+                else:
+                    yield pattern.name, pattern.callback
+
+        for urlconf in ("candidates.urls", "accounts.urls"):
+            for name, callback in callbacks(get_resolver(urlconf).url_patterns):
+                budget = getattr(callback, "query_budget", None) or getattr(callback.view_class, "query_budget", None)
+                self.assertIsNotNone(budget, f"{urlconf}:{name} 未声明查询预算")
+
+    def test_report_names_repeated_sql(self):
+        for i in range(4):
+            Candidate.objects.create(name=f"候选人{i}", phone=f"1390000{i:04d}", email=f"b{i}@example.com")
+
+        @query_budget(3)
+        def n_plus_one(request):
+            for candidate in Candidate.objects.all():
+                candidate.cooperations.count()
+            return HttpResponse()
+
+        request = RequestFactory().get("/n-plus-one/")
+        request.resolver_match = ResolverMatch(n_plus_one, (), {}, url_name="n-plus-one")
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            QueryBudgetMiddleware(n_plus_one)(request)
+        report = str(raised.exception)
+        self.assertIn("执行了 5 条 SQL，预算 3", report)
+        self.assertIn('4 次  SELECT COUNT(*) AS "__count" FROM "candidates_cooperationrecord"', report)
+
+        with self.settings(QUERY_BUDGET_MODE="warn"), self.assertLogs("candidates.querybudget", "WARNING"):
+            response = QueryBudgetMiddleware(n_plus_one)(request)
+        self.assertEqual(response["X-Query-Count"], "5")
+
+        with self.settings(QUERY_BUDGETS={"n-plus-one": 5}):
+            QueryBudgetMiddleware(n_plus_one)(request)
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'O''Brien'  LIMIT 21"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+
+
+class BenchmarkTests(TestCase):
+    """基准测试工具：合成数据与正常写入路径一致，合成简历能走通 提取 → 模拟 AI → 字段"""
+
+    def rollups(self):
+        return list(Candidate.objects.order_by("id").values_list(
+            "cooperation_count", "last_cooperation_date", "best_cooperation_result",
+            "worst_cooperation_result", "latest_project",
+        ))
+
+    def test_generate(self):
+        result = generate(30, cooperation_ratio=0.5, favorite_users=2, favorites_per_user=10, seed=1)
+        self.assertEqual(result["candidates"], 30)
+        self.assertEqual(result["cooperations"], CooperationRecord.objects.count())
+        self.assertEqual(Favorite.objects.filter(user__username__startswith="bench_user").count(), 20)
+        self.assertEqual(
+            Experience.objects.count(),
+            sum(len(json.loads(c.experience or "[]")) for c in Candidate.objects.all()),
+        )
+
+        seeded = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(self.rollups(), seeded)
+
+        # 再次执行时编号接着上次，不会与已有电话冲突
+        generate(5, favorite_users=0, seed=1)
+        self.assertEqual(Candidate.objects.count(), 35)
+
+    def test_corpus_through_stub_ai(self):
+        server = stub_ai.start(latency_ms=0, jitter_ms=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        lines = corpus.resume_lines(random.Random(0), 7, pages=2)
+        text, _ = extract_pdf_text(corpus.make_pdf(lines))
+        self.assertIn("resume7@corpus.example.com", text)
+
+        client = AIClient(api_url=server.url, api_key="test", timeout=5)
+        fields = candidate_fields(json.loads(client.chat(f"{stub_ai.RESUME_MARKER}\n{text}")))
+        self.assertEqual(fields["phone"], "18000000007")
+        self.assertEqual(fields["email"], "resume7@corpus.example.com")
+        self.assertEqual(fields["name"], lines[0].split("：")[1])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertIsNone(percentile([], 95))
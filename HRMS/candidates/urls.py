@@ -3,23 +3,49 @@ from django.urls import path
 from .views import (
     ResumeUploadView, 
     CandidateListView, 
-    CandidateUpdateView,
+    CandidateSearchView,
+    CandidateChangesView,
+    CandidateDetailView,
+    CandidateBulkUpdateView,
     CandidateStatsView,
     CandidateExportView,
     CooperationRecordListCreateView,
     CooperationRecordDetailView,
     ToggleFavoriteView,
     MyFavoritesView,
+    MyFavoriteIdsView,
+    IngestionJobCreateView,
+    IngestionJobDetailView,
+    ImportJobCreateView,
+    ImportJobDetailView,
+    ImportJobErrorReportView,
+    ExportJobCreateView,
+    ExportJobDetailView,
+    ExportJobDownloadView,
+    candidate_events,
 )
 
 urlpatterns = [
     path("upload/", ResumeUploadView.as_view(), name="resume-upload"),
+    path("upload/jobs/", IngestionJobCreateView.as_view(), name="ingestion-job-create"),
+    path("upload/jobs/<int:pk>/", IngestionJobDetailView.as_view(), name="ingestion-job-detail"),
+    path("import/", ImportJobCreateView.as_view(), name="import-job-create"),
+    path("import/<int:pk>/", ImportJobDetailView.as_view(), name="import-job-detail"),
+    path("import/<int:pk>/errors/", ImportJobErrorReportView.as_view(), name="import-job-errors"),
     path("", CandidateListView.as_view(), name="candidate-list"),
-    path("<int:pk>/", CandidateUpdateView.as_view(), name="candidate-update"),
+    path("search/", CandidateSearchView.as_view(), name="candidate-search"),
+    path("changes/", CandidateChangesView.as_view(), name="candidate-changes"),
+    path("events/", candidate_events, name="candidate-events"),
+    path("<int:pk>/", CandidateDetailView.as_view(), name="candidate-detail"),
+    path("bulk/", CandidateBulkUpdateView.as_view(), name="candidate-bulk-update"),
     path("stats/", CandidateStatsView.as_view(), name="candidate-stats"),
     path("export/", CandidateExportView.as_view(), name="candidate-export"),
+    path("export/jobs/", ExportJobCreateView.as_view(), name="export-job-create"),
+    path("export/jobs/<int:pk>/", ExportJobDetailView.as_view(), name="export-job-detail"),
+    path("export/jobs/<int:pk>/download/", ExportJobDownloadView.as_view(), name="export-job-download"),
     path("cooperations/", CooperationRecordListCreateView.as_view(), name="cooperation-list-create"),
     path("cooperations/<int:pk>/", CooperationRecordDetailView.as_view(), name="cooperation-detail"),
     path("favorites/toggle/", ToggleFavoriteView.as_view(), name="toggle-favorite"),
     path("favorites/my/", MyFavoritesView.as_view(), name="my-favorites"),
+    path("favorites/ids/", MyFavoriteIdsView.as_view(), name="my-favorite-ids"),
 ]
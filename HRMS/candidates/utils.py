@@ -0,0 +1,67 @@
+# candidates/utils.py
+import ast
+import re
+import json
+
+
+# ✅ AI 返回字段清洗函数
+def safe_int(value):
+    """将字符串或其它格式安全转换为整数，失败则返回 None"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        value = str(value).strip()
+        if not value:
+            return None
+        match = re.search(r"\d+", value)
+        return int(match.group()) if match else None
+    except Exception:
+        return None
+
+
+def normalize_date(value):
+    """将 AI 返回的毕业时间统一为 YYYY-MM-DD 格式"""
+    if not value:
+        return None
+    try:
+        value = str(value).strip()
+
+        # 完整格式
+        if re.match(r"^\d{4}-\d{2}-\d{2}$", value):
+            return value
+        # 年-月 或 年/月
+        if re.match(r"^\d{4}[-/]\d{2}$", value):
+            year, month = re.split(r"[-/]", value)
+            return f"{year}-{month}-01"
+        # 只有年份
+        if re.match(r"^\d{4}$", value):
+            return f"{value}-01-01"
+        # 中文格式（例如 “2027年7月”）
+        match = re.match(r"^(\d{4})年(\d{1,2})月", value)
+        if match:
+            year, month = match.groups()
+            return f"{year}-{int(month):02d}-01"
+    except Exception:
+        return None
+    return None
+
+
+def parse_experience(raw):
+    """
+    解析 Candidate.experience：既可能是 JSON，也可能是 AI 列表直接写入后的 Python repr，
+    解析失败返回空列表
+    """
+    if not raw:
+        return []
+    if isinstance(raw, list):
+        return [item for item in raw if isinstance(item, dict)]
+    for loader in (json.loads, ast.literal_eval):
+        try:
+            parsed = loader(raw)
+        except (ValueError, SyntaxError, TypeError):
+            continue
+        if isinstance(parsed, list):
+            return [item for item in parsed if isinstance(item, dict)]
+    return []
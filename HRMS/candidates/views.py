@@ -1,263 +1,402 @@
 import os
-import re
-import json
-import time
-import tempfile
-import requests
+import math
+import logging
 from datetime import datetime
-from pdfminer.high_level import extract_text
 from django.conf import settings
+from django.db.models import Prefetch
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import status, permissions, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import Candidate, CooperationRecord, Favorite
-from .serializers import CandidateSerializer, CooperationRecordSerializer, FavoriteSerializer
+from .models import Candidate, CooperationRecord, ExportJob, Favorite, ImportJob, IngestionJob
+from .serializers import (
+    favorite_ids_for,
+    CandidateBulkChangesSerializer,
+    CandidateDetailSerializer,
+    CandidateListSerializer,
+    CandidateSerializer,
+    CooperationRecordSerializer,
+    ExportJobSerializer,
+    ImportJobSerializer,
+    FavoriteSerializer,
+    IngestionJobSerializer,
+)
+from .filters import candidate_ordering, filter_candidates, filter_cooperations
+from .fieldsets import (
+    FIELDSET_PARAMS, fieldset_context, only_for_fields, parse_list, serializer_fields, wants_field,
+)
+from .search import search_candidates
+from .events import CHANNELS, EventStream
+from .changes import SYNC_MAX_PAGE_SIZE, SYNC_PAGE_SIZE, SyncCursorError, SyncCursorExpired, changes_since
+from .stats import get_stats
+from .bulk import BULK_MAX_IDS, ID_CHUNK_SIZE, BulkUpdateError, bulk_update_candidates
+from .export import EXPORT_WRITERS, XLSX_CONTENT_TYPE, candidate_xlsx
+from .export_jobs import request_export
+from .import_jobs import enqueue_import
+from .downloads import ranged_file_response
+from .utils import safe_int
+from .querybudget import query_budget
+from .pagination import CandidateCursorPagination, CooperationPagination
+from .ingestion import DuplicateCandidate, IngestionResult, enqueue_files, process_resumes
 from django.contrib.auth.models import User
-import logging
 
-# ⚙️ 屏蔽 pdfminer 噪音日志
-logging.getLogger("pdfminer").setLevel(logging.ERROR)
-
-
-# ✅ 日期格式修复函数
-
-
-def safe_int(value):
-    """将字符串或其它格式安全转换为整数，失败则返回 None"""
-    if value is None:
-        return None
-    if isinstance(value, int):
-        return value
-    try:
-        value = str(value).strip()
-        if not value:
-            return None
-        match = re.search(r"\d+", value)
-        return int(match.group()) if match else None
-    except Exception:
-        return None
-
-
-def normalize_date(value):
-    """将 AI 返回的毕业时间统一为 YYYY-MM-DD 格式"""
-    if not value:
-        return None
-    try:
-        value = str(value).strip()
-
-        # 完整格式
-        if re.match(r"^\d{4}-\d{2}-\d{2}$", value):
-            return value
-        # 年-月 或 年/月
-        if re.match(r"^\d{4}[-/]\d{2}$", value):
-            year, month = re.split(r"[-/]", value)
-            return f"{year}-{month}-01"
-        # 只有年份
-        if re.match(r"^\d{4}$", value):
-            return f"{value}-01-01"
-        # 中文格式（例如 “2027年7月”）
-        match = re.match(r"^(\d{4})年(\d{1,2})月", value)
-        if match:
-            year, month = match.groups()
-            return f"{year}-{int(month):02d}-01"
-    except Exception:
-        return None
-    return None
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_FILES = 10
 
+# 查询预算（见 querybudget.py）：每份简历入库约 18 条 SQL（判重、写入、检索文档、工作经历、事件）；
+# 批量修改每 ID_CHUNK_SIZE 个 id 一次读取、一次更新
+UPLOAD_QUERIES_PER_FILE = 18
+BULK_QUERY_BUDGET = 2 * math.ceil(BULK_MAX_IDS / ID_CHUNK_SIZE) + 4
 
+
+def request_favorite_ids(request):
+    """
+    当前用户收藏的候选人 id：优先取 JWT 认证用户，
+    否则按 username 参数（前端收藏相关接口沿用的方式），一次查询
+    """
+    if request.user.is_authenticated:
+        return favorite_ids_for(request.user)
+    username = request.query_params.get('username')
+    if not username:
+        return set()
+    return set(Favorite.objects.filter(user__username=username).values_list('candidate_id', flat=True))
+
+
+@query_budget(UPLOAD_QUERIES_PER_FILE * MAX_UPLOAD_FILES + 1)
 class ResumeUploadView(APIView):
     """
-    上传简历 PDF → 提取字段 → AI 评分 → 存数据库
+    上传简历 PDF → 提取字段 → AI 评分 → 存数据库（同步处理）
+    大批量上传请使用 IngestionJobCreateView 异步导入
     """
     permission_classes = [permissions.AllowAny]
 
-    API_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1/chat/completions"
-    API_KEY = os.environ.get("AI_API_KEY", "")
     ADMIN_UPLOAD_PASSWORD = os.environ.get("UPLOAD_PASSWORD", "STEMHUB2025!")
-    HEADERS = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {API_KEY}",
-    }
 
     def post(self, request, *args, **kwargs):
         files = request.FILES.getlist("files")
 
         if not files:
             return Response({"error": "未上传文件"}, status=status.HTTP_400_BAD_REQUEST)
-        if len(files) > 10:
+        if len(files) > MAX_UPLOAD_FILES:
             return Response({"error": "一次最多上传 10 份简历"}, status=status.HTTP_400_BAD_REQUEST)
 
-        created, failed = [], []
-
-        for idx, file in enumerate(files, 1):
-            print(f"\n📄 [{idx}/{len(files)}] 正在处理：{file.name}")
-            temp_path = None
-
-            try:
-                # 临时保存 PDF
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                    for chunk in file.chunks():
-                        temp_file.write(chunk)
-                    temp_path = temp_file.name
-
-                # 提取文字
-                text = extract_text(temp_path).strip()
-                if len(text) < 40:
-                    print(f"⚠️ {file.name} 内容过短，跳过。")
-                    failed.append({"file": file.name, "reason": "内容过短"})
-                    continue
-
-                # 调用 AI
-                ai_result = self.call_ai_parse(text)
-                if not ai_result:
-                    failed.append({"file": file.name, "reason": "AI 无返回或解析失败"})
-                    continue
-
-                result_json = ai_result.get("data", {})
-                match_level = ai_result.get("score", "D")
-
-                # 存入数据库
-                candidate = Candidate.objects.create(
-                    name=result_json.get("name", ""),
-                    gender=result_json.get("gender", ""),
-                    age=safe_int(result_json.get("age")),
-                    phone=result_json.get("phone", ""),
-                    email=result_json.get("email", ""),
-                    major=result_json.get("major", ""),
-                    education=result_json.get("degree", "本科"),
-                    university=result_json.get("university", ""),
-                    graduation_date=normalize_date(result_json.get("graduation_date")),
-                    base=result_json.get("base", "远程"),
-                    experience=result_json.get("experience", ""),
-                    cooperation_status="未合作",
-                    match_level=match_level,
-                )
-                candidate.resume_file.save(file.name, file, save=True)
-
-                created.append(CandidateSerializer(candidate).data)
-                print(f"✅ 成功导入：{candidate.name}（评分 {match_level}）")
-
-                time.sleep(1)  # 避免Qwen速率限制
-
-            except Exception as e:
-                print(f"❌ 解析异常：{e}")
-                failed.append({"file": file.name, "reason": str(e)})
-            finally:
-                if temp_path and os.path.exists(temp_path):
-                    os.remove(temp_path)
+        on_duplicate = request.data.get("on_duplicate", "skip")
+        if on_duplicate not in dict(IngestionJob.ON_DUPLICATE_CHOICES):
+            return Response({"error": "on_duplicate 只能是 skip 或 update"}, status=status.HTTP_400_BAD_REQUEST)
+
+        created, updated, failed = [], [], []
+
+        results, timings = process_resumes(files, on_duplicate=on_duplicate)
+        for file, outcome in results:
+            if isinstance(outcome, IngestionResult):
+                data = CandidateSerializer(outcome.candidate).data
+                (created if outcome.created else updated).append(data)
+                logger.info("✅ 成功导入：%s（评分 %s）", outcome.candidate.name, outcome.candidate.match_level)
+            elif isinstance(outcome, DuplicateCandidate):
+                logger.info("⚠️ %s %s，跳过。", file.name, outcome)
+                failed.append({
+                    "file": file.name,
+                    "reason": str(outcome),
+                    "duplicate_of": outcome.candidate.id,
+                    "matched_by": outcome.matched_by,
+                })
+            else:
+                logger.warning("❌ %s 处理失败：%s", file.name, outcome)
+                failed.append({"file": file.name, "reason": str(outcome)})
 
         return Response({
             "created": created,
+            "updated": updated,
             "failed": failed,
-            "count": len(created)
+            "count": len(created),
+            "timings": timings,
         })
 
-    # ==============
-    # 🤖 AI 调用部分
-    # ==============
-    def call_ai_parse(self, text):
-        """
-        调用通义千问提取简历字段 + 匹配评分
-        """
-        prompt = f"""
-你是一位专业的人才简历分析系统，专注于为教育行业筛选优质候选人。
-请阅读以下简历文本，严格输出 JSON，字段如下：
-{{
-  "data": {{
-    "name": "",
-    "gender": "",
-    "age": "",
-    "phone": "",
-    "email": "",
-    "major": "",
-    "degree": "",
-    "university": "",
-    "graduation_date": "",
-    "base": "",
-    "experience": [
-      {{
-        "company": "",
-        "position": "",
-        "start_date": "",
-        "end_date": "",
-        "description": ""
-      }}
-    ]
-  }},
-  "score": ""
-}}
-
-🎯 字段提取要求：
-
-1. **专业（major）**：优先提取【生物/数学/物理/计算机/化学/商业/机械工程】等具体专业名称。
-   如果无法确定具体专业，则按大类标记：理学、工学、经管、语言、文哲史、其他
-
-2. **Base（所在地/期望工作地）**：
-   - 优先识别：上海、杭州、广州、南京、宁波（这五个城市）
-   - 如果候选人不在以上城市或未明确说明，则标记为"远程"
-   - 注意：提取城市名称，不要省份（如"浙江杭州"应提取为"杭州"）
-
-3. **工作经历（experience）**：
-   - **优先提取教育相关经历**（教师、助教、教练、培训师、课程设计等）
-   - 按时间倒序排列（最近的经历排在前面）
-   - 每条经历必须包含：公司/机构名、职位、起止时间、工作描述
-
-4. **毕业时间（graduation_date）**：
-   - 必须是 YYYY-MM-DD 格式
-   - 如果只有年月，则补充为 YYYY-MM-01
-   - 如果只有年份，则补充为 YYYY-01-01
-
-📊 **简历匹配度评分（score）**：
-- **A类**：有教育行业经验 + 较匹配（如：曾任教师/教练，教育背景优秀）
-- **B类**：无教育经验 + 项目经验丰富（如：有丰富实习/项目，潜力大）
-- **C类**：有教育经验 + 匹配度一般（如：短期教育相关实习，经验较浅）
-- **D类**：无教育经验 + 匹配度一般（如：应届生，经验较少）
-- **E类**：匹配度低（如：信息不足或专业领域差异大）
-
-注：教育行业经验特指在学校、培训机构、教育公司的教学、课程设计、教育产品相关工作。
-
-❗务必返回纯 JSON，不要任何解释性文字。
-
-以下是简历文本：
-{text[:4000]}
-"""
-
-        payload = {
-            "model": "qwen-plus",
-            "messages": [{"role": "user", "content": prompt}],
-        }
-
-        resp = requests.post(self.API_URL, headers=self.HEADERS, data=json.dumps(payload))
+
+# ✅ 异步导入：上传后立即返回任务ID
+@query_budget(4)
+class IngestionJobCreateView(APIView):
+    """
+    保存上传的简历并创建导入任务，由 run_ingestion_worker 在后台处理
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        files = request.FILES.getlist("files")
+
+        if not files:
+            return Response({"error": "未上传文件"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > settings.INGESTION_MAX_FILES:
+            return Response(
+                {"error": f"一次最多上传 {settings.INGESTION_MAX_FILES} 份简历"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        on_duplicate = request.data.get("on_duplicate", "skip")
+        if on_duplicate not in dict(IngestionJob.ON_DUPLICATE_CHOICES):
+            return Response({"error": "on_duplicate 只能是 skip 或 update"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue_files(files, created_by=request.data.get("username"), on_duplicate=on_duplicate)
+        return Response(
+            {"job_id": job.id, "status": job.status, "total": job.total},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+# ✅ 异步导入：查询任务进度
+@query_budget(4)
+class IngestionJobDetailView(generics.RetrieveAPIView):
+    """
+    返回导入任务整体状态及每个文件的处理进度
+    """
+    queryset = IngestionJob.objects.prefetch_related('tasks__candidate')
+    serializer_class = IngestionJobSerializer
+    permission_classes = [permissions.AllowAny]
+
+
+# ✅ 批量导入：上传 CSV / XLSX（列与导出文件一致），后台直接入库
+@query_budget(2)
+class ImportJobCreateView(APIView):
+    """
+    file：.csv / .csv.gz / .xlsx；on_duplicate：skip（默认）/ update，按电话、邮箱判重
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        file = request.FILES.get("file")
+        if not file:
+            return Response({"error": "未上传文件"}, status=status.HTTP_400_BAD_REQUEST)
+        if not file.name.lower().endswith((".csv", ".csv.gz", ".xlsx")):
+            return Response({"error": "只支持 .csv、.csv.gz 和 .xlsx 文件"}, status=status.HTTP_400_BAD_REQUEST)
+        if file.size > settings.IMPORT_MAX_FILE_SIZE:
+            return Response(
+                {"error": f"文件不能超过 {settings.IMPORT_MAX_FILE_SIZE // (1024 * 1024)} MB"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        on_duplicate = request.data.get("on_duplicate", "skip")
+        if on_duplicate not in dict(IngestionJob.ON_DUPLICATE_CHOICES):
+            return Response({"error": "on_duplicate 只能是 skip 或 update"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue_import(file, created_by=request.data.get("username"), on_duplicate=on_duplicate)
+        return Response(
+            ImportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+# ✅ 批量导入：查询任务结果
+@query_budget(2)
+class ImportJobDetailView(generics.RetrieveAPIView):
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [permissions.AllowAny]
+
+
+# ✅ 批量导入：下载错误报告
+@query_budget(2)
+class ImportJobErrorReportView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
         try:
-            content = resp.json()["choices"][0]["message"]["content"]
-            match = re.search(r"\{[\s\S]*\}", content)
-            if not match:
-                raise ValueError(f"AI 未返回 JSON 格式：{content[:200]}")
-            json_str = match.group(0)
-            return json.loads(json_str)
-        except Exception as e:
-            print("⚠️ AI响应异常：", e)
-            print("🧾 原始响应：", resp.text[:800])
-            return None
+            job = ImportJob.objects.get(pk=pk)
+        except ImportJob.DoesNotExist:
+            return Response({"error": "导入任务不存在"}, status=status.HTTP_404_NOT_FOUND)
+        if not job.error_report:
+            return Response({"error": "没有错误报告", "status": job.status}, status=status.HTTP_404_NOT_FOUND)
+
+        path = os.path.join(settings.MEDIA_ROOT, job.error_report.name)
+        if not os.path.exists(path):
+            return Response({"error": "错误报告已被删除"}, status=status.HTTP_410_GONE)
+        return ranged_file_response(request, path, "text/csv; charset=utf-8", f"import_errors_{job.pk}.csv")
 
 
 # ✅ 人才库列表接口
+@query_budget(4)
 class CandidateListView(generics.ListAPIView):
-    queryset = Candidate.objects.all().order_by('-created_at')
-    serializer_class = CandidateSerializer
+    """
+    候选人列表，支持服务端搜索/筛选（见 filters.py）和游标分页：
+    ?search=&match_level=&cooperation_status=&education=&base=&age=&page_size=&cursor=
+    &has_education_experience=&worked_at=&min_teaching_months=
+    &min_cooperations=&cooperated_since=&best_result=&ordering=recent_cooperation|cooperation_count
+    带 username（或已认证）时 is_favorited 直接反映该用户的收藏状态
+
+    分页或带 fields / expand 参数时使用精简表示（CandidateListSerializer），
+    工作经历等大字段需 ?expand=experience 或通过详情接口获取；未返回的列不会被查询。
+    不带这些参数时仍返回完整字段，兼容旧前端。
+    """
+    pagination_class = CandidateCursorPagination
+
+    def get_serializer_class(self):
+        params = self.request.query_params
+        slim_params = FIELDSET_PARAMS + (self.paginator.cursor_query_param, self.paginator.page_size_query_param)
+        if any(key in params for key in slim_params):
+            return CandidateListSerializer
+        return CandidateSerializer
+
+    def get_queryset(self):
+        ordering, condition = candidate_ordering(self.request.query_params)
+        queryset = Candidate.objects.filter(condition).order_by(*ordering)
+        queryset = filter_candidates(queryset, self.request.query_params)
+        fields = serializer_fields(self.get_serializer_class(), fieldset_context(self.request))
+        # 游标分页需要读取排序字段
+        return only_for_fields(queryset, fields, extra=[name.lstrip('-') for name in ordering])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(fieldset_context(self.request))
+        if wants_field(context, 'is_favorited'):
+            context['favorite_ids'] = request_favorite_ids(self.request)
+        return context
+
+
+# ✅ 候选人增量同步
+@query_budget(4)
+class CandidateChangesView(APIView):
+    """
+    ?since=<cursor>&limit=500：返回 cursor 之后新增 / 修改的候选人（changed）、
+    已删除的候选人 id（deleted）、新的 cursor 以及 has_more；不带 since 时从头返回全部候选人。
+    候选人字段与列表接口一致，支持 ?fields= / ?expand= 及 username（is_favorited）。
+    cursor 过期（早于删除记录保留期）时返回 410，需要重新全量同步。
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        limit = min(max(safe_int(request.query_params.get('limit')) or SYNC_PAGE_SIZE, 1), SYNC_MAX_PAGE_SIZE)
+        context = {'request': request, **fieldset_context(request)}
+        fields = serializer_fields(CandidateSerializer, context)
+        queryset = only_for_fields(Candidate.objects.all(), fields, extra=('updated_at',))
+        try:
+            changes = changes_since(request.query_params.get('since'), limit=limit, queryset=queryset)
+        except SyncCursorExpired as e:
+            return Response({'error': str(e)}, status=status.HTTP_410_GONE)
+        except SyncCursorError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        if wants_field(context, 'is_favorited'):
+            context['favorite_ids'] = request_favorite_ids(request)
+        changes['changed'] = CandidateSerializer(changes['changed'], many=True, context=context).data
+        return Response(changes)
 
-class CandidateUpdateView(generics.UpdateAPIView):
+
+# ✅ 变更推送（SSE）
+@query_budget(2)
+def candidate_events(request):
+    """
+    GET /api/candidates/events/?channels=candidates,stats&username=
+    text/event-stream 长连接，推送 candidates / cooperations / favorites / stats 频道的事件
+    （默认全部频道）。需要由 ASGI 服务（uvicorn）提供，WSGI 下每个连接会占用一个线程，仅适合开发。
     """
-    单个候选人更新接口（支持 PATCH）
-    用于更新评分、合作状态等字段
+    channels = parse_list(request.GET.get('channels')) or set(CHANNELS)
+    unknown = channels - set(CHANNELS)
+    if unknown:
+        return JsonResponse({'error': f"未知频道：{', '.join(sorted(unknown))}"}, status=400)
+
+    user_id = request.user.id if request.user.is_authenticated else None
+    username = request.GET.get('username')
+    if user_id is None and username:
+        user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+
+    stream = EventStream(channels, user_id=user_id)
+    content = stream.__aiter__() if isinstance(request, ASGIRequest) else iter(stream)
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # 关闭 nginx 缓冲
+    return response
+
+
+# ✅ 全文检索接口
+@query_budget(5)
+class CandidateSearchView(APIView):
+    """
+    按相关度检索候选人（姓名、院校、专业、城市、工作经历），返回高亮片段
+    ?q=关键词&limit=20
     """
-    queryset = Candidate.objects.all()
-    serializer_class = CandidateSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        if not query:
+            return Response({'error': '缺少搜索关键词'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+        except ValueError:
+            limit = 20
+
+        matches = search_candidates(query, limit=limit)
+        serializer = CandidateSerializer(
+            [candidate for candidate, _, _ in matches], many=True,
+            context={'request': request, 'favorite_ids': request_favorite_ids(request)}
+        )
+        results = serializer.data
+        for data, (_, score, snippet) in zip(results, matches):
+            data['score'] = score
+            data['snippet'] = snippet
+        return Response({'query': query, 'count': len(results), 'results': results})
+
+
+@query_budget(4, PUT=17, PATCH=17)
+class CandidateDetailView(generics.RetrieveUpdateAPIView):
+    """
+    单个候选人详情（GET，包含工作经历、结构化经历及合作记录等完整字段）与更新（PATCH）
+    用于更新评分、合作状态等字段；支持 ?fields=
+    """
+    queryset = Candidate.objects.prefetch_related(
+        'experiences',
+        Prefetch('cooperations', queryset=CooperationRecord.objects.order_by('-start_date', '-id')),
+    )
+    serializer_class = CandidateDetailSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(fieldset_context(self.request))
+        return context
+
+
+# ✅ 批量修改候选人（评分、合作状态）
+@query_budget(BULK_QUERY_BUDGET)
+class CandidateBulkUpdateView(APIView):
+    """
+    请求体：{"ids": [1, 2, 3], "changes": {"cooperation_status": 2}}
+    或 {"filters": {...与人才库列表相同的筛选参数}, "changes": {...}}
+    变更只校验一次，在一个事务内批量写入，返回每个 id 的处理结果
+    （updated / unchanged / not_found）。
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def patch(self, request):
+        serializer = CandidateBulkChangesSerializer(data=request.data.get("changes") or {}, partial=True)
+        if not serializer.is_valid():
+            return Response({"error": "changes 不合法", "details": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.validated_data:
+            return Response({"error": "changes 不能为空"}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = request.data.get("ids")
+        filters = request.data.get("filters")
+        if ids is not None and filters is not None:
+            return Response({"error": "ids 与 filters 只能二选一"}, status=status.HTTP_400_BAD_REQUEST)
+        if filters is not None and not isinstance(filters, dict):
+            return Response({"error": "filters 必须是对象"}, status=status.HTTP_400_BAD_REQUEST)
+        if ids is not None and not isinstance(ids, list):
+            return Response({"error": "ids 必须是整数数组"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = bulk_update_candidates(serializer.validated_data, ids=ids, filters=filters)
+        except BulkUpdateError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    post = patch
+
 
 # ✅ 统计数据接口
+@query_budget(3)
 class CandidateStatsView(APIView):
     """
     返回候选人统计数据
@@ -265,129 +404,94 @@ class CandidateStatsView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        from django.db.models import Count
-
-        total = Candidate.objects.count()
-        
-        # 评分分布
-        score_distribution = {
-            'A': Candidate.objects.filter(match_level='A').count(),
-            'B': Candidate.objects.filter(match_level='B').count(),
-            'C': Candidate.objects.filter(match_level='C').count(),
-            'D': Candidate.objects.filter(match_level='D').count(),
-            'E': Candidate.objects.filter(match_level='E').count(),
-        }
-        
-        # 合作状态分布
-        cooperation_distribution = {}
-        coop_stats = Candidate.objects.values('cooperation_status').annotate(count=Count('id'))
-        for item in coop_stats:
-            cooperation_distribution[item['cooperation_status']] = item['count']
-        
-        # Base分布
-        base_distribution = {}
-        base_stats = Candidate.objects.values('base').annotate(count=Count('id'))
-        for item in base_stats:
-            base_distribution[item['base']] = item['count']
-        
-        # 专业分布
-        major_distribution = {}
-        major_stats = Candidate.objects.values('major').annotate(count=Count('id'))
-        for item in major_stats:
-            major = item['major'] or '未知'
-            major_distribution[major] = item['count']
-
-        return Response({
-            'total': total,
-            'scoreDistribution': score_distribution,
-            'cooperationDistribution': cooperation_distribution,
-            'baseDistribution': base_distribution,
-            'majorDistribution': major_distribution,
-        })
+        entry = get_stats()
+        not_modified = get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified']
+        )
+        response = not_modified if not_modified is not None else Response(entry['data'])
+        # 304 同样带上校验器，浏览器据此更新本地缓存
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        # 浏览器每次都带 If-None-Match 重新验证
+        response['Cache-Control'] = 'no-cache'
+        return response
 
 
 # ✅ 导出Excel接口
+@query_budget(1)
 class CandidateExportView(APIView):
     """
-    导出候选人数据为Excel
+    导出候选人数据为Excel，支持与人才库列表相同的筛选参数
     """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        try:
-            import openpyxl
-            from openpyxl.styles import Font, Alignment, PatternFill
-            from django.http import HttpResponse
-            
-            # 创建工作簿
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "候选人数据"
-            
-            # 标题行
-            headers = [
-                '姓名', '性别', '年龄', '电话', '邮箱', 
-                '学历', '专业', '毕业院校', '毕业时间',
-                'Base', '合作状态', '匹配度', '创建时间'
-            ]
-            
-            # 设置标题样式
-            header_fill = PatternFill(start_color="D4AF37", end_color="D4AF37", fill_type="solid")
-            header_font = Font(bold=True, color="000000")
-            
-            for col_num, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_num, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            # 数据行
-            candidates = Candidate.objects.all().order_by('-created_at')
-            for row_num, candidate in enumerate(candidates, 2):
-                ws.cell(row=row_num, column=1, value=candidate.name)
-                ws.cell(row=row_num, column=2, value=candidate.gender or '')
-                ws.cell(row=row_num, column=3, value=candidate.age)
-                ws.cell(row=row_num, column=4, value=candidate.phone)
-                ws.cell(row=row_num, column=5, value=candidate.email)
-                ws.cell(row=row_num, column=6, value=candidate.education)
-                ws.cell(row=row_num, column=7, value=candidate.major or '')
-                ws.cell(row=row_num, column=8, value=candidate.university or '')
-                ws.cell(row=row_num, column=9, value=str(candidate.graduation_date) if candidate.graduation_date else '')
-                ws.cell(row=row_num, column=10, value=candidate.base)
-                ws.cell(row=row_num, column=11, value=candidate.cooperation_status)
-                ws.cell(row=row_num, column=12, value=candidate.match_level)
-                ws.cell(row=row_num, column=13, value=candidate.created_at.strftime('%Y-%m-%d %H:%M'))
-            
-            # 自动调整列宽
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column].width = adjusted_width
-            
-            # 准备响应
-            response = HttpResponse(
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename=candidates_{datetime.now().strftime("%Y%m%d")}.xlsx'
-            wb.save(response)
-            
-            return response
-            
-        except ImportError:
+        # 流式生成 xlsx：分批读取、边写边发送，内存占用与行数无关
+        queryset = filter_candidates(Candidate.objects.all(), request.query_params)
+        response = StreamingHttpResponse(
+            candidate_xlsx(queryset),
+            content_type=XLSX_CONTENT_TYPE,
+        )
+        response['Content-Disposition'] = f'attachment; filename=candidates_{datetime.now().strftime("%Y%m%d")}.xlsx'
+        return response
+
+
+# ✅ 后台导出：创建任务
+@query_budget(4)
+class ExportJobCreateView(APIView):
+    """
+    按人才库筛选条件创建导出任务，由 run_ingestion_worker 在后台生成文件。
+    format：xlsx（默认）/ csv（gzip）/ columnar；筛选参数同候选人列表。
+    数据未变化时直接返回已有任务（reused=true）。
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        export_format = request.data.get("format", "xlsx")
+        if export_format not in EXPORT_WRITERS:
             return Response(
-                {'error': '请安装 openpyxl: pip install openpyxl'}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": f"format 只能是 {' / '.join(EXPORT_WRITERS)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        job, reused = request_export(export_format, request.data, created_by=request.data.get("username"))
+        data = ExportJobSerializer(job, context={"request": request}).data
+        data["reused"] = reused
+        return Response(data, status=status.HTTP_200_OK if job.status == "done" else status.HTTP_202_ACCEPTED)
+
+
+# ✅ 后台导出：查询任务状态
+@query_budget(2)
+class ExportJobDetailView(generics.RetrieveAPIView):
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    permission_classes = [permissions.AllowAny]
+
+
+# ✅ 后台导出：下载文件（支持 Range 断点续传）
+@query_budget(2)
+class ExportJobDownloadView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        try:
+            job = ExportJob.objects.get(pk=pk)
+        except ExportJob.DoesNotExist:
+            return Response({"error": "导出任务不存在"}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != "done":
+            return Response({"error": "文件尚未生成", "status": job.status}, status=status.HTTP_409_CONFLICT)
+
+        path = os.path.join(settings.MEDIA_ROOT, job.file.name)
+        if not os.path.exists(path):
+            return Response({"error": "文件已过期，请重新导出"}, status=status.HTTP_410_GONE)
+
+        _, extension, content_type = EXPORT_WRITERS[job.format]
+        filename = f'candidates_{job.created_at.strftime("%Y%m%d")}_{job.pk}.{extension}'
+        return ranged_file_response(request, path, content_type, filename)
+
 
 # ✅ 合作记录列表与创建接口
+@query_budget(3, POST=11)
 class CooperationRecordListCreateView(APIView):
     """
     获取所有合作记录 (GET) 或创建新的合作记录 (POST)
@@ -395,9 +499,23 @@ class CooperationRecordListCreateView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        """获取所有合作记录，按开始时间倒序"""
-        records = CooperationRecord.objects.all().order_by('-start_date')
-        serializer = CooperationRecordSerializer(records, many=True)
+        """
+        合作记录按开始时间倒序；支持 ?fields= 及筛选参数（见 filters.filter_cooperations）：
+        ?candidate=&project=&result=&date_from=&date_to=&has_agreement=&search=
+        带 page / page_size 时分页返回 {count, next, previous, results}，否则返回完整列表
+        """
+        context = fieldset_context(request)
+        records = CooperationRecord.objects.all().order_by('-start_date', '-id')
+        records = filter_cooperations(records, request.query_params)
+        # 候选人姓名随记录一起 JOIN 查询，每页一条 SQL
+        records = only_for_fields(records, serializer_fields(CooperationRecordSerializer, context))
+
+        paginator = CooperationPagination()
+        page = paginator.paginate_queryset(records, request, view=self)
+        if page is not None:
+            serializer = CooperationRecordSerializer(page, many=True, context=context)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = CooperationRecordSerializer(records, many=True, context=context)
         return Response(serializer.data)
 
     def post(self, request):
@@ -411,7 +529,7 @@ class CooperationRecordListCreateView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # 创建合作记录
+            # 创建合作记录（协议文件随记录一起保存，只触发一次合作汇总）
             record = CooperationRecord.objects.create(
                 candidate_id=candidate_id,
                 project_name=request.data.get('project_name'),
@@ -421,13 +539,9 @@ class CooperationRecordListCreateView(APIView):
                 salary=request.data.get('salary', ''),
                 evaluation=request.data.get('evaluation', ''),
                 cooperation_result=request.data.get('cooperation_result', '良好'),
+                agreement_file=request.FILES.get('agreement_file'),
             )
             
-            # 处理协议文件
-            if 'agreement_file' in request.FILES:
-                record.agreement_file = request.FILES['agreement_file']
-                record.save()
-            
             serializer = CooperationRecordSerializer(record)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
@@ -439,16 +553,23 @@ class CooperationRecordListCreateView(APIView):
 
 
 # ✅ 合作记录详情接口（查看/更新/删除）
+@query_budget(2, PUT=13, PATCH=13, DELETE=11)
 class CooperationRecordDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     获取、更新或删除单个合作记录
     """
-    queryset = CooperationRecord.objects.all()
+    queryset = CooperationRecord.objects.select_related('candidate')
     serializer_class = CooperationRecordSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(fieldset_context(self.request))
+        return context
+
 
 # ✅ 收藏/取消收藏接口
+@query_budget(7)
 class ToggleFavoriteView(APIView):
     """
     收藏或取消收藏候选人
@@ -501,6 +622,7 @@ class ToggleFavoriteView(APIView):
 
 
 # ✅ 获取我的收藏列表
+@query_budget(3)
 class MyFavoritesView(APIView):
     """
     获取当前用户的所有收藏
@@ -518,18 +640,18 @@ class MyFavoritesView(APIView):
 
         try:
             user = User.objects.get(username=username)
-            favorites = Favorite.objects.filter(user=user).select_related('candidate')
-            
-            # 返回候选人数据
-            candidates_data = []
-            for fav in favorites:
-                candidate = fav.candidate
-                serializer = CandidateSerializer(candidate, context={'request': request})
-                data = serializer.data
+            favorites = list(Favorite.objects.filter(user=user).select_related('candidate'))
+
+            # 一次序列化全部候选人，收藏状态已知，无需逐条查询
+            candidates = [fav.candidate for fav in favorites]
+            serializer = CandidateSerializer(
+                candidates, many=True,
+                context={'request': request, 'favorite_ids': {c.id for c in candidates}}
+            )
+            candidates_data = serializer.data
+            for data, fav in zip(candidates_data, favorites):
                 data['favorited_at'] = fav.created_at
-                data['is_favorited'] = True
-                candidates_data.append(data)
-            
+
             return Response(candidates_data)
 
         except User.DoesNotExist:
@@ -539,3 +661,18 @@ class MyFavoritesView(APIView):
             )
 
 
+# ✅ 获取我的收藏 id 列表（轻量版，人才库页面用于标记收藏状态）
+@query_budget(2)
+class MyFavoriteIdsView(APIView):
+    """
+    返回当前用户收藏的候选人 id 数组：?username=
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        if not request.user.is_authenticated and not request.GET.get('username'):
+            return Response(
+                {'error': '缺少用户名'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(sorted(request_favorite_ids(request)))
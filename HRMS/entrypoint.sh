@@ -3,6 +3,8 @@
 set -e
 
 python manage.py migrate --noinput
+# 使用数据库缓存时建表；其它缓存后端下不做任何操作
+python manage.py createcachetable
 python manage.py collectstatic --noinput
 
 gunicorn HRMS.wsgi:application --bind 0.0.0.0:8000
@@ -1,9 +1,12 @@
 import React, {useEffect, useState} from "react";
-import {http, getBackendFileUrl} from "../services/http";
+import {http, getBackendFileUrl, subscribeEvents} from "../services/http";
 import {useNavigate} from "react-router-dom";
 import Navbar from "../components/Navbar";
 import AddCooperationModal from "../components/AddCooperationModal";
 
+// 📦 人才库本地副本：离开页面后保留，再次进入或数据变化时只按 cursor 拉取增量
+let candidateCache = {username: null, rows: [], cursor: null};
+
 export default function Candidates() {
     const [candidates, setCandidates] = useState([]);
     const [filtered, setFiltered] = useState([]);
@@ -23,29 +26,64 @@ export default function Candidates() {
     const navigate = useNavigate();
     const username = localStorage.getItem("username") || "访客";
 
-    // 🧩 获取数据（包含收藏状态）
+    // 🧩 获取数据（包含收藏状态），之后其他人修改候选人时由推送触发增量同步
     useEffect(() => {
         fetchCandidates();
+        let timer = null;
+        const unsubscribe = subscribeEvents({
+            candidates: () => {
+                // 批量导入等连续变更合并为一次同步
+                clearTimeout(timer);
+                timer = setTimeout(fetchCandidates, 500);
+            },
+        });
+        return () => {
+            clearTimeout(timer);
+            unsubscribe();
+        };
     }, []);
 
+    // 本地修改（评分、收藏等）同步到缓存
+    useEffect(() => {
+        candidateCache.rows = candidates;
+    }, [candidates]);
+
     const fetchCandidates = async () => {
+        if (candidateCache.username !== username) {
+            candidateCache = {username, rows: [], cursor: null};
+        }
+        if (candidateCache.rows.length) {
+            setCandidates(candidateCache.rows);
+        }
         try {
-            const res = await http.get("candidates/");
-            const favRes = await http.get("candidates/favorites/my/", {
-                params: {username}
-            });
-            
-            // 创建收藏ID集合
-            const favoritedIds = new Set(favRes.data.map(f => f.id));
-            
-            const data = res.data.map((c) => ({
-                ...c,
-                experienceList: safeParseExperience(c.experience),
-                is_favorited: favoritedIds.has(c.id),
-            }));
+            // 增量同步：首次（无 cursor）拉取全部，之后只拉取新增 / 修改 / 删除的候选人
+            // 带上 username，直接返回当前用户的收藏状态
+            const byId = new Map(candidateCache.rows.map((c) => [c.id, c]));
+            let cursor = candidateCache.cursor;
+            let hasMore = true;
+            while (hasMore) {
+                const res = await http.get("candidates/changes/", {
+                    params: cursor ? {username, since: cursor} : {username}
+                });
+                res.data.deleted.forEach((id) => byId.delete(id));
+                res.data.changed.forEach((c) =>
+                    byId.set(c.id, {...c, experienceList: safeParseExperience(c.experience)})
+                );
+                cursor = res.data.cursor;
+                hasMore = res.data.has_more;
+            }
+
+            const data = [...byId.values()].sort(
+                (a, b) => (b.created_at || "").localeCompare(a.created_at || "") || b.id - a.id
+            );
+            candidateCache = {username, rows: data, cursor};
             setCandidates(data);
-            setFiltered(data);
         } catch (err) {
+            if (err.response?.status === 410 && candidateCache.cursor) {
+                // cursor 过期，重新全量同步
+                candidateCache = {username, rows: [], cursor: null};
+                return fetchCandidates();
+            }
             console.error("获取数据失败:", err);
         }
     };
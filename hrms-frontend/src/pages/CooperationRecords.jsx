@@ -7,7 +7,7 @@ import Navbar from "../components/Navbar";
 export default function CooperationRecords() {
     const navigate = useNavigate();
     const [records, setRecords] = useState([]);
-    const [filtered, setFiltered] = useState([]);
+    const [total, setTotal] = useState(0);
     const [search, setSearch] = useState("");
     const [activeMenu, setActiveMenu] = useState("records");
     const [currentPage, setCurrentPage] = useState(1);
@@ -15,36 +15,31 @@ export default function CooperationRecords() {
     const itemsPerPage = 20;
     const username = localStorage.getItem("username") || "访客";
 
-    // 获取合作记录
+    // 获取合作记录（服务端搜索 + 分页，只取当前页）
     useEffect(() => {
         fetchRecords();
-    }, []);
+    }, [search, currentPage]);
 
     const fetchRecords = async () => {
         try {
-            const res = await http.get("candidates/cooperations/");
-            setRecords(res.data);
-            setFiltered(res.data);
+            const res = await http.get("candidates/cooperations/", {
+                params: {search, page: currentPage, page_size: itemsPerPage},
+            });
+            setRecords(res.data.results);
+            setTotal(res.data.count);
         } catch (err) {
             console.error("获取合作记录失败:", err);
         }
     };
 
-    // 搜索过滤
+    // 搜索条件变化时回到第一页
     useEffect(() => {
-        let result = records.filter(
-            (r) =>
-                r.candidate_name?.toLowerCase().includes(search.toLowerCase()) ||
-                r.project_name?.toLowerCase().includes(search.toLowerCase())
-        );
-        setFiltered(result);
         setCurrentPage(1);
-    }, [search, records]);
+    }, [search]);
 
     // 分页
-    const totalPages = Math.ceil(filtered.length / itemsPerPage);
-    const startIndex = (currentPage - 1) * itemsPerPage;
-    const currentItems = filtered.slice(startIndex, startIndex + itemsPerPage);
+    const totalPages = Math.ceil(total / itemsPerPage);
+    const currentItems = records;
 
     // 格式化日期
     const formatDate = (dateStr) => {
@@ -97,7 +92,7 @@ export default function CooperationRecords() {
                 <main style={styles.content}>
                     <h1 style={styles.title}>📄 合作记录管理</h1>
                     <p style={styles.subtitle}>
-                        共 {filtered.length} 条合作记录
+                        共 {total} 条合作记录
                         {totalPages > 1 && ` · 第 ${currentPage} / ${totalPages} 页`}
                     </p>
 
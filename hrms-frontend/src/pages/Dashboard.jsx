@@ -1,6 +1,6 @@
 import React, {useState, useEffect} from "react";
 import {useNavigate} from "react-router-dom";
-import {http} from "../services/http";
+import {http, subscribeEvents} from "../services/http";
 import Navbar from "../components/Navbar";
 
 export default function Dashboard() {
@@ -16,9 +16,19 @@ export default function Dashboard() {
     });
     const [loading, setLoading] = useState(true);
 
-    // 获取统计数据
+    // 获取统计数据，之后由推送更新（只包含变化的统计项）
     useEffect(() => {
         fetchStats();
+        return subscribeEvents({
+            stats: (changed) => {
+                if (changed) {
+                    setStats((prev) => ({...prev, ...changed}));
+                    setLoading(false);
+                } else {
+                    fetchStats();
+                }
+            },
+        });
     }, []);
 
     const fetchStats = async () => {
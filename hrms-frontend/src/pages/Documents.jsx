@@ -7,45 +7,38 @@ import {http, getBackendFileUrl} from "../services/http";
 export default function Documents() {
     const navigate = useNavigate();
     const [documents, setDocuments] = useState([]);
-    const [filtered, setFiltered] = useState([]);
+    const [total, setTotal] = useState(0);
     const [search, setSearch] = useState("");
     const [activeMenu, setActiveMenu] = useState("documents");
     const [currentPage, setCurrentPage] = useState(1);
     const itemsPerPage = 20;
     const username = localStorage.getItem("username") || "访客";
 
-    // 获取所有有协议的合作记录
+    // 获取有协议的合作记录（服务端筛选 + 分页，只取当前页）
     useEffect(() => {
         fetchDocuments();
-    }, []);
+    }, [search, currentPage]);
 
     const fetchDocuments = async () => {
         try {
-            const res = await http.get("candidates/cooperations/");
-            // 只保留有协议文件的记录
-            const withAgreements = res.data.filter(record => record.agreement_file);
-            setDocuments(withAgreements);
-            setFiltered(withAgreements);
+            const res = await http.get("candidates/cooperations/", {
+                params: {has_agreement: 1, search, page: currentPage, page_size: itemsPerPage},
+            });
+            setDocuments(res.data.results);
+            setTotal(res.data.count);
         } catch (err) {
             console.error("获取协议失败:", err);
         }
     };
 
-    // 搜索过滤
+    // 搜索条件变化时回到第一页
     useEffect(() => {
-        let result = documents.filter(
-            (doc) =>
-                doc.candidate_name?.toLowerCase().includes(search.toLowerCase()) ||
-                doc.project_name?.toLowerCase().includes(search.toLowerCase())
-        );
-        setFiltered(result);
         setCurrentPage(1);
-    }, [search, documents]);
+    }, [search]);
 
     // 分页
-    const totalPages = Math.ceil(filtered.length / itemsPerPage);
-    const startIndex = (currentPage - 1) * itemsPerPage;
-    const currentItems = filtered.slice(startIndex, startIndex + itemsPerPage);
+    const totalPages = Math.ceil(total / itemsPerPage);
+    const currentItems = documents;
 
     // 格式化日期
     const formatDate = (dateStr) => {
@@ -104,7 +97,7 @@ export default function Documents() {
                 <main style={styles.content}>
                     <h1 style={styles.title}>📁 兼职协议档案</h1>
                     <p style={styles.subtitle}>
-                        共 {filtered.length} 份协议文件
+                        共 {total} 份协议文件
                         {totalPages > 1 && ` · 第 ${currentPage} / ${totalPages} 页`}
                     </p>
 
@@ -15,3 +15,16 @@ export const getBackendFileUrl = (path) => {
   const base = process.env.REACT_APP_BACKEND_BASE || "";
   return `${base}${path}`;
 };
+
+// 订阅后端变更推送（SSE），handlers 为 {频道名: 回调}；返回关闭函数
+// 断线后浏览器自动重连；收到 resync 时各回调以 null 调用，页面应重新同步
+export const subscribeEvents = (handlers, params = {}) => {
+  if (typeof EventSource === "undefined") return () => {};
+  const query = new URLSearchParams({channels: Object.keys(handlers).join(","), ...params});
+  const source = new EventSource(`${API_BASE}candidates/events/?${query}`);
+  Object.entries(handlers).forEach(([channel, handler]) => {
+    source.addEventListener(channel, (e) => handler(JSON.parse(e.data)));
+  });
+  source.addEventListener("resync", () => Object.values(handlers).forEach((handler) => handler(null)));
+  return () => source.close();
+};